@@ -0,0 +1,22 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_pipeline_watermarks"
+down_revision = "0003_add_external_event_ref"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pipeline_watermarks",
+        sa.Column("name", sa.String(length=100), primary_key=True),
+        sa.Column("last_updated_at", sa.DateTime(), nullable=True),
+        sa.Column("last_id", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("pipeline_watermarks")
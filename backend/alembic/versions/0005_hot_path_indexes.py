@@ -0,0 +1,122 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_hot_path_indexes"
+down_revision = "0004_pipeline_watermarks"
+branch_labels = None
+depends_on = None
+
+
+# Unique keys these indexes start enforcing. Rows that already break them
+# cannot be merged blindly (markets and events carry outcomes, quotes,
+# links and arbs), so upgrade stops with the offending keys listed instead.
+_UNIQUE_KEYS = (
+    ("markets", ("venue_id", "venue_market_key")),
+    ("sports_events", ("source", "external_event_ref")),
+)
+
+
+def _check_unique(table: str, columns) -> None:
+    cols = ", ".join(columns)
+    not_null = " AND ".join(f"{c} IS NOT NULL" for c in columns)
+    dupes = op.get_bind().execute(
+        sa.text(
+            f"SELECT {cols}, count(*), array_agg(id ORDER BY id) FROM {table} "
+            f"WHERE {not_null} GROUP BY {cols} HAVING count(*) > 1 ORDER BY {cols} LIMIT 20"
+        )
+    ).all()
+    if dupes:
+        listed = "\n".join(f"  {tuple(row[:-2])}: ids {row[-1]}" for row in dupes)
+        raise RuntimeError(
+            f"Cannot add a unique index on {table} ({cols}): duplicate rows exist (first 20 shown).\n"
+            f"{listed}\nMerge them into the lowest id, then re-run the migration."
+        )
+
+
+def _dedupe_event_market_links() -> None:
+    # Links carry no history: keep the lowest id per (market, event) and
+    # keep it confirmed if any duplicate was
+    op.execute(
+        """
+        UPDATE event_market_links l SET confirmed_by_user = true
+        FROM (
+            SELECT min(id) AS keep_id FROM event_market_links
+            GROUP BY market_id, sports_event_id
+            HAVING count(*) > 1 AND bool_or(confirmed_by_user)
+        ) d
+        WHERE l.id = d.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM event_market_links l
+        USING event_market_links k
+        WHERE k.market_id = l.market_id AND k.sports_event_id = l.sports_event_id AND k.id < l.id
+        """
+    )
+
+
+def _create_index(name: str, table: str, columns, **kw) -> None:
+    # A failed concurrent build leaves an INVALID index behind; drop it so a
+    # re-run can build it again
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY {name}")
+    op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def upgrade() -> None:
+    for table, columns in _UNIQUE_KEYS:
+        _check_unique(table, columns)
+    _dedupe_event_market_links()
+
+    # Built concurrently, outside the migration transaction, so ingestion
+    # and the API keep writing to these tables meanwhile
+    with op.get_context().autocommit_block():
+        # Latest-quote lookups: WHERE market_outcome_id IN (...) + max(timestamp)
+        _create_index("ix_quotes_market_outcome_id_timestamp", "quotes", ["market_outcome_id", "timestamp"])
+        # Time-range scans over the append-only quote history (replay, exports)
+        _create_index("ix_quotes_timestamp_brin", "quotes", ["timestamp"], postgresql_using="brin")
+
+        # Ingestion upserts look markets up by venue key; enforce uniqueness too
+        _create_index("uq_markets_venue_id_venue_market_key", "markets", ["venue_id", "venue_market_key"], unique=True)
+        _create_index("ix_markets_sports_event_id", "markets", ["sports_event_id"])
+        _create_index("ix_market_outcomes_market_id", "market_outcomes", ["market_id"])
+
+        _create_index(
+            "uq_sports_events_source_external_event_ref",
+            "sports_events",
+            ["source", "external_event_ref"],
+            unique=True,
+        )
+        _create_index(
+            "uq_event_market_links_market_id_sports_event_id",
+            "event_market_links",
+            ["market_id", "sports_event_id"],
+            unique=True,
+        )
+        _create_index("ix_mapping_candidates_market_id_status", "mapping_candidates", ["market_id", "status"])
+
+        # /arbs orders by detected_at DESC LIMIT n, which needs a btree
+        _create_index("ix_arbitrage_opportunities_detected_at", "arbitrage_opportunities", ["detected_at"])
+        _create_index("ix_arbitrage_legs_arbitrage_opportunity_id", "arbitrage_legs", ["arbitrage_opportunity_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_arbitrage_legs_arbitrage_opportunity_id", table_name="arbitrage_legs")
+    op.drop_index("ix_arbitrage_opportunities_detected_at", table_name="arbitrage_opportunities")
+    op.drop_index("ix_mapping_candidates_market_id_status", table_name="mapping_candidates")
+    op.drop_index("uq_event_market_links_market_id_sports_event_id", table_name="event_market_links")
+    op.drop_index("uq_sports_events_source_external_event_ref", table_name="sports_events")
+    op.drop_index("ix_market_outcomes_market_id", table_name="market_outcomes")
+    op.drop_index("ix_markets_sports_event_id", table_name="markets")
+    op.drop_index("uq_markets_venue_id_venue_market_key", table_name="markets")
+    op.drop_index("ix_quotes_timestamp_brin", table_name="quotes")
+    op.drop_index("ix_quotes_market_outcome_id_timestamp", table_name="quotes")
@@ -0,0 +1,89 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_quotes_latest"
+down_revision = "0005_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+_COPY_COLUMNS = (
+    "timestamp",
+    "raw_price",
+    "price_format",
+    "bid_price",
+    "ask_price",
+    "source",
+    "share_price",
+    "net_pnl_if_win_per_share",
+    "net_pnl_if_lose_per_share",
+    "decimal_odds",
+    "implied_prob_raw",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quotes_latest",
+        sa.Column("market_outcome_id", sa.Integer(), sa.ForeignKey("market_outcomes.id"), primary_key=True),
+        sa.Column("quote_id", sa.Integer(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("raw_price", sa.Numeric(18, 8), nullable=False),
+        sa.Column("price_format", sa.String(length=20), nullable=False),
+        sa.Column("bid_price", sa.Numeric(18, 8), nullable=True),
+        sa.Column("ask_price", sa.Numeric(18, 8), nullable=True),
+        sa.Column("source", sa.String(length=50), nullable=True),
+        sa.Column("share_price", sa.Numeric(18, 8), nullable=True),
+        sa.Column("net_pnl_if_win_per_share", sa.Numeric(18, 8), nullable=True),
+        sa.Column("net_pnl_if_lose_per_share", sa.Numeric(18, 8), nullable=True),
+        sa.Column("decimal_odds", sa.Numeric(18, 8), nullable=True),
+        sa.Column("implied_prob_raw", sa.Numeric(18, 8), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+    cols = ", ".join(f'"{c}"' for c in _COPY_COLUMNS)
+    new_cols = ", ".join(f'NEW."{c}"' for c in _COPY_COLUMNS)
+    updates = ",\n            ".join(f'"{c}" = EXCLUDED."{c}"' for c in _COPY_COLUMNS)
+
+    # Keep one row per outcome current on every quote insert. Late-arriving
+    # (older) quotes never overwrite a newer one; ties go to the higher id.
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION quotes_latest_upsert() RETURNS trigger AS $$
+        BEGIN
+          INSERT INTO quotes_latest (market_outcome_id, quote_id, {cols}, updated_at)
+          VALUES (NEW.market_outcome_id, NEW.id, {new_cols}, now() AT TIME ZONE 'utc')
+          ON CONFLICT (market_outcome_id) DO UPDATE SET
+            quote_id = EXCLUDED.quote_id,
+            {updates},
+            updated_at = EXCLUDED.updated_at
+          WHERE (quotes_latest."timestamp", quotes_latest.quote_id) <= (EXCLUDED."timestamp", EXCLUDED.quote_id);
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER quotes_latest_after_insert
+        AFTER INSERT ON quotes
+        FOR EACH ROW EXECUTE FUNCTION quotes_latest_upsert();
+        """
+    )
+
+    # Backfill from existing history
+    op.execute(
+        f"""
+        INSERT INTO quotes_latest (market_outcome_id, quote_id, {cols}, updated_at)
+        SELECT DISTINCT ON (market_outcome_id) market_outcome_id, id, {cols}, now() AT TIME ZONE 'utc'
+        FROM quotes
+        ORDER BY market_outcome_id, "timestamp" DESC, id DESC
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS quotes_latest_after_insert ON quotes")
+    op.execute("DROP FUNCTION IF EXISTS quotes_latest_upsert()")
+    op.drop_table("quotes_latest")
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_partition_quotes"
+down_revision = "0006_quotes_latest"
+branch_labels = None
+depends_on = None
+
+
+# Columns in table order; shared by the copy statements below.
+_COLUMNS = (
+    "id",
+    "market_outcome_id",
+    "timestamp",
+    "raw_price",
+    "price_format",
+    "bid_price",
+    "ask_price",
+    "source",
+    "share_price",
+    "net_pnl_if_win_per_share",
+    "net_pnl_if_lose_per_share",
+    "decimal_odds",
+    "implied_prob_raw",
+    "created_at",
+)
+
+_COLUMN_DDL = """
+    id INTEGER NOT NULL DEFAULT nextval('quotes_id_seq'),
+    market_outcome_id INTEGER NOT NULL REFERENCES market_outcomes (id),
+    "timestamp" TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    raw_price NUMERIC(18, 8) NOT NULL,
+    price_format VARCHAR(20) NOT NULL,
+    bid_price NUMERIC(18, 8),
+    ask_price NUMERIC(18, 8),
+    source VARCHAR(50),
+    share_price NUMERIC(18, 8),
+    net_pnl_if_win_per_share NUMERIC(18, 8),
+    net_pnl_if_lose_per_share NUMERIC(18, 8),
+    decimal_odds NUMERIC(18, 8),
+    implied_prob_raw NUMERIC(18, 8),
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+"""
+
+# Partitions created up front beyond the current week; db.partitions keeps
+# extending this at startup and from the maintenance job.
+_WEEKS_AHEAD = 4
+
+
+def _week_start(ts: datetime) -> datetime:
+    day = datetime(ts.year, ts.month, ts.day)
+    return day - timedelta(days=day.weekday())
+
+
+def _create_index_and_trigger() -> None:
+    op.execute('CREATE INDEX ix_quotes_market_outcome_id_timestamp ON quotes (market_outcome_id, "timestamp")')
+    op.execute('CREATE INDEX ix_quotes_timestamp_brin ON quotes USING brin ("timestamp")')
+    op.execute(
+        """
+        CREATE TRIGGER quotes_latest_after_insert
+        AFTER INSERT ON quotes
+        FOR EACH ROW EXECUTE FUNCTION quotes_latest_upsert();
+        """
+    )
+
+
+def _swap_out_current_quotes() -> None:
+    # The quote history no longer has a single-column unique id, so legs keep
+    # source_quote_id as a plain column.
+    op.execute("ALTER TABLE arbitrage_legs DROP CONSTRAINT IF EXISTS arbitrage_legs_source_quote_id_fkey")
+    op.execute("DROP TRIGGER IF EXISTS quotes_latest_after_insert ON quotes")
+    # Keep the id sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE quotes_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE quotes RENAME TO quotes_old")
+    op.execute("DROP INDEX IF EXISTS ix_quotes_market_outcome_id_timestamp")
+    op.execute("DROP INDEX IF EXISTS ix_quotes_timestamp_brin")
+    op.execute("ALTER TABLE quotes_old RENAME CONSTRAINT quotes_pkey TO quotes_old_pkey")
+
+
+def _copy_from_old_and_drop() -> None:
+    cols = ", ".join(f'"{c}"' for c in _COLUMNS)
+    op.execute(f"INSERT INTO quotes ({cols}) SELECT {cols} FROM quotes_old")
+    op.execute("DROP TABLE quotes_old")
+    op.execute("ALTER SEQUENCE quotes_id_seq OWNED BY quotes.id")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    _swap_out_current_quotes()
+
+    op.execute(f'CREATE TABLE quotes ({_COLUMN_DDL}, PRIMARY KEY (id, "timestamp")) PARTITION BY RANGE ("timestamp")')
+    # Catches quotes whose venue timestamp falls outside every range partition
+    op.execute("CREATE TABLE quotes_default PARTITION OF quotes DEFAULT")
+
+    # Weekly partitions covering existing history through a few weeks ahead
+    lo, hi = bind.execute(sa.text('SELECT min("timestamp"), max("timestamp") FROM quotes_old')).one()
+    now = datetime.utcnow()
+    start = _week_start(min(lo, now) if lo else now)
+    stop = _week_start(max(hi, now) if hi else now) + timedelta(weeks=_WEEKS_AHEAD + 1)
+    while start < stop:
+        end = start + timedelta(weeks=1)
+        op.execute(
+            f"CREATE TABLE quotes_p{start:%Y%m%d} PARTITION OF quotes "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d %H:%M:%S}') TO ('{end:%Y-%m-%d %H:%M:%S}')"
+        )
+        start = end
+
+    _copy_from_old_and_drop()
+    _create_index_and_trigger()
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS quotes_latest_after_insert ON quotes")
+    op.execute("ALTER SEQUENCE quotes_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE quotes RENAME TO quotes_old")
+    op.execute("DROP INDEX IF EXISTS ix_quotes_market_outcome_id_timestamp")
+    op.execute("DROP INDEX IF EXISTS ix_quotes_timestamp_brin")
+    op.execute("ALTER TABLE quotes_old RENAME CONSTRAINT quotes_pkey TO quotes_old_pkey")
+
+    op.execute(f"CREATE TABLE quotes ({_COLUMN_DDL}, CONSTRAINT quotes_pkey PRIMARY KEY (id))")
+    _copy_from_old_and_drop()
+    _create_index_and_trigger()
+    op.execute(
+        "ALTER TABLE arbitrage_legs ADD CONSTRAINT arbitrage_legs_source_quote_id_fkey "
+        "FOREIGN KEY (source_quote_id) REFERENCES quotes (id)"
+    )
@@ -0,0 +1,32 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_quote_bars"
+down_revision = "0007_partition_quotes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quote_bars",
+        sa.Column("market_outcome_id", sa.Integer(), sa.ForeignKey("market_outcomes.id"), primary_key=True),
+        sa.Column("resolution", sa.String(length=8), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(), primary_key=True),
+        sa.Column("open", sa.Numeric(18, 8), nullable=False),
+        sa.Column("high", sa.Numeric(18, 8), nullable=False),
+        sa.Column("low", sa.Numeric(18, 8), nullable=False),
+        sa.Column("close", sa.Numeric(18, 8), nullable=False),
+        sa.Column("last_bid", sa.Numeric(18, 8), nullable=True),
+        sa.Column("last_ask", sa.Numeric(18, 8), nullable=True),
+        sa.Column("open_at", sa.DateTime(), nullable=False),
+        sa.Column("close_at", sa.DateTime(), nullable=False),
+        sa.Column("tick_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("quote_bars")
+    op.execute("DELETE FROM pipeline_watermarks WHERE name = 'rollup.quote_bars'")
@@ -0,0 +1,33 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_keyset_indexes"
+down_revision = "0008_quote_bars"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination: each list route orders by (sort key, tie-breaker) and
+    # seeks with a row comparison, so the index must cover both columns.
+    op.create_index("ix_quotes_timestamp_id", "quotes", ["timestamp", "id"])
+    op.create_index("ix_quotes_latest_timestamp_market_outcome_id", "quotes_latest", ["timestamp", "market_outcome_id"])
+    op.create_index("ix_sports_events_event_start_time_utc_id", "sports_events", ["event_start_time_utc", "id"])
+    op.create_index(
+        "ix_mapping_candidates_status_confidence_score_id",
+        "mapping_candidates",
+        ["status", "confidence_score", "id"],
+    )
+    # Supersedes the single-column detected_at index
+    op.create_index("ix_arbitrage_opportunities_detected_at_id", "arbitrage_opportunities", ["detected_at", "id"])
+    op.drop_index("ix_arbitrage_opportunities_detected_at", table_name="arbitrage_opportunities")
+
+
+def downgrade() -> None:
+    op.create_index("ix_arbitrage_opportunities_detected_at", "arbitrage_opportunities", ["detected_at"])
+    op.drop_index("ix_arbitrage_opportunities_detected_at_id", table_name="arbitrage_opportunities")
+    op.drop_index("ix_mapping_candidates_status_confidence_score_id", table_name="mapping_candidates")
+    op.drop_index("ix_sports_events_event_start_time_utc_id", table_name="sports_events")
+    op.drop_index("ix_quotes_latest_timestamp_market_outcome_id", table_name="quotes_latest")
+    op.drop_index("ix_quotes_timestamp_id", table_name="quotes")
@@ -0,0 +1,78 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_latency_tracing"
+down_revision = "0009_keyset_indexes"
+branch_labels = None
+depends_on = None
+
+
+# Columns quotes_latest_upsert() copies from quotes (0006_quotes_latest)
+_COPY_COLUMNS = (
+    "timestamp",
+    "raw_price",
+    "price_format",
+    "bid_price",
+    "ask_price",
+    "source",
+    "share_price",
+    "net_pnl_if_win_per_share",
+    "net_pnl_if_lose_per_share",
+    "decimal_odds",
+    "implied_prob_raw",
+)
+_TIMING_COLUMNS = ("fetched_at", "written_at")
+
+
+def _create_upsert_function(columns) -> None:
+    cols = ", ".join(f'"{c}"' for c in columns)
+    new_cols = ", ".join(f'NEW."{c}"' for c in columns)
+    updates = ",\n            ".join(f'"{c}" = EXCLUDED."{c}"' for c in columns)
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION quotes_latest_upsert() RETURNS trigger AS $$
+        BEGIN
+          INSERT INTO quotes_latest (market_outcome_id, quote_id, {cols}, updated_at)
+          VALUES (NEW.market_outcome_id, NEW.id, {new_cols}, now() AT TIME ZONE 'utc')
+          ON CONFLICT (market_outcome_id) DO UPDATE SET
+            quote_id = EXCLUDED.quote_id,
+            {updates},
+            updated_at = EXCLUDED.updated_at
+          WHERE (quotes_latest."timestamp", quotes_latest.quote_id) <= (EXCLUDED."timestamp", EXCLUDED.quote_id);
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+
+
+def upgrade() -> None:
+    # When ingestion received the venue response, and when the row reached
+    # the database. Added without a default so existing partitions are not
+    # rewritten; the default then applies to new rows only.
+    for table in ("quotes", "quotes_latest"):
+        op.add_column(table, sa.Column("fetched_at", sa.DateTime(), nullable=True))
+        op.add_column(table, sa.Column("written_at", sa.DateTime(), nullable=True))
+    op.execute("ALTER TABLE quotes ALTER COLUMN written_at SET DEFAULT (clock_timestamp() AT TIME ZONE 'utc')")
+    _create_upsert_function(_COPY_COLUMNS + _TIMING_COLUMNS)
+
+    # Timings of the quote behind each leg, copied at detection
+    op.add_column("arbitrage_legs", sa.Column("quote_timestamp", sa.DateTime(), nullable=True))
+    op.add_column("arbitrage_legs", sa.Column("quote_fetched_at", sa.DateTime(), nullable=True))
+    op.add_column("arbitrage_legs", sa.Column("quote_written_at", sa.DateTime(), nullable=True))
+    op.add_column("arbitrage_opportunities", sa.Column("oldest_quote_at", sa.DateTime(), nullable=True))
+    op.add_column("arbitrage_opportunities", sa.Column("quote_age_ms", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("arbitrage_opportunities", "quote_age_ms")
+    op.drop_column("arbitrage_opportunities", "oldest_quote_at")
+    op.drop_column("arbitrage_legs", "quote_written_at")
+    op.drop_column("arbitrage_legs", "quote_fetched_at")
+    op.drop_column("arbitrage_legs", "quote_timestamp")
+
+    _create_upsert_function(_COPY_COLUMNS)
+    for table in ("quotes_latest", "quotes"):
+        op.drop_column(table, "written_at")
+        op.drop_column(table, "fetched_at")
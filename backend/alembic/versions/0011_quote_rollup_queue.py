@@ -0,0 +1,56 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011_quote_rollup_queue"
+down_revision = "0010_latency_tracing"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Quotes not yet folded into quote_bars. Rows become visible to the
+    # rollup when the inserting transaction commits, so progress follows
+    # commit order rather than id order (venue ingestions commit
+    # independently and can finish out of id order).
+    op.create_table(
+        "quote_rollup_queue",
+        sa.Column("quote_id", sa.Integer(), primary_key=True),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION quote_rollup_enqueue() RETURNS trigger AS $$
+        BEGIN
+          INSERT INTO quote_rollup_queue (quote_id, "timestamp") VALUES (NEW.id, NEW."timestamp");
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER quote_rollup_after_insert
+        AFTER INSERT ON quotes
+        FOR EACH ROW WHEN (NEW.share_price IS NOT NULL)
+        EXECUTE FUNCTION quote_rollup_enqueue();
+        """
+    )
+
+    # Queue what the id watermark has not reached yet. CREATE TRIGGER waited
+    # for in-flight inserts into quotes, so every quote committed before the
+    # trigger existed is visible here and later ones are queued by it.
+    op.execute(
+        """
+        INSERT INTO quote_rollup_queue (quote_id, "timestamp")
+        SELECT id, "timestamp" FROM quotes
+        WHERE share_price IS NOT NULL
+          AND id > COALESCE((SELECT last_id FROM pipeline_watermarks WHERE name = 'rollup.quote_bars'), 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS quote_rollup_after_insert ON quotes")
+    op.execute("DROP FUNCTION IF EXISTS quote_rollup_enqueue()")
+    op.drop_table("quote_rollup_queue")
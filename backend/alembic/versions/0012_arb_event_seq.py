@@ -0,0 +1,42 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_arb_event_seq"
+down_revision = "0011_quote_rollup_queue"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One sequence numbers every opened/closed stream event, so a client's
+    # Last-Event-ID orders closes as well as opens (see app.api.arb_stream).
+    op.execute("CREATE SEQUENCE arb_event_seq")
+    op.add_column("arbitrage_opportunities", sa.Column("opened_seq", sa.BigInteger(), nullable=True))
+    op.add_column("arbitrage_opportunities", sa.Column("closed_seq", sa.BigInteger(), nullable=True))
+    op.add_column("arbitrage_opportunities", sa.Column("closed_at", sa.DateTime(), nullable=True))
+
+    # Event ids used to be opportunity ids; keep existing ones valid and
+    # continue the sequence above them
+    op.execute("UPDATE arbitrage_opportunities SET opened_seq = id")
+    op.execute("UPDATE arbitrage_opportunities SET closed_seq = id WHERE status = 'closed'")
+    op.execute(
+        """
+        SELECT setval('arb_event_seq', GREATEST(
+            COALESCE((SELECT max(id) FROM arbitrage_opportunities), 0),
+            (SELECT last_value FROM arbitrage_opportunities_id_seq)
+        ) + 1, false)
+        """
+    )
+
+    op.create_index("ix_arbitrage_opportunities_opened_seq", "arbitrage_opportunities", ["opened_seq"])
+    op.create_index("ix_arbitrage_opportunities_closed_seq", "arbitrage_opportunities", ["closed_seq"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_arbitrage_opportunities_closed_seq", table_name="arbitrage_opportunities")
+    op.drop_index("ix_arbitrage_opportunities_opened_seq", table_name="arbitrage_opportunities")
+    op.drop_column("arbitrage_opportunities", "closed_at")
+    op.drop_column("arbitrage_opportunities", "closed_seq")
+    op.drop_column("arbitrage_opportunities", "opened_seq")
+    op.execute("DROP SEQUENCE arb_event_seq")
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import asyncpg
+from sqlalchemy import case, func, or_, select
+
+from app.config import settings
+from core.arb_events import CHANNEL, CLOSED, OPENED, opp_payload
+from db import models, models_arbs
+
+
+logger = logging.getLogger(__name__)
+
+
+class ArbBroadcaster:
+    """
+    Fans opportunity events out to the stream clients of this process.
+
+    One asyncpg connection per process LISTENs on core.arb_events.CHANNEL,
+    so events committed by any worker (or a CLI scan) reach every client.
+    A client whose queue fills up is disconnected rather than holding events
+    back for the others; it reconnects and resumes from its last event id.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._conn: Optional[asyncpg.Connection] = None
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self) -> asyncio.Queue:
+        await self._ensure_listening()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.arb_stream_queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    async def _ensure_listening(self) -> None:
+        async with self._lock:
+            if self._conn is not None and not self._conn.is_closed():
+                return
+            from db.async_session import listen_dsn
+
+            conn = await asyncpg.connect(listen_dsn())
+            conn.add_termination_listener(self._on_terminated)
+            await conn.add_listener(CHANNEL, self._on_notify)
+            self._conn = conn
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        event = json.loads(payload)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("Dropping slow arb stream client")
+                self._disconnect(queue)
+
+    def _on_terminated(self, conn) -> None:
+        logger.warning("Arb stream listener connection lost")
+        self._conn = None
+        for queue in list(self._subscribers):
+            self._disconnect(queue)
+
+    def _disconnect(self, queue: asyncio.Queue) -> None:
+        # None tells the stream to end; the queue is emptied to make room for it
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def close(self) -> None:
+        for queue in list(self._subscribers):
+            self._disconnect(queue)
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+
+broadcaster = ArbBroadcaster()
+
+
+def matches(event: Dict[str, Any], min_roi: Optional[float], sport: Optional[str]) -> bool:
+    if min_roi is not None and event["worst_case_roi"] < min_roi:
+        return False
+    if sport is not None and event["sport"] != sport:
+        return False
+    return True
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """
+    Every event carries its sequence number as the SSE id, so a client's
+    Last-Event-ID covers closes as well as opens.
+    """
+    lines = [f"id: {event['seq']}", f"event: {event['kind']}"]
+    lines.append("data: " + json.dumps(event, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+async def backfill(
+    since_seq: int, min_roi: Optional[float], sport: Optional[str]
+) -> List[Dict[str, Any]]:
+    """
+    Events after `since_seq` in sequence order: "opened" for opportunities
+    recorded since, and "closed" for any opportunity closed since, including
+    ones the client saw opened before it disconnected.
+    """
+    from db.async_session import AsyncReadSessionLocal
+
+    Opp = models_arbs.ArbitrageOpportunity
+    Leg = models_arbs.ArbitrageLeg
+    # An opportunity's first event after since_seq; LEAST skips the NULL arm
+    first_seq = func.least(
+        case((Opp.opened_seq > since_seq, Opp.opened_seq)),
+        case((Opp.closed_seq > since_seq, Opp.closed_seq)),
+    )
+    stmt = (
+        select(Opp, models.SportsEvent.sport, first_seq)
+        .join(models.SportsEvent, Opp.sports_event_id == models.SportsEvent.id)
+        .where(or_(Opp.opened_seq > since_seq, Opp.closed_seq > since_seq))
+    )
+    if min_roi is not None:
+        stmt = stmt.where(Opp.worst_case_roi >= min_roi)
+    if sport is not None:
+        stmt = stmt.where(models.SportsEvent.sport == sport)
+    stmt = stmt.order_by(first_seq).limit(settings.arb_stream_backfill_limit)
+
+    async with AsyncReadSessionLocal() as db:
+        rows = (await db.execute(stmt)).all()
+        # Legs only go out with "opened" events
+        legs_by_opp: Dict[int, List[models_arbs.ArbitrageLeg]] = {
+            op.id: [] for op, _, _ in rows if op.opened_seq is not None and op.opened_seq > since_seq
+        }
+        if legs_by_opp:
+            legs = await db.scalars(
+                select(Leg).where(Leg.arbitrage_opportunity_id.in_(list(legs_by_opp))).order_by(Leg.id)
+            )
+            for leg in legs:
+                legs_by_opp[leg.arbitrage_opportunity_id].append(leg)
+
+    events: List[Dict[str, Any]] = []
+    for op, op_sport, _ in rows:
+        if op.id in legs_by_opp:
+            events.append(opp_payload(op, OPENED, op_sport, legs_by_opp[op.id]))
+        if op.closed_seq is not None and op.closed_seq > since_seq:
+            events.append(opp_payload(op, CLOSED, op_sport))
+    events.sort(key=lambda e: e["seq"])
+    if len(rows) == settings.arb_stream_backfill_limit:
+        # Opportunities past the limit may have events before a later close
+        # of an included one; stop where the backfill is still complete
+        cutoff = rows[-1][2]
+        events = [e for e in events if e["seq"] <= cutoff]
+    return events
+
+
+async def stream_events(
+    since_seq: Optional[int], min_roi: Optional[float], sport: Optional[str]
+) -> AsyncIterator[str]:
+    """
+    SSE body for one client: the resume backfill (if any), then live events
+    as they are committed, with a comment line as heartbeat while idle.
+    """
+    # Subscribe before reading the backfill so nothing committed in between is missed
+    queue = await broadcaster.subscribe()
+    try:
+        last_seq = since_seq or 0
+        if since_seq is not None:
+            for event in await backfill(since_seq, min_roi, sport):
+                last_seq = max(last_seq, event["seq"])
+                yield format_sse(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.arb_stream_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                return
+            if event["seq"] <= last_seq:
+                continue  # already sent by the backfill
+            if matches(event, min_roi, sport):
+                yield format_sse(event)
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.config import settings
+from db.data_changes import ARBS, CHANNEL, EVENTS, MARKETS, on_change, parse_payload
+
+
+logger = logging.getLogger(__name__)
+
+# A topic is bumped whenever a commit touching its tables lands (see
+# db.data_changes); entries cached under an older version are never
+# served again.
+
+# Path prefix -> topics its responses depend on (first match wins)
+CACHED_ROUTES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("/sports-events", (EVENTS, MARKETS)),
+    ("/markets", (MARKETS, EVENTS)),
+    ("/arbs", (ARBS,)),
+]
+
+# Never cached even though a CACHED_ROUTES prefix matches
+UNCACHED_PATHS = {"/arbs/stream"}
+
+_versions: Dict[str, int] = {}
+_versions_lock = threading.Lock()
+
+
+def bump_version(*topics: str) -> None:
+    """
+    Invalidate every cached response that depends on any of `topics`.
+
+    Versions are per process. Commits in this process bump them directly;
+    commits anywhere else arrive through ChangeListener.
+    """
+    with _versions_lock:
+        for topic in topics:
+            _versions[topic] = _versions.get(topic, 0) + 1
+
+
+on_change(lambda topics: bump_version(*topics))
+
+
+def current_versions(topics: Tuple[str, ...]) -> Tuple[int, ...]:
+    return tuple(_versions.get(t, 0) for t in topics)
+
+
+@dataclass
+class CachedResponse:
+    versions: Tuple[int, ...]
+    expires_at: float
+    etag: str
+    body: bytes
+    headers: Dict[str, str]
+    media_type: Optional[str]
+
+
+class ResponseCache:
+    """Bounded LRU of rendered GET responses keyed by path and query string."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, versions: Tuple[int, ...]) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.versions != versions or entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(settings.response_cache_max_entries)
+
+# Headers recomputed for every response rather than replayed from the cache
+_DROP_HEADERS = {"content-length", "etag", "cache-control", "date", "server"}
+
+
+def _topics_for(path: str) -> Optional[Tuple[str, ...]]:
+    if path in UNCACHED_PATHS:
+        return None
+    for prefix, topics in CACHED_ROUTES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return topics
+    return None
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in {t.strip() for t in header.split(",")}
+
+
+def _render(request: Request, entry: CachedResponse, hit: bool) -> Response:
+    headers = dict(entry.headers)
+    headers["ETag"] = entry.etag
+    # Let browsers keep the body but revalidate every time; revalidation is a 304
+    headers["Cache-Control"] = "private, no-cache"
+    headers["X-Cache"] = "HIT" if hit else "MISS"
+    if _etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, status_code=200, headers=headers, media_type=entry.media_type)
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Serves GETs on CACHED_ROUTES from `response_cache` while the entry is
+    within its TTL and its topics have not been bumped, and answers matching
+    If-None-Match requests with 304. Only 200 responses are cached.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        topics = _topics_for(request.url.path)
+        if request.method != "GET" or topics is None or settings.response_cache_ttl_seconds <= 0:
+            return await call_next(request)
+
+        key = request.url.path + "?" + request.url.query
+        versions = current_versions(topics)
+        entry = response_cache.get(key, versions)
+        if entry is not None:
+            return _render(request, entry, hit=True)
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = CachedResponse(
+            versions=versions,
+            expires_at=time.monotonic() + settings.response_cache_ttl_seconds,
+            etag='"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"',
+            body=body,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS},
+            media_type=response.media_type,
+        )
+        # A write that landed while this response was rendering may not be in
+        # it; only cache if no topic moved in the meantime.
+        if current_versions(topics) == versions:
+            response_cache.put(key, entry)
+        return _render(request, entry, hit=False)
+
+
+class ChangeListener:
+    """
+    LISTENs for db.data_changes notifications so writes committed by other
+    workers, CLI jobs or the scheduler invalidate this process's cache. If
+    the connection drops, notifications may have been missed, so the whole
+    cache is cleared before reconnecting.
+    """
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        from db.async_session import listen_dsn
+
+        while True:
+            lost = asyncio.Event()
+            try:
+                conn = await asyncpg.connect(listen_dsn())
+                try:
+                    conn.add_termination_listener(lambda c: lost.set())
+                    await conn.add_listener(CHANNEL, lambda c, pid, channel, payload: bump_version(*parse_payload(payload)))
+                    await lost.wait()
+                finally:
+                    if not conn.is_closed():
+                        await conn.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation listener failed")
+            logger.warning("Cache invalidation listener disconnected; clearing the response cache")
+            response_cache.clear()
+            await asyncio.sleep(1.0)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+change_listener = ChangeListener()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.api.responses import NDJSON_MEDIA_TYPE, dumps
+from app.config import settings
+
+
+# format -> (media type, file extension)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": (NDJSON_MEDIA_TYPE, "ndjson"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunks(names: List[str], batches: Iterator[Sequence]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(names)
+    for rows in batches:
+        writer.writerows([_csv_value(v) for v in row] for row in rows)
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+def _ndjson_chunks(batches: Iterator[Sequence]) -> Iterator[bytes]:
+    for rows in batches:
+        if rows:
+            yield b"\n".join(dumps(row._asdict()) for row in rows) + b"\n"
+
+
+def _arrow_chunks(stmt: Select, batches: Iterator[Sequence]) -> Iterator[bytes]:
+    # pyarrow is only loaded by the archive and this format
+    import pyarrow as pa
+
+    from db.archive import arrow_type, to_columns
+
+    schema = pa.schema([(col.name, arrow_type(col)) for col in stmt.selected_columns])
+    buf = io.BytesIO()
+
+    def drain() -> bytes:
+        data = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return data
+
+    with pa.ipc.new_stream(buf, schema) as writer:
+        for rows in batches:
+            writer.write_batch(pa.RecordBatch.from_pydict(to_columns(rows, schema), schema=schema))
+            yield drain()
+    # Schema (if nothing matched) and end-of-stream marker
+    yield drain()
+
+
+def stream_rows(stmt: Select, format: str, batch_size: int | None = None) -> Iterator[bytes]:
+    """
+    Run `stmt` on the read engine through a server-side cursor and yield it
+    encoded as `format`, one chunk per `batch_size` rows, so memory stays
+    flat however many rows match. The session lives as long as the stream.
+    """
+    from db.session import ReadSessionLocal
+
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=batch_size or settings.export_batch_size))
+        batches = result.partitions()
+        if format == "arrow":
+            yield from _arrow_chunks(stmt, batches)
+        elif format == "csv":
+            yield from _csv_chunks(list(result.keys()), batches)
+        else:
+            yield from _ndjson_chunks(batches)
+    finally:
+        db.close()
+
+
+def export_response(stmt: Select, format: str, filename: str) -> StreamingResponse:
+    media_type, ext = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_rows(stmt, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{ext}"'},
+    )
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from app.config import settings
+from core.rollups import ROLLUP_WATERMARK
+from db import models
+from db.async_session import async_read_engine
+from db.session import ReadSessionLocal, engine, read_engine
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Snapshot:
+    """Database-backed part of the health report, refreshed at most every health_cache_seconds."""
+
+    taken_at: datetime
+    monotonic: float
+    venues: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+_snapshot: Optional[Snapshot] = None
+_refresh_lock = threading.Lock()
+
+
+def _age_s(now: datetime, ts: Optional[datetime]) -> Optional[float]:
+    return round((now - ts).total_seconds(), 1) if ts else None
+
+
+def _take_snapshot() -> Snapshot:
+    now = datetime.utcnow()
+    snap = Snapshot(taken_at=now, monotonic=time.monotonic())
+    cutoff = now.replace(microsecond=0) - timedelta(seconds=settings.health_fresh_seconds)
+    Latest = models.QuoteLatest
+
+    db = ReadSessionLocal()
+    try:
+        # A stuck database should fail the probe quickly, not hold a read connection
+        db.execute(select(func.set_config("statement_timeout", str(settings.health_query_timeout_ms), True)))
+        # Per venue: open markets, how many have an outcome quoted since the
+        # cutoff, and the newest quote (venue time) and write. One pass over
+        # open markets and quotes_latest, both small.
+        rows = db.execute(
+            select(
+                models.Market.venue_id,
+                func.count(func.distinct(models.Market.id)),
+                func.count(func.distinct(models.Market.id)).filter(Latest.timestamp >= cutoff),
+                func.max(Latest.timestamp),
+                func.max(Latest.written_at),
+            )
+            .select_from(models.Market)
+            .outerjoin(models.MarketOutcome, models.MarketOutcome.market_id == models.Market.id)
+            .outerjoin(Latest, Latest.market_outcome_id == models.MarketOutcome.id)
+            .where(models.Market.status == "open")
+            .group_by(models.Market.venue_id)
+        ).all()
+        for venue_id, open_markets, fresh_markets, newest_quote_at, newest_write_at in rows:
+            snap.venues[venue_id] = {
+                "open_markets": open_markets,
+                "fresh_markets": fresh_markets,
+                "fresh_fraction": round(fresh_markets / open_markets, 4) if open_markets else None,
+                "newest_quote_at": newest_quote_at,
+                "newest_write_at": newest_write_at,
+            }
+
+        for wm in db.scalars(select(models.PipelineWatermark).order_by(models.PipelineWatermark.name)):
+            snap.stages[wm.name] = {
+                "last_run_at": wm.updated_at,
+                "position_at": wm.last_updated_at,
+                "position_id": wm.last_id,
+            }
+        rollup = snap.stages.get(ROLLUP_WATERMARK)
+        if rollup is not None:
+            rollup["backlog_quotes"] = db.execute(
+                select(func.count()).select_from(models.QuoteRollupQueue)
+            ).scalar()
+        db.rollback()
+    except Exception as e:
+        logger.exception("Health snapshot failed")
+        snap.error = f"{type(e).__name__}: {e}"
+    finally:
+        db.close()
+    return snap
+
+
+def current_snapshot() -> Snapshot:
+    """
+    The cached snapshot, refreshed when older than health_cache_seconds. Only
+    one caller refreshes at a time; the others keep serving the previous
+    snapshot rather than queueing behind it.
+    """
+    global _snapshot
+    snap = _snapshot
+    if snap is not None and time.monotonic() - snap.monotonic < settings.health_cache_seconds:
+        return snap
+    if not _refresh_lock.acquire(blocking=snap is None):
+        return snap
+    try:
+        if _snapshot is None or time.monotonic() - _snapshot.monotonic >= settings.health_cache_seconds:
+            _snapshot = _take_snapshot()
+        return _snapshot
+    finally:
+        _refresh_lock.release()
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Live connection pool usage; reading it costs no I/O."""
+    pools = {
+        "primary": (engine.pool, settings.db_pool_size + settings.db_max_overflow),
+        "read": (read_engine.pool, settings.db_read_pool_size + settings.db_read_max_overflow),
+        "async_read": (async_read_engine.sync_engine.pool, settings.db_read_pool_size + settings.db_read_max_overflow),
+    }
+    out = {}
+    for name, (pool, capacity) in pools.items():
+        checked_out = pool.checkedout()
+        out[name] = {
+            "checked_out": checked_out,
+            "capacity": capacity,
+            "saturation": round(checked_out / capacity, 3) if capacity else None,
+        }
+    return out
+
+
+def health_report() -> Dict[str, Any]:
+    """
+    Health of this instance and the pipeline behind it. Ages are computed
+    per call from the cached snapshot's timestamps, so they keep growing
+    between refreshes.
+    """
+    snap = current_snapshot()
+    now = datetime.utcnow()
+    problems: List[str] = []
+
+    venues = {}
+    for venue_id, v in snap.venues.items():
+        write_age = _age_s(now, v["newest_write_at"])
+        venues[venue_id] = {
+            "open_markets": v["open_markets"],
+            "fresh_markets": v["fresh_markets"],
+            "fresh_fraction": v["fresh_fraction"],
+            "newest_quote_age_s": _age_s(now, v["newest_quote_at"]),
+            "newest_write_age_s": write_age,
+        }
+        if v["open_markets"] and (write_age is None or write_age > settings.health_max_quote_age_seconds):
+            problems.append(f"{venue_id}: no quote written in {settings.health_max_quote_age_seconds:g}s")
+
+    stages = {
+        name: {
+            "last_run_age_s": _age_s(now, s["last_run_at"]),
+            "position_age_s": _age_s(now, s["position_at"]),
+            **({"position_id": s["position_id"]} if s["position_id"] is not None else {}),
+            **({"backlog_quotes": s["backlog_quotes"]} if "backlog_quotes" in s else {}),
+        }
+        for name, s in snap.stages.items()
+    }
+
+    pools = pool_stats()
+    for name, p in pools.items():
+        if p["saturation"] is not None and p["saturation"] >= settings.health_max_pool_saturation:
+            problems.append(f"{name} pool {p['checked_out']}/{p['capacity']} connections in use")
+
+    if snap.error:
+        problems.append(f"database: {snap.error}")
+
+    return {
+        "status": "degraded" if problems else "ok",
+        "problems": problems,
+        "snapshot_age_s": round(time.monotonic() - snap.monotonic, 1),
+        "fresh_within_s": settings.health_fresh_seconds,
+        "venues": venues,
+        "stages": stages,
+        "pools": pools,
+    }
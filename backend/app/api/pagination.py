@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, tuple_
+
+
+T = TypeVar("T")
+
+# List routes return the page as the body (unchanged shape) and the cursor for
+# the next page in this header; absent on the last page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Opaque cursor for the sort key of the last row on a page. Datetimes are
+    tagged so they round-trip exactly.
+    """
+    payload = [{"t": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Any) -> List[Any]:
+    """
+    Values of a cursor made by `encode_cursor`, checked against `types`, one
+    per value (a type or a tuple of types, as for isinstance; float also
+    takes ints). Anything else is a 400 rather than a bad query parameter.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("wrong cursor arity")
+        values = [datetime.fromisoformat(v["t"]) if isinstance(v, dict) else v for v in payload]
+        for value, expected in zip(values, types):
+            if expected is float:
+                expected = (int, float)
+            if isinstance(value, bool) or not isinstance(value, expected):
+                raise ValueError("wrong cursor value type")
+            if isinstance(value, float) and not math.isfinite(value):
+                raise ValueError("non-finite cursor value")
+            if isinstance(value, datetime) and value.tzinfo is not None:
+                raise ValueError("cursor timestamps are naive UTC")
+        return values
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """
+    Row-value predicate selecting rows strictly after `values` in the order
+    (columns...) ASC, or DESC when `descending`. Postgres answers it with a
+    range scan on an index over the same columns.
+    """
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
+
+
+def after_nulls_last(column: Any, id_column: Any, value: Optional[Any], id_value: int):
+    """
+    `after` for an ascending (column NULLS LAST, id) order where column is
+    nullable: once the cursor reaches the NULL tail only ids advance.
+    """
+    if value is None:
+        return and_(column.is_(None), id_column > id_value)
+    return or_(tuple_(column, id_column) > tuple_(value, id_value), column.is_(None))
+
+
+def paginate(rows: List[T], limit: int, response: Response, key: Callable[[T], Tuple[Any, ...]]) -> List[T]:
+    """
+    Trim a page fetched with `limit + 1` rows and set the next-page cursor
+    header when the extra row shows there is more.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
+    return rows
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import hmac
+import json
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Request header carrying settings.profiling_token; also authorizes the
+# /admin/profiles routes.
+PROFILE_HEADER = "X-Profile"
+# Response header naming the stored report of a profiled request
+PROFILE_ID_HEADER = "X-Profile-Id"
+# Admin routes for reports; their own requests are never profiled
+PROFILES_PATH = "/admin/profiles"
+
+# Statements and stacks kept in a report, largest first
+_TOP_STATEMENTS = 50
+_TOP_STACKS = 200
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+
+def authorized(request: Request) -> bool:
+    token = settings.profiling_token
+    supplied = request.headers.get(PROFILE_HEADER)
+    return bool(token and supplied) and hmac.compare_digest(supplied, token)
+
+
+class _Sampler(threading.Thread):
+    """
+    Samples the Python stack of whichever thread is running the request's
+    endpoint every `interval` seconds. Stacks are kept from the endpoint
+    frame down, collapsed as "file:function;file:function;..." (the input
+    format of flamegraph tools). The endpoint is known once routing has put
+    it in the scope; concurrent requests to the same endpoint share samples.
+    """
+
+    def __init__(self, scope: Dict[str, Any], interval: float, max_samples: int):
+        super().__init__(name="request-profiler", daemon=True)
+        self.scope = scope
+        self.interval = interval
+        self.max_samples = max_samples
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop_event.wait(self.interval) and self.samples < self.max_samples:
+            endpoint = self.scope.get("endpoint")
+            code = getattr(endpoint, "__code__", None)
+            if code is None:
+                continue
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    if frame.f_code is code:
+                        break
+                    frame = frame.f_back
+                if frame is None:
+                    continue
+                self.samples += 1
+                self.stacks[";".join(f"{os.path.basename(c.co_filename)}:{c.co_name}" for c in reversed(stack))] += 1
+
+
+class RequestProfile:
+    def __init__(self, request: Request):
+        self.id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{secrets.token_hex(4)}"
+        self.method = request.method
+        self.path = request.url.path
+        self.query = request.url.query
+        self.started_at = datetime.utcnow()
+        self.statements: Dict[str, List[float]] = {}
+        self._sampler = _Sampler(request.scope, settings.profiling_interval_ms / 1000, settings.profiling_max_samples)
+        self._start = 0.0
+        self.wall_ms = 0.0
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self.wall_ms = (time.perf_counter() - self._start) * 1000
+        self._sampler.stop()
+
+    def record_statement(self, statement: str, elapsed_ms: float) -> None:
+        self.statements.setdefault(statement, []).append(elapsed_ms)
+
+    def report(self, status_code: int) -> Dict[str, Any]:
+        per_statement = sorted(
+            (
+                {
+                    "statement": statement,
+                    "count": len(times),
+                    "total_ms": round(sum(times), 3),
+                    "max_ms": round(max(times), 3),
+                }
+                for statement, times in self.statements.items()
+            ),
+            key=lambda s: s["total_ms"],
+            reverse=True,
+        )
+        sql_ms = sum(s["total_ms"] for s in per_statement)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "status_code": status_code,
+            "started_at": self.started_at.isoformat(),
+            "wall_ms": round(self.wall_ms, 3),
+            # Time not spent waiting on the database: ORM hydration, Python, I/O
+            "non_sql_ms": round(max(self.wall_ms - sql_ms, 0.0), 3),
+            "sql": {
+                "count": sum(s["count"] for s in per_statement),
+                "total_ms": round(sql_ms, 3),
+                "statements": per_statement[:_TOP_STATEMENTS],
+            },
+            "samples": {
+                "interval_ms": settings.profiling_interval_ms,
+                "count": self._sampler.samples,
+                "stacks": [
+                    {"stack": stack, "count": count} for stack, count in self._sampler.stacks.most_common(_TOP_STACKS)
+                ],
+            },
+        }
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _current.get()
+    if profile is not None and conn.info.get("profile_started"):
+        elapsed = (time.perf_counter() - conn.info["profile_started"].pop()) * 1000
+        profile.record_statement(statement, elapsed)
+
+
+class _Armed:
+    """Paths armed by an admin to profile their next `count` requests."""
+
+    def __init__(self) -> None:
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def arm(self, path: str, count: int) -> None:
+        with self._lock:
+            self._counts[path] = count
+
+    def take(self, path: str) -> bool:
+        with self._lock:
+            remaining = self._counts.get(path, 0)
+            if remaining <= 0:
+                return False
+            if remaining == 1:
+                del self._counts[path]
+            else:
+                self._counts[path] = remaining - 1
+            return True
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+armed = _Armed()
+
+
+def report_path(profile_id: str) -> str:
+    return os.path.join(settings.profiling_dir, f"{profile_id}.json")
+
+
+def save_report(report: Dict[str, Any]) -> None:
+    os.makedirs(settings.profiling_dir, exist_ok=True)
+    with open(report_path(report["id"]), "w") as f:
+        json.dump(report, f, indent=1)
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Profiles a request when it carries `X-Profile: <profiling_token>` or its
+    path was armed through POST /admin/profiles/arm. The report (SQL
+    statement timings plus a sampled stack profile) is written under
+    `profiling_dir` and named in the X-Profile-Id response header. Requests
+    that are not profiled pay a header lookup; SQL hooks pay a context
+    variable read per statement.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        if (
+            not settings.profiling_token
+            or path.startswith(PROFILES_PATH)
+            or not (authorized(request) or armed.take(path))
+        ):
+            return await call_next(request)
+
+        profile = RequestProfile(request)
+        token = _current.set(profile)
+        profile.start()
+        try:
+            response = await call_next(request)
+        finally:
+            profile.stop()
+            _current.reset(token)
+        try:
+            save_report(profile.report(response.status_code))
+            response.headers[PROFILE_ID_HEADER] = profile.id
+        except OSError:
+            logger.exception("Could not store profile %s", profile.id)
+        return response
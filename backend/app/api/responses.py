@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, Mapping, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# `format` query values accepted by rows_response
+ROW_FORMATS = "^(json|ndjson)$"
+
+# Rows per chunk written to a streamed NDJSON body
+NDJSON_CHUNK_ROWS = 500
+
+
+def _default(value: Any) -> Any:
+    # Numeric columns come back as Decimal; the API has always sent floats
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """orjson encoding of rows, mappings and lists of them, Decimals as floats."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson. Routes return it directly, which
+    also skips FastAPI's per-row response_model validation; the declared
+    response_model then only documents the schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def ndjson_lines(rows: Iterable[Mapping[str, Any]], chunk_rows: int = NDJSON_CHUNK_ROWS) -> Iterator[bytes]:
+    """Encode `rows` as newline-delimited JSON, `chunk_rows` lines per chunk."""
+    chunk = []
+    for row in rows:
+        chunk.append(dumps(row))
+        if len(chunk) >= chunk_rows:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def rows_response(rows: list, response: Response, format: Optional[str] = None) -> Response:
+    """
+    Render a list route's rows as one JSON array, or with `format=ndjson` as a
+    streamed body of one JSON object per line. Headers set on the route's
+    injected `response` (the next-page cursor) are carried over.
+    """
+    headers = dict(response.headers)
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(rows), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    return FastJSONResponse(rows, headers=headers)
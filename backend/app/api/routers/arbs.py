@@ -1,11 +1,21 @@
+from datetime import datetime, timedelta
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from db.session import get_db
+from app.api.arb_stream import stream_events
+from app.api.pagination import after, decode_cursor, paginate
+from app.api.responses import ROW_FORMATS, FastJSONResponse, rows_response
+from app.api.schemas import ArbDetailOut, ArbOut
+from db.async_session import get_async_read_db
+from db.session import get_db, get_read_db
 from db import models_arbs, models
 from core.arb_engine import scan_all_events_for_arbs
+from core.latency import latency_summary
 
 
 router = APIRouter(prefix="/arbs", tags=["arbitrage"], redirect_slashes=False)
@@ -17,67 +27,105 @@ def scan_for_arbitrage(db: Session = Depends(get_db)):
     return {"detected_opportunities": created}
 
 
-@router.get("", response_model=List[dict])
-def list_arbs(
+def _arb_select():
+    Opp = models_arbs.ArbitrageOpportunity
+    return select(
+        Opp.id,
+        Opp.sports_event_id,
+        Opp.market_type,
+        Opp.outcome_group,
+        Opp.detected_at,
+        Opp.num_outcomes,
+        Opp.total_stake,
+        Opp.worst_case_pnl,
+        Opp.best_case_pnl,
+        Opp.worst_case_roi,
+        Opp.status,
+        Opp.oldest_quote_at,
+        Opp.quote_age_ms,
+    )
+
+
+@router.get("", response_model=List[ArbOut], response_class=FastJSONResponse)
+async def list_arbs(
+    response: Response,
     min_roi: Optional[float] = Query(None),
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    format: str = Query("json", pattern=ROW_FORMATS),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    query = db.query(models_arbs.ArbitrageOpportunity).order_by(models_arbs.ArbitrageOpportunity.detected_at.desc())
+    Opp = models_arbs.ArbitrageOpportunity
+    stmt = _arb_select().order_by(Opp.detected_at.desc(), Opp.id.desc())
     if min_roi is not None:
-        query = query.filter(models_arbs.ArbitrageOpportunity.worst_case_roi >= min_roi)
-    ops = query.limit(limit).all()
-    results = []
-    for op in ops:
-        results.append(
-            {
-                "id": op.id,
-                "sports_event_id": op.sports_event_id,
-                "market_type": op.market_type,
-                "outcome_group": op.outcome_group,
-                "detected_at": op.detected_at,
-                "num_outcomes": op.num_outcomes,
-                "total_stake": float(op.total_stake),
-                "worst_case_pnl": float(op.worst_case_pnl),
-                "best_case_pnl": float(op.best_case_pnl),
-                "worst_case_roi": float(op.worst_case_roi),
-                "status": op.status,
-            }
-        )
-    return results
-
-
-@router.get("/{arb_id}", response_model=dict)
-def get_arb(arb_id: int, db: Session = Depends(get_db)):
-    op = db.query(models_arbs.ArbitrageOpportunity).filter(models_arbs.ArbitrageOpportunity.id == arb_id).first()
+        stmt = stmt.where(Opp.worst_case_roi >= min_roi)
+    if cursor:
+        stmt = stmt.where(after((Opp.detected_at, Opp.id), decode_cursor(cursor, datetime, int), descending=True))
+    ops = paginate((await db.execute(stmt.limit(limit + 1))).all(), limit, response, lambda op: (op.detected_at, op.id))
+    return rows_response([op._asdict() for op in ops], response, format)
+
+
+@router.get("/stream")
+async def stream_arbs(
+    min_roi: Optional[float] = Query(None),
+    sport: Optional[str] = Query(None),
+    since_id: Optional[int] = Query(None, description="Resume after this event id (the SSE id of the last event seen)"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-sent events for opportunities as scans commit them: "opened"
+    (with legs) when one is recorded and "closed" when a later scan no
+    longer finds it. Event ids are one increasing sequence across both
+    kinds. Reconnecting EventSource clients resume automatically through
+    Last-Event-ID; other clients pass `since_id`.
+    """
+    if since_id is None and last_event_id:
+        try:
+            since_id = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    return StreamingResponse(
+        stream_events(since_id, min_roi, sport),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/latency", response_model=dict)
+def get_latency_summary(
+    start: Optional[datetime] = Query(None, description="Default: 24 hours before end"),
+    end: Optional[datetime] = Query(None, description="Default: now (UTC)"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Where opportunities' quotes spent their time before detection: venue
+    timestamp to fetch, fetch to database write, write to detection, and
+    the total quote age, as count/p50/p90/p99/max in milliseconds.
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(hours=24)
+    return latency_summary(db, start, end)
+
+
+@router.get("/{arb_id}", response_model=ArbDetailOut, response_class=FastJSONResponse)
+async def get_arb(arb_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    Leg = models_arbs.ArbitrageLeg
+    op = (await db.execute(_arb_select().where(models_arbs.ArbitrageOpportunity.id == arb_id))).first()
     if not op:
         raise HTTPException(status_code=404, detail="Arbitrage opportunity not found")
-    legs = db.query(models_arbs.ArbitrageLeg).filter(models_arbs.ArbitrageLeg.arbitrage_opportunity_id == op.id).all()
-    legs_out = []
-    for l in legs:
-        legs_out.append(
-            {
-                "venue_id": l.venue_id,
-                "market_outcome_id": l.market_outcome_id,
-                "outcome_label": l.outcome_label,
-                "stake_shares": float(l.stake_shares),
-                "share_price": float(l.share_price),
-                "win_pnl_per_share": float(l.win_pnl_per_share),
-                "lose_pnl_per_share": float(l.lose_pnl_per_share),
-                "source_quote_id": l.source_quote_id,
-            }
-        )
-    return {
-        "id": op.id,
-        "sports_event_id": op.sports_event_id,
-        "market_type": op.market_type,
-        "outcome_group": op.outcome_group,
-        "detected_at": op.detected_at,
-        "num_outcomes": op.num_outcomes,
-        "total_stake": float(op.total_stake),
-        "worst_case_pnl": float(op.worst_case_pnl),
-        "best_case_pnl": float(op.best_case_pnl),
-        "worst_case_roi": float(op.worst_case_roi),
-        "status": op.status,
-        "legs": legs_out,
-    }
+    legs = await db.execute(
+        select(
+            Leg.venue_id,
+            Leg.market_outcome_id,
+            Leg.outcome_label,
+            Leg.stake_shares,
+            Leg.share_price,
+            Leg.win_pnl_per_share,
+            Leg.lose_pnl_per_share,
+            Leg.source_quote_id,
+            Leg.quote_timestamp,
+            Leg.quote_fetched_at,
+            Leg.quote_written_at,
+        ).where(Leg.arbitrage_opportunity_id == arb_id)
+    )
+    return FastJSONResponse({**op._asdict(), "legs": [l._asdict() for l in legs]})
@@ -1,9 +1,19 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
+
+from app.api.health_checks import health_report
+from app.api.responses import FastJSONResponse
 
 router = APIRouter()
 
 
 @router.get("/health", tags=["health"])
-def health_check():
-    return {"status": "ok"}
-
+def health_check(strict: bool = Query(False, description="Respond 503 instead of 200 when degraded")):
+    """
+    Per-venue quote freshness, pipeline stage lag and DB pool saturation.
+    Database figures come from a snapshot refreshed every
+    health_cache_seconds, so probing every second stays cheap. Responds 200
+    unless `strict` is set and the status is degraded.
+    """
+    report = health_report()
+    status_code = 503 if strict and report["status"] != "ok" else 200
+    return FastJSONResponse(report, status_code=status_code)
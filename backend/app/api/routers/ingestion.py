@@ -2,20 +2,34 @@ import logging
 
 from fastapi import APIRouter, HTTPException
 
-from ingestion.polymarket import ingest_polymarket_sports_markets
-from ingestion.kalshi import ingest_kalshi_sports_markets
-from ingestion.kalshi_events import ingest_kalshi_events
-from ingestion.polymarket_quotes import ingest_polymarket_quotes
-from ingestion.kalshi_quotes import ingest_kalshi_quotes
+from core.rollups import update_quote_bars
+from db.session import SessionLocal
 
 
 router = APIRouter(prefix="/ingest", tags=["ingestion"], redirect_slashes=False)
 
 logger = logging.getLogger(__name__)
 
+# Ingestion modules (and the venue clients, httpx and cryptography behind
+# them) are imported inside each handler so app startup does not pay for them.
+
+
+def _roll_up_quotes() -> None:
+    # Bars lag by one ingestion at worst; a rollup failure must not fail the
+    # quote ingestion that already committed.
+    db = SessionLocal()
+    try:
+        update_quote_bars(db)
+    except Exception:
+        logger.exception("Quote bar rollup failed")
+    finally:
+        db.close()
+
 
 @router.post("/polymarket", response_model=dict)
 def trigger_polymarket_ingestion():
+    from ingestion.polymarket import ingest_polymarket_sports_markets
+
     try:
         count = ingest_polymarket_sports_markets()
         return {"source": "polymarket", "ingested_markets": count}
@@ -26,6 +40,8 @@ def trigger_polymarket_ingestion():
 
 @router.post("/kalshi", response_model=dict)
 def trigger_kalshi_ingestion():
+    from ingestion.kalshi import ingest_kalshi_sports_markets
+
     try:
         count = ingest_kalshi_sports_markets()
         return {"source": "kalshi", "ingested_markets": count}
@@ -36,6 +52,8 @@ def trigger_kalshi_ingestion():
 
 @router.post("/kalshi/events", response_model=dict)
 def trigger_kalshi_event_ingestion():
+    from ingestion.kalshi_events import ingest_kalshi_events
+
     try:
         count = ingest_kalshi_events()
         return {"source": "kalshi", "ingested_events": count}
@@ -46,8 +64,11 @@ def trigger_kalshi_event_ingestion():
 
 @router.post("/polymarket/quotes", response_model=dict)
 def trigger_polymarket_quote_ingestion():
+    from ingestion.polymarket_quotes import ingest_polymarket_quotes
+
     try:
         count = ingest_polymarket_quotes()
+        _roll_up_quotes()
         return {"source": "polymarket", "ingested_quotes": count}
     except Exception as e:
         logger.exception("Polymarket quote ingestion failed")
@@ -56,8 +77,11 @@ def trigger_polymarket_quote_ingestion():
 
 @router.post("/kalshi/quotes", response_model=dict)
 def trigger_kalshi_quote_ingestion():
+    from ingestion.kalshi_quotes import ingest_kalshi_quotes
+
     try:
         count = ingest_kalshi_quotes()
+        _roll_up_quotes()
         return {"source": "kalshi", "ingested_quotes": count}
     except Exception as e:
         logger.exception("Kalshi quote ingestion failed")
@@ -1,12 +1,13 @@
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.api.pagination import after, decode_cursor, paginate
 from db.session import get_db
 from db import models
-from mapping.engine import bulk_suggest_for_unmapped_markets
 
 
 router = APIRouter(prefix="/mapping-candidates", tags=["mapping"], redirect_slashes=False)
@@ -14,50 +15,94 @@ router = APIRouter(prefix="/mapping-candidates", tags=["mapping"], redirect_slas
 
 @router.get("", response_model=List[dict])
 def list_mapping_candidates(
+    response: Response,
     status: str = Query("pending"),
     limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
 ):
-    query = db.query(models.MappingCandidate).order_by(models.MappingCandidate.confidence_score.desc())
+    Cand = models.MappingCandidate
+    Ev = models.SportsEvent
+    # One joined select of the columns the review UI shows
+    stmt = (
+        select(
+            Cand.id,
+            Cand.market_id,
+            Cand.candidate_sports_event_id,
+            Cand.confidence_score,
+            Cand.status,
+            Cand.features_json,
+            models.Market.venue_id,
+            models.Market.question_text,
+            models.Market.parsed_sport,
+            models.Market.parsed_home_team,
+            models.Market.parsed_away_team,
+            Ev.sport,
+            Ev.home_team,
+            Ev.away_team,
+            Ev.event_start_time_utc,
+        )
+        .join(models.Market, Cand.market_id == models.Market.id)
+        .outerjoin(Ev, Cand.candidate_sports_event_id == Ev.id)
+        .order_by(Cand.confidence_score.desc(), Cand.id.desc())
+    )
     if status:
-        query = query.filter(models.MappingCandidate.status == status)
-    candidates = query.limit(limit).all()
+        stmt = stmt.where(Cand.status == status)
+    if cursor:
+        stmt = stmt.where(after((Cand.confidence_score, Cand.id), decode_cursor(cursor, float, int), descending=True))
+    rows = paginate(db.execute(stmt.limit(limit + 1)).all(), limit, response, lambda r: (float(r.confidence_score), r.id))
 
     results = []
-    for c in candidates:
-        market = c.market
-        ev = c.candidate_sports_event
+    for r in rows:
+        has_event = r.candidate_sports_event_id is not None
         results.append(
             {
-                "id": c.id,
-                "market_id": c.market_id,
-                "candidate_sports_event_id": c.candidate_sports_event_id,
-                "confidence_score": float(c.confidence_score),
-                "status": c.status,
+                "id": r.id,
+                "market_id": r.market_id,
+                "candidate_sports_event_id": r.candidate_sports_event_id,
+                "confidence_score": float(r.confidence_score),
+                "status": r.status,
                 "market": {
-                    "id": market.id,
-                    "venue_id": market.venue_id,
-                    "question_text": market.question_text,
-                    "parsed_sport": market.parsed_sport,
-                    "parsed_home_team": market.parsed_home_team,
-                    "parsed_away_team": market.parsed_away_team,
+                    "id": r.market_id,
+                    "venue_id": r.venue_id,
+                    "question_text": r.question_text,
+                    "parsed_sport": r.parsed_sport,
+                    "parsed_home_team": r.parsed_home_team,
+                    "parsed_away_team": r.parsed_away_team,
                 },
                 "sports_event": {
-                    "id": ev.id if ev else None,
-                    "sport": ev.sport if ev else None,
-                    "home_team": ev.home_team if ev else None,
-                    "away_team": ev.away_team if ev else None,
-                    "event_start_time_utc": ev.event_start_time_utc if ev else None,
+                    "id": r.candidate_sports_event_id if has_event else None,
+                    "sport": r.sport if has_event else None,
+                    "home_team": r.home_team if has_event else None,
+                    "away_team": r.away_team if has_event else None,
+                    "event_start_time_utc": r.event_start_time_utc if has_event else None,
                 },
-                "features": c.features_json or {},
+                "features": r.features_json or {},
             }
         )
     return results
 
 
 @router.post("/suggest", response_model=dict)
-def suggest_for_unmapped(limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
-    created = bulk_suggest_for_unmapped_markets(db, limit=limit)
+def suggest_for_unmapped(
+    limit: int = Query(100, ge=1, le=1000),
+    full: bool = Query(False),
+    top_k: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    # mapping.engine pulls in numpy; keep it off the startup path
+    from mapping.engine import bulk_suggest_for_unmapped_markets
+
+    created = bulk_suggest_for_unmapped_markets(db, limit=limit, full=full, top_k=top_k)
+    db.commit()
+    return {"created_candidates": created}
+
+
+@router.post("/remap", response_model=dict)
+def remap_all(top_k: int = Query(5, ge=1, le=50), db: Session = Depends(get_db)):
+    from mapping.engine import remap_all_markets
+
+    created = remap_all_markets(db, top_k=top_k)
     db.commit()
     return {"created_candidates": created}
 
@@ -1,35 +1,43 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.session import get_db
+from app.api.pagination import decode_cursor, paginate
+from app.api.responses import ROW_FORMATS, FastJSONResponse, rows_response
+from app.api.schemas import MarketOut
+from db.async_session import get_async_read_db
 from db import models
 
 router = APIRouter(prefix="/markets", tags=["markets"], redirect_slashes=False)
 
 
-@router.get("", response_model=List[dict])
-def list_markets(
+@router.get("", response_model=List[MarketOut], response_class=FastJSONResponse)
+async def list_markets(
+    response: Response,
     venue_id: Optional[str] = None,
     sport: Optional[str] = None,
-    db: Session = Depends(get_db),
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    format: str = Query("json", pattern=ROW_FORMATS),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    query = db.query(models.Market)
+    stmt = select(
+        models.Market.id,
+        models.Market.venue_id,
+        models.Market.sports_event_id,
+        models.Market.venue_market_key,
+        models.Market.market_type,
+        models.Market.question_text,
+        models.Market.status,
+    )
     if venue_id:
-        query = query.filter(models.Market.venue_id == venue_id)
+        stmt = stmt.where(models.Market.venue_id == venue_id)
     if sport:
-        query = query.join(models.SportsEvent, models.Market.sports_event).filter(models.SportsEvent.sport == sport)
-    markets = query.order_by(models.Market.id.asc()).limit(200).all()
-    return [
-        {
-            "id": m.id,
-            "venue_id": m.venue_id,
-            "sports_event_id": m.sports_event_id,
-            "venue_market_key": m.venue_market_key,
-            "market_type": m.market_type,
-            "question_text": m.question_text,
-            "status": m.status,
-        }
-        for m in markets
-    ]
+        stmt = stmt.join(models.SportsEvent, models.Market.sports_event).where(models.SportsEvent.sport == sport)
+    if cursor:
+        stmt = stmt.where(models.Market.id > decode_cursor(cursor, int)[0])
+    stmt = stmt.order_by(models.Market.id.asc()).limit(limit + 1)
+    markets = paginate((await db.execute(stmt)).all(), limit, response, lambda m: (m.id,))
+    return rows_response([m._asdict() for m in markets], response, format)
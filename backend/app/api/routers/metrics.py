@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import render_metrics
+
+
+router = APIRouter()
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+@router.get("/metrics", tags=["health"], include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
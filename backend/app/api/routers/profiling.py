@@ -0,0 +1,49 @@
+import json
+import os
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.api.profiling import PROFILES_PATH, armed, authorized, report_path
+from app.config import settings
+
+
+def require_profiling_token(request: Request) -> None:
+    if not authorized(request):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+
+
+router = APIRouter(
+    prefix=PROFILES_PATH,
+    tags=["admin"],
+    redirect_slashes=False,
+    dependencies=[Depends(require_profiling_token)],
+)
+
+
+@router.post("/arm", response_model=dict)
+def arm_profiling(path: str = Query(..., description="Request path, e.g. /arbs/scan"), count: int = Query(1, ge=1, le=100)):
+    """
+    Profile the next `count` requests to `path` in this process, for callers
+    that cannot send the X-Profile header themselves.
+    """
+    armed.arm(path, count)
+    return {"armed": armed.snapshot()}
+
+
+@router.get("", response_model=List[str])
+def list_profiles(limit: int = Query(50, ge=1, le=500)):
+    """Stored report ids, newest first."""
+    if not os.path.isdir(settings.profiling_dir):
+        return []
+    ids = sorted((f[:-5] for f in os.listdir(settings.profiling_dir) if f.endswith(".json")), reverse=True)
+    return ids[:limit]
+
+
+@router.get("/{profile_id}", response_model=dict)
+def get_profile(profile_id: str):
+    path = report_path(os.path.basename(profile_id))
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path) as f:
+        return json.load(f)
@@ -1,48 +1,180 @@
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from db.session import get_db
+from app.api.export import EXPORT_FORMATS, export_response
+from app.api.pagination import after, decode_cursor, paginate
+from app.api.responses import ROW_FORMATS, FastJSONResponse, rows_response
+from app.api.schemas import QuoteOut
+from core.rollups import get_quote_bars
+from db.async_session import get_async_read_db
+from db.session import get_read_db
 from db import models
 
 
 router = APIRouter(prefix="/quotes", tags=["quotes"], redirect_slashes=False)
 
 
-@router.get("", response_model=List[dict])
-def list_quotes(
+def _quote_select(src, quote_id):
+    """
+    One joined select of exactly the columns the quote routes return, for
+    either the quote history or quotes_latest. Columns are labelled with the
+    response field names, so a row renders as-is.
+    """
+    return (
+        select(
+            quote_id.label("quote_id"),
+            src.timestamp,
+            models.Market.venue_id,
+            models.Market.id.label("market_id"),
+            models.MarketOutcome.id.label("market_outcome_id"),
+            models.MarketOutcome.label.label("outcome_label"),
+            src.raw_price,
+            src.price_format,
+            src.share_price,
+            src.net_pnl_if_win_per_share.label("win_pnl"),
+            src.net_pnl_if_lose_per_share.label("lose_pnl"),
+        )
+        .select_from(src)
+        .join(models.MarketOutcome, src.market_outcome_id == models.MarketOutcome.id)
+        .join(models.Market, models.MarketOutcome.market_id == models.Market.id)
+    )
+
+
+@router.get("", response_model=List[QuoteOut], response_class=FastJSONResponse)
+async def list_quotes(
+    response: Response,
     market_id: Optional[int] = Query(None),
     sports_event_id: Optional[int] = Query(None),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    format: str = Query("json", pattern=ROW_FORMATS),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    query = db.query(models.Quote).join(models.MarketOutcome)
+    stmt = _quote_select(models.Quote, models.Quote.id)
     if market_id:
-        query = query.filter(models.MarketOutcome.market_id == market_id)
+        stmt = stmt.where(models.MarketOutcome.market_id == market_id)
     if sports_event_id:
-        query = query.join(models.Market, models.MarketOutcome.market).filter(
-            models.Market.sports_event_id == sports_event_id
+        stmt = stmt.where(models.Market.sports_event_id == sports_event_id)
+    if cursor:
+        stmt = stmt.where(
+            after((models.Quote.timestamp, models.Quote.id), decode_cursor(cursor, datetime, int), descending=True)
         )
 
-    quotes = query.order_by(models.Quote.timestamp.desc()).limit(limit).all()
-    results = []
-    for q in quotes:
-        mo = q.market_outcome
-        m = mo.market
-        results.append(
-            {
-                "quote_id": q.id,
-                "timestamp": q.timestamp,
-                "venue_id": m.venue_id,
-                "market_id": m.id,
-                "market_outcome_id": mo.id,
-                "outcome_label": mo.label,
-                "raw_price": float(q.raw_price) if q.raw_price is not None else None,
-                "price_format": q.price_format,
-                "share_price": float(q.share_price) if q.share_price is not None else None,
-                "win_pnl": float(q.net_pnl_if_win_per_share) if q.net_pnl_if_win_per_share is not None else None,
-                "lose_pnl": float(q.net_pnl_if_lose_per_share) if q.net_pnl_if_lose_per_share is not None else None,
-            }
+    stmt = stmt.order_by(models.Quote.timestamp.desc(), models.Quote.id.desc()).limit(limit + 1)
+    rows = paginate((await db.execute(stmt)).all(), limit, response, lambda r: (r.timestamp, r.quote_id))
+    return rows_response([r._asdict() for r in rows], response, format)
+
+
+@router.get("/latest", response_model=List[QuoteOut], response_class=FastJSONResponse)
+def list_latest_quotes(
+    response: Response,
+    market_id: Optional[int] = Query(None),
+    sports_event_id: Optional[int] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    format: str = Query("json", pattern=ROW_FORMATS),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Latest quote per outcome, read from quotes_latest rather than the full
+    quote history.
+    """
+    Latest = models.QuoteLatest
+    stmt = _quote_select(Latest, Latest.quote_id)
+    if market_id:
+        stmt = stmt.where(models.MarketOutcome.market_id == market_id)
+    if sports_event_id:
+        stmt = stmt.where(models.Market.sports_event_id == sports_event_id)
+    if cursor:
+        stmt = stmt.where(
+            after((Latest.timestamp, Latest.market_outcome_id), decode_cursor(cursor, datetime, int), descending=True)
         )
-    return results
+
+    stmt = stmt.order_by(Latest.timestamp.desc(), Latest.market_outcome_id.desc()).limit(limit + 1)
+    rows = paginate(db.execute(stmt).all(), limit, response, lambda r: (r.timestamp, r.market_outcome_id))
+    return rows_response([r._asdict() for r in rows], response, format)
+
+
+@router.get("/bars", response_model=List[dict])
+def list_quote_bars(
+    response: Response,
+    market_outcome_id: int = Query(...),
+    resolution: str = Query("1m"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    limit: int = Query(1000, ge=1, le=10000),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+):
+    """
+    OHLC bars of share_price for one outcome at 1m, 5m or 1h resolution,
+    oldest first. Without `start` this is the most recent `limit` bars and
+    has no next page; with `start`, the next-page cursor continues forward
+    in time.
+    """
+    after_ts = decode_cursor(cursor, datetime)[0] if cursor else None
+    forward = start is not None or after_ts is not None
+    try:
+        bars = get_quote_bars(
+            db,
+            market_outcome_id,
+            resolution=resolution,
+            start=start,
+            end=end,
+            limit=limit + 1 if forward else limit,
+            after=after_ts,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if forward:
+        bars = paginate(bars, limit, response, lambda b: (b.bucket_start,))
+    return [
+        {
+            "market_outcome_id": b.market_outcome_id,
+            "resolution": b.resolution,
+            "bucket_start": b.bucket_start,
+            "open": float(b.open),
+            "high": float(b.high),
+            "low": float(b.low),
+            "close": float(b.close),
+            "last_bid": float(b.last_bid) if b.last_bid is not None else None,
+            "last_ask": float(b.last_ask) if b.last_ask is not None else None,
+            "tick_count": b.tick_count,
+        }
+        for b in bars
+    ]
+
+
+@router.get("/export")
+def export_quotes(
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    venue_id: Optional[str] = Query(None),
+    sports_event_id: Optional[int] = Query(None),
+    market_outcome_id: Optional[List[int]] = Query(None),
+    format: str = Query("csv", pattern="^(" + "|".join(EXPORT_FORMATS) + ")$"),
+):
+    """
+    Stream quote history oldest first as CSV, NDJSON or Arrow IPC (stream
+    format), with the same columns as /quotes. `start`/`end` bound the
+    quote timestamp (inclusive/exclusive) and prune partitions; repeat
+    `market_outcome_id` to export several outcomes.
+    """
+    stmt = _quote_select(models.Quote, models.Quote.id)
+    if start:
+        stmt = stmt.where(models.Quote.timestamp >= start)
+    if end:
+        stmt = stmt.where(models.Quote.timestamp < end)
+    if venue_id:
+        stmt = stmt.where(models.Market.venue_id == venue_id)
+    if sports_event_id:
+        stmt = stmt.where(models.Market.sports_event_id == sports_event_id)
+    if market_outcome_id:
+        stmt = stmt.where(models.Quote.market_outcome_id.in_(market_outcome_id))
+    stmt = stmt.order_by(models.Quote.timestamp.asc(), models.Quote.id.asc())
+    return export_response(stmt, format, "quotes")
@@ -1,23 +1,36 @@
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from db.session import get_db
+from app.api.pagination import after_nulls_last, decode_cursor, paginate
+from db.async_session import get_async_read_db
+from db.session import get_read_db
 from db import models
 
 router = APIRouter(prefix="/sports-events", tags=["sports-events"], redirect_slashes=False)
 
 
 @router.get("", response_model=List[dict])
-def list_sports_events(
+async def list_sports_events(
+    response: Response,
     sport: Optional[str] = None,
-    db: Session = Depends(get_db),
+    limit: int = Query(1000, ge=1, le=5000),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    query = db.query(models.SportsEvent)
+    Ev = models.SportsEvent
+    stmt = select(Ev)
     if sport:
-        query = query.filter(models.SportsEvent.sport == sport)
-    events = query.order_by(models.SportsEvent.event_start_time_utc.asc().nullslast()).all()
+        stmt = stmt.where(Ev.sport == sport)
+    if cursor:
+        start, ev_id = decode_cursor(cursor, (datetime, type(None)), int)
+        stmt = stmt.where(after_nulls_last(Ev.event_start_time_utc, Ev.id, start, ev_id))
+    stmt = stmt.order_by(Ev.event_start_time_utc.asc().nullslast(), Ev.id.asc()).limit(limit + 1)
+    events = paginate((await db.scalars(stmt)).all(), limit, response, lambda ev: (ev.event_start_time_utc, ev.id))
     return [
         {
             "id": ev.id,
@@ -34,10 +47,21 @@ def list_sports_events(
 
 
 @router.get("/{event_id}", response_model=dict)
-def get_sports_event(event_id: int, db: Session = Depends(get_db)):
-    ev = db.query(models.SportsEvent).filter(models.SportsEvent.id == event_id).first()
+def get_sports_event(event_id: int, db: Session = Depends(get_read_db)):
+    ev = db.get(models.SportsEvent, event_id)
     if not ev:
         raise HTTPException(status_code=404, detail="Sports event not found")
+    rows = db.execute(
+        select(
+            models.Market.id,
+            models.Market.venue_id,
+            models.Market.market_type,
+            models.Market.question_text,
+            models.Market.status,
+        )
+        .where(models.Market.sports_event_id == event_id)
+        .order_by(models.Market.id)
+    ).all()
     markets = [
         {
             "id": m.id,
@@ -46,7 +70,7 @@ def get_sports_event(event_id: int, db: Session = Depends(get_db)):
             "question_text": m.question_text,
             "status": m.status,
         }
-        for m in ev.markets
+        for m in rows
     ]
     return {
         "id": ev.id,
@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+# Response schemas of the hot read routes. They document the wire format in
+# OpenAPI; the routes render rows straight to JSON (see app.api.responses)
+# rather than validating every row against them.
+
+
+class QuoteOut(BaseModel):
+    quote_id: int
+    timestamp: datetime
+    venue_id: str
+    market_id: int
+    market_outcome_id: int
+    outcome_label: str
+    raw_price: Optional[float]
+    price_format: Optional[str]
+    share_price: Optional[float]
+    win_pnl: Optional[float]
+    lose_pnl: Optional[float]
+
+
+class MarketOut(BaseModel):
+    id: int
+    venue_id: str
+    sports_event_id: Optional[int]
+    venue_market_key: str
+    market_type: str
+    question_text: str
+    status: str
+
+
+class ArbOut(BaseModel):
+    id: int
+    sports_event_id: int
+    market_type: str
+    outcome_group: Optional[str]
+    detected_at: datetime
+    num_outcomes: int
+    total_stake: float
+    worst_case_pnl: float
+    best_case_pnl: float
+    worst_case_roi: float
+    status: str
+    oldest_quote_at: Optional[datetime]
+    quote_age_ms: Optional[int]
+
+
+class ArbLegOut(BaseModel):
+    venue_id: str
+    market_outcome_id: int
+    outcome_label: str
+    stake_shares: float
+    share_price: float
+    win_pnl_per_share: float
+    lose_pnl_per_share: float
+    source_quote_id: Optional[int]
+    quote_timestamp: Optional[datetime]
+    quote_fetched_at: Optional[datetime]
+    quote_written_at: Optional[datetime]
+
+
+class ArbDetailOut(ArbOut):
+    legs: List[ArbLegOut]
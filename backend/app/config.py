@@ -4,6 +4,24 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: AnyUrl = "postgresql+psycopg2://sentiment_arb_user:sentiment_arb_password@db:5432/sentiment_arb"
+    # Optional replica for read-only API routes; defaults to database_url with its own pool
+    database_read_url: AnyUrl | None = None
+
+    # Check the schema against head at startup and migrate (under a lock) if behind
+    run_migrations_on_startup: bool = True
+
+    # Write pool: ingestion, mapping, scans, migrations-adjacent jobs
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_statement_timeout_ms: int = 0  # 0 = no limit
+    # Read pool: GET routes for dashboards
+    db_read_pool_size: int = 5
+    db_read_max_overflow: int = 10
+    db_read_statement_timeout_ms: int = 15000
+    # Shared by both pools
+    db_pool_timeout: float = 10.0  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
 
     # Polymarket CLOB API base. Default to clob.polymarket.com which is the current public endpoint.
     polymarket_api_base: str = "https://clob.polymarket.com"
@@ -18,6 +36,51 @@ class Settings(BaseSettings):
     min_total_stake: float = 10.0
     max_stake_per_leg: float = 50.0
 
+    # Minimum character-trigram similarity for fuzzy team-name matches in mapping
+    mapping_fuzzy_threshold: float = 0.6
+    # Mapping confidence = team * team_score + time * time_score + league * league_score
+    mapping_team_weight: float = 0.6
+    mapping_time_weight: float = 0.3
+    mapping_league_weight: float = 0.1
+    # Incremental mapping re-reads markets updated this long before its
+    # watermark, catching writes that committed after a run had passed them
+    mapping_watermark_overlap_seconds: int = 300
+
+    # Quote history partitioning and retention (see db.partitions)
+    quotes_partition_interval: str = "week"  # or "day"
+    quotes_partitions_ahead: int = 4
+    quotes_retention_days: int = 180
+    quotes_retention_mode: str = "detach"  # or "drop"
+
+    # Parquet archive of closed days (see db.archive)
+    archive_dir: str = "data/archive"
+    archive_lag_days: int = 1  # extra days before a day counts as closed
+
+    # In-process cache for GET /sports-events, /markets and /arbs (see app.api.cache)
+    response_cache_ttl_seconds: float = 30.0  # 0 disables
+    response_cache_max_entries: int = 1024
+
+    # GET /arbs/stream server push (see app.api.arb_stream)
+    arb_stream_heartbeat_seconds: float = 15.0
+    arb_stream_queue_size: int = 1000  # events buffered per client before it is dropped
+    arb_stream_backfill_limit: int = 1000  # max opportunities replayed on resume
+
+    # GET /quotes/export (see app.api.export)
+    export_batch_size: int = 10000  # rows fetched per server-side cursor round trip
+
+    # Opt-in per-request profiling (see app.api.profiling); off unless a token is set
+    profiling_token: str | None = None
+    profiling_interval_ms: float = 5.0  # stack sampling interval
+    profiling_max_samples: int = 20000
+    profiling_dir: str = "data/profiles"
+
+    # GET /health (see app.api.health_checks); probed every second by the load balancer
+    health_cache_seconds: float = 5.0  # database-backed figures are refreshed at most this often
+    health_query_timeout_ms: int = 2000
+    health_fresh_seconds: float = 60.0  # a market is fresh if an outcome was quoted this recently
+    health_max_quote_age_seconds: float = 300.0  # degraded if a venue with open markets wrote nothing since
+    health_max_pool_saturation: float = 0.9  # degraded at this share of pool capacity checked out
+
     class Config:
         env_prefix = ""
         env_file = ".env"
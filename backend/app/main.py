@@ -1,18 +1,20 @@
 import logging
-import os
 
-from alembic import command
-from alembic.config import Config
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routers.health import router as health_router
+from app.api.routers.metrics import router as metrics_router
+from app.api.routers.profiling import router as profiling_router
 from app.api.routers.ingestion import router as ingestion_router
 from app.api.routers.mapping_candidates import router as mapping_candidates_router
 from app.api.routers.sports_events import router as sports_events_router
 from app.api.routers.markets import router as markets_router
 from app.api.routers.quotes import router as quotes_router
 from app.api.routers.arbs import router as arbs_router
+from app.api.cache import ResponseCacheMiddleware, change_listener
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.profiling import PROFILE_ID_HEADER, ProfilingMiddleware
 from app.config import settings
 
 
@@ -21,6 +23,12 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Sports Pure Arb Backend", version="0.1.0")
 
+# Added before CORS so it sits inside it: cached responses never carry
+# another origin's CORS headers.
+app.add_middleware(ResponseCacheMiddleware)
+# Outside the cache so a profiled request that hits it shows as such
+app.add_middleware(ProfilingMiddleware)
+
 # CORS for local dev (frontend on 5173)
 app.add_middleware(
     CORSMiddleware,
@@ -28,19 +36,53 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, PROFILE_ID_HEADER],
 )
 
 
 @app.on_event("startup")
 def run_migrations() -> None:
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    alembic_cfg_path = os.path.join(base_dir, "alembic.ini")
-    alembic_cfg = Config(alembic_cfg_path)
-    alembic_cfg.set_main_option("sqlalchemy.url", settings.database_url.unicode_string())
-    logger.info("Running database migrations at startup...")
-    command.upgrade(alembic_cfg, "head")
+    from db.session import SessionLocal, engine
+
+    if settings.run_migrations_on_startup:
+        from db.migrations import upgrade_if_needed
+
+        if not upgrade_if_needed(engine):
+            logger.info("Database schema is at head; skipping migrations")
+
+    # Keep a few quote partitions ahead of ingestion; retention runs from cron
+    # via `python -m db.partitions`.
+    from db.partitions import ensure_quote_partitions
+
+    db = SessionLocal()
+    try:
+        created = ensure_quote_partitions(db)
+        if created:
+            logger.info("Created quote partitions: %s", ", ".join(created))
+    except Exception:
+        logger.exception("Could not ensure quote partitions")
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+async def listen_for_data_changes() -> None:
+    if settings.response_cache_ttl_seconds > 0:
+        change_listener.start()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine() -> None:
+    from app.api.arb_stream import broadcaster
+    from db.async_session import async_read_engine
+
+    await change_listener.close()
+    await broadcaster.close()
+    await async_read_engine.dispose()
 
 app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(profiling_router)
 app.include_router(ingestion_router)
 app.include_router(sports_events_router)
 app.include_router(markets_router)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List, Optional, Tuple
+
+from db.query_counter import assert_max_queries
+
+
+# (path, max queries). "{arb}" / "{event}" are filled from the first row of
+# the corresponding list route; checks whose placeholder has no data are
+# skipped.
+BUDGETS: List[Tuple[str, int]] = [
+    ("/quotes?limit=500", 1),
+    ("/quotes/latest?limit=500", 1),
+    ("/arbs?limit=200", 1),
+    ("/arbs/{arb}", 2),
+    ("/markets?limit=1000", 1),
+    ("/sports-events", 1),
+    ("/sports-events/{event}", 2),
+    ("/mapping-candidates?status=&limit=500", 1),
+]
+
+
+def check_budgets(client) -> Tuple[List[str], List[str]]:
+    """
+    Request each route through `client` (a TestClient over the app) and
+    return (failures, skipped). Queries are counted across the application's
+    sync and async engines.
+    """
+    ids = {}
+    for key, path in (("arb", "/arbs?limit=1"), ("event", "/sports-events?limit=1")):
+        rows = client.get(path).json()
+        ids[key] = rows[0]["id"] if rows else None
+
+    failures: List[str] = []
+    skipped: List[str] = []
+    for template, limit in BUDGETS:
+        try:
+            path = template.format(**ids)
+        except KeyError:
+            path = template
+        if "None" in path:
+            skipped.append(template)
+            continue
+        try:
+            with assert_max_queries(limit):
+                resp = client.get(path)
+            if resp.status_code != 200:
+                failures.append(f"{path}: HTTP {resp.status_code}")
+        except AssertionError as e:
+            failures.append(f"{path}: {e}")
+    return failures, skipped
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    parser = argparse.ArgumentParser(description="Assert per-route query counts against the configured database.")
+    parser.parse_args(argv)
+
+    with TestClient(app) as client:
+        failures, skipped = check_budgets(client)
+    for s in skipped:
+        print(f"SKIP {s} (no data)")
+    for f in failures:
+        print(f"FAIL {f}")
+    if failures:
+        sys.exit(1)
+    print("All routes within their query budgets")
+
+
+if __name__ == "__main__":
+    main()
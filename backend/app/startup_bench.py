@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+
+# Runs in a fresh interpreter so every sample pays the cold-import cost a new
+# worker would.
+_PROBE = """
+import asyncio, json, time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+asyncio.run(app.router.startup())
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "startup_ms": (t2 - t1) * 1000}))
+"""
+
+
+def measure(runs: int = 5) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {"import_ms": [], "startup_ms": [], "total_ms": []}
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True).stdout
+        row = json.loads(out.strip().splitlines()[-1])
+        samples["import_ms"].append(row["import_ms"])
+        samples["startup_ms"].append(row["startup_ms"])
+        samples["total_ms"].append(row["import_ms"] + row["startup_ms"])
+    return samples
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure cold app import and startup-hook time (migration check, partition upkeep)."
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for name, values in measure(args.runs).items():
+        print(f"{name:>10}: median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,16 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 
 from app.config import settings
+from core.arb_events import CLOSED, OPENED, event_sport, next_event_seq, opp_payload, queue_arb_event
+from core.metrics import DETECT_SECONDS, OPPORTUNITIES_CLOSED, OPPORTUNITIES_RECORDED, SCAN_SECONDS
 from db import models, models_arbs
+from db.watermarks import lock_watermark, set_watermark
+
+
+SCAN_WATERMARK = "scan.arbs"
 
 
 @dataclass
@@ -21,32 +26,44 @@ class Leg:
     lose_pnl: float
     quote_id: Optional[int]
     effective_cost: float
+    # Source quote timings for latency tracing; unset in replay
+    quote_timestamp: Optional[datetime] = None
+    fetched_at: Optional[datetime] = None
+    written_at: Optional[datetime] = None
+
+
+@dataclass
+class ArbCandidate:
+    market_type: str
+    outcome_group: str
+    legs: List[Leg]
+    stakes: List[float]
+    pnls: List[float]
+    total_stake: float
+    worst_case_pnl: float
+    best_case_pnl: float
+    worst_case_roi: float
 
 
-def _latest_quotes_for_outcomes(db: Session, outcome_ids: List[int]) -> Dict[int, models.Quote]:
+OUTCOME_LABELS = ("home_win", "away_win", "draw", "over", "under", "yes", "no")
+
+# (market_type, outcome_group, label_a, label_b)
+TWO_WAY_GROUPS = (
+    ("moneyline", "home_away", "home_win", "away_win"),
+    ("binary", "yes_no", "yes", "no"),
+    ("total", "over_under", "over", "under"),
+)
+
+
+def _latest_quotes_for_outcomes(db: Session, outcome_ids: List[int]) -> Dict[int, models.QuoteLatest]:
     """
     Return latest quote per market_outcome_id from the `outcome_ids`.
+    Reads the trigger-maintained quotes_latest table, so cost does not grow
+    with quote history.
     """
     if not outcome_ids:
         return {}
-    subq = (
-        db.query(
-            models.Quote.market_outcome_id,
-            func.max(models.Quote.timestamp).label("max_ts"),
-        )
-        .filter(models.Quote.market_outcome_id.in_(outcome_ids))
-        .group_by(models.Quote.market_outcome_id)
-        .subquery()
-    )
-    rows = (
-        db.query(models.Quote)
-        .join(
-            subq,
-            (models.Quote.market_outcome_id == subq.c.market_outcome_id)
-            & (models.Quote.timestamp == subq.c.max_ts),
-        )
-        .all()
-    )
+    rows = db.query(models.QuoteLatest).filter(models.QuoteLatest.market_outcome_id.in_(outcome_ids)).all()
     return {q.market_outcome_id: q for q in rows}
 
 
@@ -55,29 +72,66 @@ def _effective_cost(share_price: float, lose_pnl: float) -> float:
     return max(share_price, abs(lose_pnl))
 
 
-def _select_best_leg(outcomes: List[models.MarketOutcome], quotes_map: Dict[int, models.Quote]) -> Optional[Leg]:
+def _make_leg(
+    venue_id: str,
+    market_outcome_id: int,
+    outcome_label: str,
+    quote_id: Optional[int],
+    share_price,
+    win_pnl,
+    lose_pnl,
+    quote_timestamp: Optional[datetime] = None,
+    fetched_at: Optional[datetime] = None,
+    written_at: Optional[datetime] = None,
+) -> Optional[Leg]:
+    if share_price is None or win_pnl is None or lose_pnl is None:
+        return None
+    share_price = float(share_price)
+    lose_pnl = float(lose_pnl)
+    return Leg(
+        venue_id=venue_id,
+        market_outcome_id=market_outcome_id,
+        outcome_label=outcome_label,
+        share_price=share_price,
+        win_pnl=float(win_pnl),
+        lose_pnl=lose_pnl,
+        quote_id=quote_id,
+        effective_cost=_effective_cost(share_price, lose_pnl),
+        quote_timestamp=quote_timestamp,
+        fetched_at=fetched_at,
+        written_at=written_at,
+    )
+
+
+def _cheapest_leg(legs: List[Leg]) -> Optional[Leg]:
     best = None
+    for leg in legs:
+        if best is None or leg.effective_cost < best.effective_cost:
+            best = leg
+    return best
+
+
+def _select_best_leg(outcomes: List[models.MarketOutcome], quotes_map: Dict[int, models.QuoteLatest]) -> Optional[Leg]:
+    legs = []
     for mo in outcomes:
         q = quotes_map.get(mo.id)
-        if not q or q.share_price is None or q.net_pnl_if_win_per_share is None or q.net_pnl_if_lose_per_share is None:
+        if not q:
             continue
-        share_price = float(q.share_price)
-        win_pnl = float(q.net_pnl_if_win_per_share)
-        lose_pnl = float(q.net_pnl_if_lose_per_share)
-        eff_cost = _effective_cost(share_price, lose_pnl)
-        leg = Leg(
-            venue_id=mo.market.venue_id,
-            market_outcome_id=mo.id,
-            outcome_label=mo.label,
-            share_price=share_price,
-            win_pnl=win_pnl,
-            lose_pnl=lose_pnl,
-            quote_id=q.id,
-            effective_cost=eff_cost,
+        leg = _make_leg(
+            mo.market.venue_id,
+            mo.id,
+            mo.label,
+            q.quote_id,
+            q.share_price,
+            q.net_pnl_if_win_per_share,
+            q.net_pnl_if_lose_per_share,
+            quote_timestamp=q.timestamp,
+            fetched_at=q.fetched_at,
+            written_at=q.written_at,
         )
-        if best is None or leg.effective_cost < best.effective_cost:
-            best = leg
-    return best
+        if leg:
+            legs.append(leg)
+    return _cheapest_leg(legs)
 
 
 def _solve_2way(leg_a: Leg, leg_b: Leg) -> Optional[Tuple[float, float, float, float]]:
@@ -131,6 +185,177 @@ def _check_equal_stakes_3way(legs: List[Leg]) -> Optional[Tuple[List[float], Lis
     return None
 
 
+def _build_candidate(
+    market_type: str, outcome_group: str, legs: List[Leg], stakes: List[float], pnls: List[float]
+) -> Optional[ArbCandidate]:
+    total_stake = sum(stakes[i] * legs[i].effective_cost for i in range(len(legs)))
+    if total_stake <= 0:
+        return None
+    worst = min(pnls)
+    roi = worst / total_stake
+    if roi < settings.min_worst_case_roi or total_stake < settings.min_total_stake:
+        return None
+    return ArbCandidate(
+        market_type=market_type,
+        outcome_group=outcome_group,
+        legs=legs,
+        stakes=stakes,
+        pnls=pnls,
+        total_stake=total_stake,
+        worst_case_pnl=worst,
+        best_case_pnl=max(pnls),
+        worst_case_roi=roi,
+    )
+
+
+def find_arbs(legs_by_label: Dict[str, Leg]) -> List[ArbCandidate]:
+    """
+    Pure detection step: given the best leg per outcome label, return every
+    arb that clears the configured ROI / stake thresholds. No DB access, so it
+    can be reused by the live scanner and by historical replay.
+    """
+    found: List[ArbCandidate] = []
+
+    for market_type, outcome_group, label_a, label_b in TWO_WAY_GROUPS:
+        if label_a in legs_by_label and label_b in legs_by_label:
+            a = legs_by_label[label_a]
+            b = legs_by_label[label_b]
+            solved = _solve_2way(a, b)
+            if solved:
+                x_a, x_b, pnl_a, pnl_b = solved
+                cand = _build_candidate(market_type, outcome_group, [a, b], [x_a, x_b], [pnl_a, pnl_b])
+                if cand:
+                    found.append(cand)
+
+    # 3-way: home/draw/away (simple heuristic: equal stakes, all PnL >= 0)
+    if all(k in legs_by_label for k in ("home_win", "draw", "away_win")):
+        legs = [legs_by_label["home_win"], legs_by_label["draw"], legs_by_label["away_win"]]
+        check = _check_equal_stakes_3way(legs)
+        if check:
+            stakes, pnls = check
+            cand = _build_candidate("moneyline", "home_draw_away", legs, stakes, pnls)
+            if cand:
+                found.append(cand)
+
+    return found
+
+
+def record_opp(
+    db: Session,
+    sports_event_id: int,
+    cand: ArbCandidate,
+    detection_version: str = "v1",
+) -> models_arbs.ArbitrageOpportunity:
+    detected_at = datetime.utcnow()
+    quote_times = [leg.quote_timestamp for leg in cand.legs if leg.quote_timestamp is not None]
+    oldest_quote_at = min(quote_times) if quote_times else None
+    opp = models_arbs.ArbitrageOpportunity(
+        sports_event_id=sports_event_id,
+        market_type=cand.market_type,
+        outcome_group=cand.outcome_group,
+        detected_at=detected_at,
+        num_outcomes=len(cand.legs),
+        total_stake=cand.total_stake,
+        worst_case_pnl=cand.worst_case_pnl,
+        best_case_pnl=cand.best_case_pnl,
+        worst_case_roi=cand.worst_case_roi,
+        status="open",
+        detection_version=detection_version,
+        opened_seq=next_event_seq(db),
+        oldest_quote_at=oldest_quote_at,
+        quote_age_ms=int((detected_at - oldest_quote_at).total_seconds() * 1000) if oldest_quote_at else None,
+    )
+    db.add(opp)
+    db.flush()
+    legs: List[models_arbs.ArbitrageLeg] = []
+    for leg, stake in zip(cand.legs, cand.stakes):
+        legs.append(
+            models_arbs.ArbitrageLeg(
+                arbitrage_opportunity_id=opp.id,
+                venue_id=leg.venue_id,
+                market_outcome_id=leg.market_outcome_id,
+                outcome_label=leg.outcome_label,
+                stake_shares=stake,
+                share_price=leg.share_price,
+                win_pnl_per_share=leg.win_pnl,
+                lose_pnl_per_share=leg.lose_pnl,
+                source_quote_id=leg.quote_id,
+                quote_timestamp=leg.quote_timestamp,
+                quote_fetched_at=leg.fetched_at,
+                quote_written_at=leg.written_at,
+            )
+        )
+    db.add_all(legs)
+    OPPORTUNITIES_RECORDED.inc(market_type=cand.market_type)
+    queue_arb_event(db, opp_payload(opp, OPENED, event_sport(db, sports_event_id), legs))
+    return opp
+
+
+def _priced_at(pairs) -> Tuple[Tuple[int, float], ...]:
+    # What an opportunity was priced at: (market_outcome_id, share price) per
+    # leg, at the precision arbitrage_legs stores. Ingestion writes a new quote
+    # on every poll, so quote ids change while the arb itself does not.
+    return tuple(sorted((outcome_id, round(float(price), 8)) for outcome_id, price in pairs))
+
+
+def close_opp(db: Session, op: models_arbs.ArbitrageOpportunity, sport: Optional[str]) -> None:
+    op.status = "closed"
+    op.closed_at = datetime.utcnow()
+    op.closed_seq = next_event_seq(db)
+    OPPORTUNITIES_CLOSED.inc()
+    queue_arb_event(db, opp_payload(op, CLOSED, sport))
+
+
+def sync_event_opps(
+    db: Session, sports_event_id: int, live: List[ArbCandidate]
+) -> List[models_arbs.ArbitrageOpportunity]:
+    """
+    Bring the event's open opportunities in line with `live`, the candidates
+    found by this scan, and return the ones newly recorded.
+
+    An open opportunity on the same outcomes at the same prices as a live
+    candidate is the same arb and stays open untouched, so a persisting arb
+    keeps one row and one "opened" event however many times its quotes are
+    re-polled. Open opportunities with no live candidate, or superseded
+    because a leg's price moved, are closed first; a candidate without a
+    matching open row is then recorded.
+    """
+    Opp = models_arbs.ArbitrageOpportunity
+    open_opps = (
+        db.query(Opp)
+        .options(selectinload(Opp.legs))
+        .filter(Opp.sports_event_id == sports_event_id, Opp.status == "open")
+        .all()
+    )
+
+    by_key: Dict[Tuple, models_arbs.ArbitrageOpportunity] = {}
+    for op in open_opps:
+        priced = _priced_at((l.market_outcome_id, l.share_price) for l in op.legs)
+        key = (op.market_type, op.outcome_group, priced)
+        # Duplicates left by earlier scans collapse onto the oldest row
+        if key not in by_key or op.id < by_key[key].id:
+            by_key[key] = op
+
+    to_record: List[ArbCandidate] = []
+    kept = set()
+    for cand in live:
+        priced = _priced_at((l.market_outcome_id, l.share_price) for l in cand.legs)
+        key = (cand.market_type, cand.outcome_group, priced)
+        op = by_key.get(key)
+        if op is None:
+            to_record.append(cand)
+        else:
+            kept.add(op.id)
+
+    stale = [op for op in open_opps if op.id not in kept]
+    if stale:
+        sport = event_sport(db, sports_event_id)
+        for op in stale:
+            close_opp(db, op, sport)
+    return [record_opp(db, sports_event_id, cand) for cand in to_record]
+
+
+@DETECT_SECONDS.timed()
 def detect_arbs_for_event(db: Session, ev: models.SportsEvent) -> List[models_arbs.ArbitrageOpportunity]:
     """
     Detect pure back-all-outcomes arbs for a sports event.
@@ -151,97 +376,31 @@ def detect_arbs_for_event(db: Session, ev: models.SportsEvent) -> List[models_ar
 
     # Group by outcome label
     legs_by_label: Dict[str, Leg] = {}
-    for label in ["home_win", "away_win", "draw", "over", "under", "yes", "no"]:
+    for label in OUTCOME_LABELS:
         related = [mo for mo in all_outcomes if mo.label == label]
         leg = _select_best_leg(related, quotes_map)
         if leg:
             legs_by_label[label] = leg
 
-    # Helper to create opp
-    def record_opp(market_type: str, outcome_group: str, legs: List[Leg], stakes: List[float], pnls: List[float]):
-        total_stake = sum(stakes[i] * legs[i].effective_cost for i in range(len(legs)))
-        worst = min(pnls)
-        best = max(pnls)
-        if total_stake <= 0:
-            return
-        roi = worst / total_stake
-        if roi < settings.min_worst_case_roi or total_stake < settings.min_total_stake:
-            return
-
-        opp = models_arbs.ArbitrageOpportunity(
-            sports_event_id=ev.id,
-            market_type=market_type,
-            outcome_group=outcome_group,
-            detected_at=datetime.utcnow(),
-            num_outcomes=len(legs),
-            total_stake=total_stake,
-            worst_case_pnl=worst,
-            best_case_pnl=best,
-            worst_case_roi=roi,
-            status="open",
-            detection_version="v1",
-        )
-        db.add(opp)
-        db.flush()
-        for leg, stake in zip(legs, stakes):
-            db.add(
-                models_arbs.ArbitrageLeg(
-                    arbitrage_opportunity_id=opp.id,
-                    venue_id=leg.venue_id,
-                    market_outcome_id=leg.market_outcome_id,
-                    outcome_label=leg.outcome_label,
-                    stake_shares=stake,
-                    share_price=leg.share_price,
-                    win_pnl_per_share=leg.win_pnl,
-                    lose_pnl_per_share=leg.lose_pnl,
-                    source_quote_id=leg.quote_id,
-                )
-            )
-        opportunities.append(opp)
-
-    # 2-way: home/away
-    if "home_win" in legs_by_label and "away_win" in legs_by_label:
-        a = legs_by_label["home_win"]
-        b = legs_by_label["away_win"]
-        solved = _solve_2way(a, b)
-        if solved:
-            x_a, x_b, pnl_a, pnl_b = solved
-            record_opp("moneyline", "home_away", [a, b], [x_a, x_b], [pnl_a, pnl_b])
-
-    # 2-way yes/no
-    if "yes" in legs_by_label and "no" in legs_by_label:
-        a = legs_by_label["yes"]
-        b = legs_by_label["no"]
-        solved = _solve_2way(a, b)
-        if solved:
-            x_a, x_b, pnl_a, pnl_b = solved
-            record_opp("binary", "yes_no", [a, b], [x_a, x_b], [pnl_a, pnl_b])
-
-    # 2-way over/under
-    if "over" in legs_by_label and "under" in legs_by_label:
-        a = legs_by_label["over"]
-        b = legs_by_label["under"]
-        solved = _solve_2way(a, b)
-        if solved:
-            x_a, x_b, pnl_a, pnl_b = solved
-            record_opp("total", "over_under", [a, b], [x_a, x_b], [pnl_a, pnl_b])
-
-    # 3-way: home/draw/away (simple heuristic: equal stakes, all PnL >= 0)
-    if all(k in legs_by_label for k in ("home_win", "draw", "away_win")):
-        legs = [legs_by_label["home_win"], legs_by_label["draw"], legs_by_label["away_win"]]
-        check = _check_equal_stakes_3way(legs)
-        if check:
-            stakes, pnls = check
-            record_opp("moneyline", "home_draw_away", legs, stakes, pnls)
-
-    return opportunities
+    return sync_event_opps(db, ev.id, find_arbs(legs_by_label))
 
 
+@SCAN_SECONDS.timed()
 def scan_all_events_for_arbs(db: Session) -> int:
+    """
+    Scan every event and return how many opportunities were newly opened.
+    Scans are serialized on the scan watermark row, so two of them (e.g. the
+    API and a scheduled CLI run) cannot both open the same arb.
+    """
+    lock_watermark(db, SCAN_WATERMARK)
+    started_at = datetime.utcnow()
     events = db.query(models.SportsEvent).all()
     total = 0
     for ev in events:
         ops = detect_arbs_for_event(db, ev)
         total += len(ops)
+    # Records the completed scan for /health stage lag; the position is the
+    # time the scan started, i.e. the newest quotes it could have seen
+    set_watermark(db, SCAN_WATERMARK, started_at, None)
     db.commit()
     return total
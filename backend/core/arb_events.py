@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from db import models, models_arbs
+
+
+# Postgres NOTIFY channel carrying opened/closed opportunities to every
+# process with stream subscribers (see app.api.arb_stream).
+CHANNEL = "arb_events"
+
+OPENED = "opened"
+CLOSED = "closed"
+
+_QUEUE_KEY = "arb_events"
+
+
+def opp_payload(
+    opp: models_arbs.ArbitrageOpportunity,
+    kind: str,
+    sport: Optional[str],
+    legs: Optional[List[models_arbs.ArbitrageLeg]] = None,
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "kind": kind,
+        "seq": opp.opened_seq if kind == OPENED else opp.closed_seq,
+        "id": opp.id,
+        "sports_event_id": opp.sports_event_id,
+        "sport": sport,
+        "market_type": opp.market_type,
+        "outcome_group": opp.outcome_group,
+        "detected_at": opp.detected_at.isoformat() if opp.detected_at else None,
+        "total_stake": float(opp.total_stake),
+        "worst_case_pnl": float(opp.worst_case_pnl),
+        "worst_case_roi": float(opp.worst_case_roi),
+        "quote_age_ms": opp.quote_age_ms,
+        "status": opp.status,
+    }
+    if legs is not None:
+        payload["legs"] = [
+            {
+                "venue_id": l.venue_id,
+                "market_outcome_id": l.market_outcome_id,
+                "outcome_label": l.outcome_label,
+                "stake_shares": float(l.stake_shares),
+                "share_price": float(l.share_price),
+                "source_quote_id": l.source_quote_id,
+            }
+            for l in legs
+        ]
+    return payload
+
+
+def queue_arb_event(db: Session, payload: Dict[str, Any]) -> None:
+    """
+    Queue an event on the session. It is sent with NOTIFY inside the same
+    transaction right before commit, so subscribers only ever hear about
+    committed opportunities and a rollback sends nothing.
+    """
+    db.info.setdefault(_QUEUE_KEY, []).append(payload)
+
+
+def next_event_seq(db: Session) -> int:
+    """Next stream event id; see models_arbs.ARB_EVENT_SEQ."""
+    return db.scalar(select(models_arbs.ARB_EVENT_SEQ.next_value()))
+
+
+def event_sport(db: Session, sports_event_id: int) -> Optional[str]:
+    ev = db.get(models.SportsEvent, sports_event_id)
+    return ev.sport if ev else None
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_queued(session: Session) -> None:
+    queued = session.info.pop(_QUEUE_KEY, None)
+    if not queued:
+        return
+    # Ids are only final after the flush
+    session.flush()
+    for payload in queued:
+        session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANNEL, "payload": json.dumps(payload, separators=(",", ":"))},
+        )
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_queued(session: Session, previous_transaction) -> None:
+    session.info.pop(_QUEUE_KEY, None)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import extract, func, select
+from sqlalchemy.orm import Session
+
+from db import models_arbs
+
+
+_Opp = models_arbs.ArbitrageOpportunity
+_Leg = models_arbs.ArbitrageLeg
+
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def _ms(later, earlier):
+    return extract("epoch", later - earlier) * 1000
+
+
+# Pipeline stages of a leg's source quote, in order. quote_age spans all of
+# them: how old the venue price was when the scan acted on it.
+STAGES = {
+    "venue_to_fetch": _ms(_Leg.quote_fetched_at, _Leg.quote_timestamp),
+    "fetch_to_write": _ms(_Leg.quote_written_at, _Leg.quote_fetched_at),
+    "write_to_detect": _ms(_Opp.detected_at, _Leg.quote_written_at),
+    "quote_age": _ms(_Opp.detected_at, _Leg.quote_timestamp),
+}
+
+
+def _distribution(expr) -> List:
+    cols = [func.count(expr)]
+    cols += [func.percentile_cont(p).within_group(expr) for p in PERCENTILES]
+    cols.append(func.max(expr))
+    return cols
+
+
+def _as_dict(values) -> Dict[str, Optional[float]]:
+    count, *rest = values
+    keys = [f"p{int(p * 100)}" for p in PERCENTILES] + ["max"]
+    out: Dict[str, Optional[float]] = {"count": count}
+    out.update({k: round(float(v), 1) if v is not None else None for k, v in zip(keys, rest)})
+    return out
+
+
+def latency_summary(db: Session, start: datetime, end: datetime) -> Dict[str, Any]:
+    """
+    Latency distributions (ms) for opportunities detected in [start, end):
+    the stalest-leg quote age per opportunity, and each pipeline stage of the
+    legs' source quotes overall and per venue. Legs recorded before latency
+    tracing, or whose quotes lack a timing, are left out of that stage.
+    """
+    window = (_Opp.detected_at >= start, _Opp.detected_at < end)
+
+    opp_count, *opp_row = db.execute(
+        select(func.count(), *_distribution(_Opp.quote_age_ms)).select_from(_Opp).where(*window)
+    ).one()
+
+    stage_cols = []
+    for expr in STAGES.values():
+        stage_cols.extend(_distribution(expr))
+    per_stage = len(stage_cols) // len(STAGES)
+    rows = db.execute(
+        select(_Leg.venue_id, func.grouping(_Leg.venue_id).label("is_total"), *stage_cols)
+        .join(_Opp, _Leg.arbitrage_opportunity_id == _Opp.id)
+        .where(*window)
+        .group_by(func.rollup(_Leg.venue_id))
+    ).all()
+
+    overall: Dict[str, Any] = {}
+    by_venue: Dict[str, Any] = {}
+    for row in rows:
+        values = list(row)[2:]
+        stages = {
+            name: _as_dict(values[i * per_stage : (i + 1) * per_stage]) for i, name in enumerate(STAGES)
+        }
+        if row.is_total:
+            overall = stages
+        else:
+            by_venue[row.venue_id] = stages
+
+    return {
+        "start": start,
+        "end": end,
+        "opportunities": opp_count,
+        "opportunity_quote_age_ms": _as_dict(opp_row),
+        "stages_ms": overall,
+        "stages_ms_by_venue": by_venue,
+    }
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+# Minimal in-process metrics rendered in the Prometheus text format by
+# GET /metrics. Values are per process: with several workers each one is
+# scraped (or summed) separately.
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List["_Metric"] = []
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{self._labels(key)} {value}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_max(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            if value > self._values.get(key, float("-inf")):
+                self._values[key] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{self._labels(key)} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][i] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall time of the block, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """Decorator form of `time`."""
+
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % ("+Inf" if bound == float("inf") else repr(bound))
+                yield f"{self.name}_bucket{self._labels(key, le)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {total}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+
+def ingestion_job(job: str):
+    """
+    Decorator for ingestion entry points returning a row count: records run
+    duration, rows written and failures under `job`.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with INGESTION_SECONDS.time(job=job):
+                try:
+                    rows = fn(*args, **kwargs)
+                except Exception:
+                    INGESTION_FAILURES.inc(job=job)
+                    raise
+            INGESTION_ROWS.inc(rows, job=job)
+            return rows
+
+        return wrapper
+
+    return decorator
+
+
+def render_metrics() -> str:
+    return "\n".join(m.render() for m in _registry) + "\n"
+
+
+# Pipeline metrics. Venue request and ingestion metrics are labelled by venue
+# ("kalshi", "polymarket") or ingestion job; the rest by stage.
+
+VENUE_REQUEST_SECONDS = Histogram(
+    "arb_venue_request_seconds", "Latency of HTTP requests to venue APIs.", ("venue",)
+)
+VENUE_REQUEST_ERRORS = Counter(
+    "arb_venue_request_errors_total", "Venue API requests that failed or returned an error status.", ("venue",)
+)
+VENUE_RATE_LIMIT_SLEEP_SECONDS = Counter(
+    "arb_venue_rate_limit_sleep_seconds_total", "Time spent sleeping in client-side venue rate limits.", ("venue",)
+)
+INGESTION_SECONDS = Histogram(
+    "arb_ingestion_seconds", "Duration of an ingestion run, fetch through commit.", ("job",)
+)
+INGESTION_ROWS = Counter("arb_ingestion_rows_total", "Rows written by ingestion runs.", ("job",))
+INGESTION_FAILURES = Counter("arb_ingestion_failures_total", "Ingestion runs that raised.", ("job",))
+QUOTES_WRITTEN = Counter("arb_quotes_written_total", "Quote rows created.", ("venue",))
+QUOTE_CREATE_SECONDS = Histogram(
+    "arb_quote_create_seconds",
+    "Time to normalize and stage the quotes of one market.",
+    ("venue",),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+VENUE_LAST_QUOTE_TIMESTAMP = Gauge(
+    "arb_venue_last_quote_timestamp_seconds",
+    "Venue timestamp (unix seconds) of the newest quote ingested; staleness is time() minus this.",
+    ("venue",),
+)
+MAPPING_SECONDS = Histogram("arb_mapping_seconds", "Duration of a mapping suggest or remap run.", ("job",))
+SCAN_SECONDS = Histogram("arb_scan_seconds", "Duration of a full arbitrage scan.")
+DETECT_SECONDS = Histogram(
+    "arb_detect_seconds",
+    "Duration of arbitrage detection for one sports event.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+OPPORTUNITIES_RECORDED = Counter(
+    "arb_opportunities_recorded_total", "Arbitrage opportunities recorded.", ("market_type",)
+)
+OPPORTUNITIES_CLOSED = Counter("arb_opportunities_closed_total", "Arbitrage opportunities closed by a scan.")
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from core.arb_engine import OUTCOME_LABELS, ArbCandidate, Leg, _cheapest_leg, _make_leg, find_arbs
+from db import models
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutcomeMeta:
+    sports_event_id: int
+    venue_id: str
+    label: str
+
+
+@dataclass
+class ReplayEpisode:
+    """
+    One continuous stretch during which an arb was available for an
+    (event, market_type, outcome_group). Re-pricing within the stretch updates
+    the best ROI but does not start a new episode.
+    """
+
+    sports_event_id: int
+    market_type: str
+    outcome_group: str
+    first_seen: datetime
+    last_seen: datetime
+    opening: ArbCandidate
+    best_roi: float
+    updates: int = 1
+    closed_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "sports_event_id": self.sports_event_id,
+            "market_type": self.market_type,
+            "outcome_group": self.outcome_group,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+            "closed_at": self.closed_at.isoformat() if self.closed_at else None,
+            "num_outcomes": len(self.opening.legs),
+            "total_stake": self.opening.total_stake,
+            "worst_case_pnl": self.opening.worst_case_pnl,
+            "best_case_pnl": self.opening.best_case_pnl,
+            "worst_case_roi": self.opening.worst_case_roi,
+            "best_worst_case_roi": self.best_roi,
+            "updates": self.updates,
+            "legs": [
+                {
+                    "venue_id": leg.venue_id,
+                    "market_outcome_id": leg.market_outcome_id,
+                    "outcome_label": leg.outcome_label,
+                    "stake_shares": stake,
+                    "share_price": leg.share_price,
+                    "win_pnl_per_share": leg.win_pnl,
+                    "lose_pnl_per_share": leg.lose_pnl,
+                    "source_quote_id": leg.quote_id,
+                }
+                for leg, stake in zip(self.opening.legs, self.opening.stakes)
+            ],
+        }
+
+
+@dataclass
+class ReplayStats:
+    quotes_processed: int = 0
+    ticks_processed: int = 0
+    evaluations: int = 0
+    episodes: int = 0
+    elapsed_seconds: float = 0.0
+
+
+EpisodeKey = Tuple[int, str, str]
+
+
+@dataclass
+class ReplayState:
+    """
+    In-memory book of the latest quote per outcome. Mirrors what
+    `detect_arbs_for_event` reads from the DB, without a query per tick.
+    """
+
+    outcomes: Dict[int, OutcomeMeta]
+    outcomes_by_event: Dict[int, List[int]]
+    latest: Dict[int, Leg] = field(default_factory=dict)
+    open_episodes: Dict[EpisodeKey, ReplayEpisode] = field(default_factory=dict)
+
+    def apply(self, rows: Iterable[tuple]) -> Set[int]:
+        """
+        Apply a batch of (quote_id, market_outcome_id, share_price, win_pnl, lose_pnl)
+        rows and return the set of sports_event_ids whose book changed.
+        """
+        dirty: Set[int] = set()
+        for quote_id, outcome_id, share_price, win_pnl, lose_pnl in rows:
+            meta = self.outcomes.get(outcome_id)
+            if meta is None:
+                continue
+            leg = _make_leg(meta.venue_id, outcome_id, meta.label, quote_id, share_price, win_pnl, lose_pnl)
+            if leg is None:
+                self.latest.pop(outcome_id, None)
+            else:
+                self.latest[outcome_id] = leg
+            dirty.add(meta.sports_event_id)
+        return dirty
+
+    def legs_by_label(self, sports_event_id: int) -> Dict[str, Leg]:
+        grouped: Dict[str, List[Leg]] = {}
+        for outcome_id in self.outcomes_by_event.get(sports_event_id, []):
+            leg = self.latest.get(outcome_id)
+            if leg is not None and leg.outcome_label in OUTCOME_LABELS:
+                grouped.setdefault(leg.outcome_label, []).append(leg)
+        result: Dict[str, Leg] = {}
+        for label, legs in grouped.items():
+            best = _cheapest_leg(legs)
+            if best:
+                result[label] = best
+        return result
+
+
+def _load_outcome_meta(db: Session) -> Tuple[Dict[int, OutcomeMeta], Dict[int, List[int]]]:
+    rows = db.execute(
+        select(
+            models.MarketOutcome.id,
+            models.MarketOutcome.label,
+            models.Market.venue_id,
+            models.Market.sports_event_id,
+        )
+        .join(models.Market, models.MarketOutcome.market_id == models.Market.id)
+        .where(models.Market.sports_event_id.isnot(None))
+    ).all()
+    outcomes: Dict[int, OutcomeMeta] = {}
+    by_event: Dict[int, List[int]] = {}
+    for outcome_id, label, venue_id, event_id in rows:
+        outcomes[outcome_id] = OutcomeMeta(sports_event_id=event_id, venue_id=venue_id, label=label)
+        by_event.setdefault(event_id, []).append(outcome_id)
+    return outcomes, by_event
+
+
+def _quote_columns():
+    return (
+        models.Quote.id,
+        models.Quote.market_outcome_id,
+        models.Quote.share_price,
+        models.Quote.net_pnl_if_win_per_share,
+        models.Quote.net_pnl_if_lose_per_share,
+    )
+
+
+def _seed_state(db: Session, state: ReplayState, start: datetime) -> None:
+    """
+    Load the book as it stood just before `start` so the replay does not
+    begin from an empty order book.
+    """
+    subq = (
+        select(
+            models.Quote.market_outcome_id,
+            func.max(models.Quote.timestamp).label("max_ts"),
+        )
+        .where(models.Quote.timestamp < start)
+        .group_by(models.Quote.market_outcome_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(*_quote_columns())
+        .join(
+            subq,
+            (models.Quote.market_outcome_id == subq.c.market_outcome_id)
+            & (models.Quote.timestamp == subq.c.max_ts),
+        )
+        .order_by(models.Quote.id.asc())
+    ).all()
+    state.apply(rows)
+
+
+def _evaluate(
+    state: ReplayState,
+    sports_event_id: int,
+    ts: datetime,
+    emit: Callable[[ReplayEpisode], None],
+) -> None:
+    seen: Set[EpisodeKey] = set()
+    for cand in find_arbs(state.legs_by_label(sports_event_id)):
+        key = (sports_event_id, cand.market_type, cand.outcome_group)
+        seen.add(key)
+        episode = state.open_episodes.get(key)
+        if episode is None:
+            state.open_episodes[key] = ReplayEpisode(
+                sports_event_id=sports_event_id,
+                market_type=cand.market_type,
+                outcome_group=cand.outcome_group,
+                first_seen=ts,
+                last_seen=ts,
+                opening=cand,
+                best_roi=cand.worst_case_roi,
+            )
+        else:
+            episode.last_seen = ts
+            episode.updates += 1
+            episode.best_roi = max(episode.best_roi, cand.worst_case_roi)
+
+    for key in [k for k in state.open_episodes if k[0] == sports_event_id and k not in seen]:
+        episode = state.open_episodes.pop(key)
+        episode.closed_at = ts
+        emit(episode)
+
+
+def replay_quotes(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    emit: Callable[[ReplayEpisode], None],
+    batch_size: int = 10000,
+    progress_every: int = 100000,
+    progress: Optional[Callable[[ReplayStats, int], None]] = None,
+) -> ReplayStats:
+    """
+    Stream stored quotes in [start, end) in timestamp order through the arb
+    detection logic and emit one ReplayEpisode per arb stretch.
+
+    Quotes sharing a timestamp are applied together before re-evaluating, since
+    ingestion writes both sides of a market with the same timestamp; only events
+    whose book changed are re-evaluated. Nothing is written to
+    arbitrage_opportunities.
+    """
+    started = time.monotonic()
+    stats = ReplayStats()
+
+    outcomes, by_event = _load_outcome_meta(db)
+    state = ReplayState(outcomes=outcomes, outcomes_by_event=by_event)
+    _seed_state(db, state, start)
+
+    window = (models.Quote.timestamp >= start) & (models.Quote.timestamp < end)
+    total = db.execute(select(func.count(models.Quote.id)).where(window)).scalar_one()
+    logger.info("Replaying %d quotes between %s and %s", total, start, end)
+
+    def _emit(episode: ReplayEpisode) -> None:
+        stats.episodes += 1
+        emit(episode)
+
+    def _flush(ts: Optional[datetime], pending: List[tuple]) -> None:
+        if ts is None or not pending:
+            return
+        dirty = state.apply(pending)
+        stats.ticks_processed += 1
+        for event_id in dirty:
+            _evaluate(state, event_id, ts, _emit)
+            stats.evaluations += 1
+
+    stmt = (
+        select(models.Quote.timestamp, *_quote_columns())
+        .where(window)
+        .order_by(models.Quote.timestamp.asc(), models.Quote.id.asc())
+        .execution_options(yield_per=batch_size)
+    )
+
+    current_ts: Optional[datetime] = None
+    pending: List[tuple] = []
+    next_report = progress_every
+    for partition in db.execute(stmt).partitions():
+        for row in partition:
+            ts = row[0]
+            if ts != current_ts:
+                _flush(current_ts, pending)
+                current_ts = ts
+                pending = []
+            pending.append(tuple(row[1:]))
+            stats.quotes_processed += 1
+
+        if stats.quotes_processed >= next_report:
+            next_report += progress_every
+            stats.elapsed_seconds = time.monotonic() - started
+            rate = stats.quotes_processed / stats.elapsed_seconds if stats.elapsed_seconds else 0.0
+            logger.info(
+                "Replay progress: %d/%d quotes (%.1f%%), %.0f quotes/s, %d episodes closed",
+                stats.quotes_processed,
+                total,
+                100.0 * stats.quotes_processed / total if total else 100.0,
+                rate,
+                stats.episodes,
+            )
+            if progress:
+                progress(stats, total)
+
+    _flush(current_ts, pending)
+
+    # Arbs still open at the end of the window are emitted without closed_at
+    for episode in list(state.open_episodes.values()):
+        _emit(episode)
+    state.open_episodes.clear()
+
+    stats.elapsed_seconds = time.monotonic() - started
+    if progress:
+        progress(stats, total)
+    return stats
+
+
+def replay_to_jsonl(db: Session, start: datetime, end: datetime, output_path: str, **kwargs) -> ReplayStats:
+    """
+    Run `replay_quotes` and write one JSON object per episode to `output_path`.
+    """
+    with open(output_path, "w", encoding="utf-8") as fh:
+
+        def _write(episode: ReplayEpisode) -> None:
+            fh.write(json.dumps(episode.to_dict()) + "\n")
+
+        return replay_quotes(db, start, end, _write, **kwargs)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Replay stored quotes through the arb engine.")
+    parser.add_argument("--start", required=True, help="ISO timestamp (inclusive)")
+    parser.add_argument("--end", required=True, help="ISO timestamp (exclusive)")
+    parser.add_argument("--out", required=True, help="Output JSONL path")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--progress-every", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    db = SessionLocal()
+    try:
+        stats = replay_to_jsonl(
+            db,
+            datetime.fromisoformat(args.start),
+            datetime.fromisoformat(args.end),
+            args.out,
+            batch_size=args.batch_size,
+            progress_every=args.progress_every,
+        )
+    finally:
+        db.close()
+    logger.info(
+        "Replay finished: %d quotes, %d ticks, %d episodes in %.1fs",
+        stats.quotes_processed,
+        stats.ticks_processed,
+        stats.episodes,
+        stats.elapsed_seconds,
+    )
+
+
+if __name__ == "__main__":
+    main()
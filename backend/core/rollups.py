@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from db import models
+from db.watermarks import lock_watermark, set_watermark
+
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_WATERMARK = "rollup.quote_bars"
+
+# Resolution label -> Postgres interval used to bucket quote timestamps
+RESOLUTIONS: Dict[str, str] = {"1m": "1 minute", "5m": "5 minutes", "1h": "1 hour"}
+
+# Take up to :batch_size queued quotes and fold them into the bars of every
+# resolution, merging with any bars they overlap. open/close (and the closing
+# bid/ask) come from the earliest/latest tick by (timestamp, id), so quotes
+# arriving out of order still land in the right place.
+_RESOLUTION_VALUES = ", ".join(f"('{label}', interval '{step}')" for label, step in RESOLUTIONS.items())
+_ROLL_UP_BATCH = text(
+    f"""
+    WITH batch AS (
+        DELETE FROM quote_rollup_queue
+        WHERE quote_id IN (SELECT quote_id FROM quote_rollup_queue ORDER BY quote_id LIMIT :batch_size)
+        RETURNING quote_id, "timestamp"
+    ),
+    bars AS (
+        INSERT INTO quote_bars (
+            market_outcome_id, resolution, bucket_start,
+            open, high, low, close, last_bid, last_ask,
+            open_at, close_at, tick_count, updated_at
+        )
+        SELECT
+            q.market_outcome_id,
+            r.resolution,
+            date_bin(r.step, q."timestamp", TIMESTAMP '1970-01-01'),
+            (array_agg(q.share_price ORDER BY q."timestamp", q.id))[1],
+            max(q.share_price),
+            min(q.share_price),
+            (array_agg(q.share_price ORDER BY q."timestamp" DESC, q.id DESC))[1],
+            (array_agg(q.bid_price ORDER BY q."timestamp" DESC, q.id DESC))[1],
+            (array_agg(q.ask_price ORDER BY q."timestamp" DESC, q.id DESC))[1],
+            min(q."timestamp"),
+            max(q."timestamp"),
+            count(*),
+            now() AT TIME ZONE 'utc'
+        FROM batch b
+        JOIN quotes q ON q.id = b.quote_id AND q."timestamp" = b."timestamp"
+        CROSS JOIN (VALUES {_RESOLUTION_VALUES}) AS r(resolution, step)
+        GROUP BY 1, 2, 3
+        ON CONFLICT (market_outcome_id, resolution, bucket_start) DO UPDATE SET
+            open = CASE WHEN EXCLUDED.open_at < quote_bars.open_at THEN EXCLUDED.open ELSE quote_bars.open END,
+            high = GREATEST(quote_bars.high, EXCLUDED.high),
+            low = LEAST(quote_bars.low, EXCLUDED.low),
+            close = CASE WHEN EXCLUDED.close_at >= quote_bars.close_at THEN EXCLUDED.close ELSE quote_bars.close END,
+            last_bid = CASE WHEN EXCLUDED.close_at >= quote_bars.close_at THEN EXCLUDED.last_bid ELSE quote_bars.last_bid END,
+            last_ask = CASE WHEN EXCLUDED.close_at >= quote_bars.close_at THEN EXCLUDED.last_ask ELSE quote_bars.last_ask END,
+            open_at = LEAST(quote_bars.open_at, EXCLUDED.open_at),
+            close_at = GREATEST(quote_bars.close_at, EXCLUDED.close_at),
+            tick_count = quote_bars.tick_count + EXCLUDED.tick_count,
+            updated_at = EXCLUDED.updated_at
+    )
+    SELECT count(*), max(quote_id) FROM batch
+    """
+)
+
+
+def update_quote_bars(db: Session, batch_size: int = 50000) -> int:
+    """
+    Fold quotes inserted since the last run into the 1m/5m/1h bars and
+    return how many were rolled up.
+
+    New quotes are queued by the quote_rollup_after_insert trigger and only
+    become visible here once their ingestion commits, so a quote committed
+    late (e.g. by the slower of two venue runs finishing together) is still
+    picked up. Each batch is drained and folded in one statement and
+    committed, so an interrupted run resumes where it stopped. The
+    `rollup.quote_bars` watermark row (created on first use) is locked for
+    the duration of a batch so concurrent callers serialize; its last_id is
+    the highest quote id rolled up so far.
+    """
+    consumed = 0
+    while True:
+        wm = lock_watermark(db, ROLLUP_WATERMARK)
+        count, top = db.execute(_ROLL_UP_BATCH, {"batch_size": batch_size}).one()
+        if not count:
+            db.commit()
+            return consumed
+        set_watermark(db, ROLLUP_WATERMARK, None, max(wm.last_id or 0, top))
+        db.commit()
+        consumed += count
+
+
+def get_quote_bars(
+    db: Session,
+    market_outcome_id: int,
+    resolution: str = "1m",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 1000,
+    after: Optional[datetime] = None,
+) -> List[models.QuoteBar]:
+    """
+    Bars for one outcome in ascending time order; `start` is inclusive and
+    `end` exclusive on bucket_start, `after` (a page cursor) exclusive.
+    Without `start` or `after`, the most recent `limit` bars before `end` are
+    returned.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution {resolution!r}; expected one of {sorted(RESOLUTIONS)}")
+
+    query = db.query(models.QuoteBar).filter(
+        models.QuoteBar.market_outcome_id == market_outcome_id,
+        models.QuoteBar.resolution == resolution,
+    )
+    if start is not None:
+        query = query.filter(models.QuoteBar.bucket_start >= start)
+    if end is not None:
+        query = query.filter(models.QuoteBar.bucket_start < end)
+    if after is not None:
+        query = query.filter(models.QuoteBar.bucket_start > after)
+
+    if start is None and after is None:
+        bars = query.order_by(models.QuoteBar.bucket_start.desc()).limit(limit).all()
+        return bars[::-1]
+    return query.order_by(models.QuoteBar.bucket_start).limit(limit).all()
+
+
+def main(argv: List[str] | None = None) -> None:
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Fold newly inserted quotes into OHLC bars.")
+    parser.add_argument("--batch-size", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        consumed = update_quote_bars(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Rolled up {consumed} quotes")
+
+
+if __name__ == "__main__":
+    main()
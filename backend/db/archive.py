@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, DateTime, Integer, Numeric, delete, func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from db import models, models_arbs
+from db.watermarks import get_watermark, set_watermark
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ArchiveDataset:
+    name: str
+    # Columns written to Parquet, in order
+    columns: Sequence
+    # Column whose UTC day picks the partition a row lands in
+    day_column: object
+    # Extra joins needed to reach day_column from the main table
+    join: Optional[Callable] = None
+
+    @property
+    def watermark(self) -> str:
+        return f"archive.{self.name}"
+
+
+_Opp = models_arbs.ArbitrageOpportunity
+_Leg = models_arbs.ArbitrageLeg
+
+DATASETS: Dict[str, ArchiveDataset] = {
+    "quotes": ArchiveDataset(
+        "quotes",
+        columns=list(models.Quote.__table__.columns),
+        day_column=models.Quote.timestamp,
+    ),
+    "arbitrage_opportunities": ArchiveDataset(
+        "arbitrage_opportunities",
+        columns=list(_Opp.__table__.columns),
+        day_column=_Opp.detected_at,
+    ),
+    # Legs carry no timestamp of their own; they follow their opportunity
+    "arbitrage_legs": ArchiveDataset(
+        "arbitrage_legs",
+        columns=list(_Leg.__table__.columns) + [_Opp.detected_at],
+        day_column=_Opp.detected_at,
+        join=lambda stmt: stmt.join(_Opp, _Leg.arbitrage_opportunity_id == _Opp.id),
+    ),
+}
+
+
+def arrow_type(col) -> pa.DataType:
+    t = col.type
+    if isinstance(t, Boolean):
+        return pa.bool_()
+    if isinstance(t, Integer):
+        return pa.int64()
+    if isinstance(t, Numeric):
+        return pa.float64()
+    if isinstance(t, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _schema(dataset: ArchiveDataset) -> pa.Schema:
+    return pa.schema([(col.name, arrow_type(col)) for col in dataset.columns])
+
+
+def _day_path(root: str, dataset: ArchiveDataset, day: date) -> str:
+    return os.path.join(root, dataset.name, f"date={day:%Y-%m-%d}", "part-0.parquet")
+
+
+def to_columns(rows: List, schema: pa.Schema) -> Dict[str, list]:
+    out: Dict[str, list] = {name: [] for name in schema.names}
+    for row in rows:
+        for name, value in zip(schema.names, row):
+            if value is not None and pa.types.is_floating(schema.field(name).type):
+                value = float(value)
+            out[name].append(value)
+    return out
+
+
+def export_day(db: Session, dataset: ArchiveDataset, day: date, root: str, batch_size: int = 50000) -> int:
+    """
+    Write one UTC day of `dataset` to its Parquet partition and return the
+    number of rows written. The file is written next to its final path and
+    renamed into place, so re-exporting a day replaces it atomically.
+    """
+    start = datetime(day.year, day.month, day.day)
+    stmt = select(*dataset.columns)
+    if dataset.join is not None:
+        stmt = dataset.join(stmt)
+    stmt = stmt.where(dataset.day_column >= start, dataset.day_column < start + timedelta(days=1))
+
+    schema = _schema(dataset)
+    path = _day_path(root, dataset, day)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+
+    written = 0
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            writer.write_table(pa.Table.from_pydict(to_columns(rows, schema), schema=schema))
+            written += len(rows)
+        if not written:
+            writer.write_table(schema.empty_table())
+    os.replace(tmp_path, path)
+    return written
+
+
+def export_closed_days(
+    db: Session,
+    root: Optional[str] = None,
+    names: Optional[Sequence[str]] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    Archive every closed UTC day not yet exported, per dataset, and return
+    rows written per dataset.
+
+    A day counts as closed once it is `archive_lag_days` old, which leaves
+    room for late-arriving quotes stamped with an earlier venue time. Each
+    dataset's progress is the `archive.<name>` watermark (last_updated_at is
+    the start of the last exported day), committed after every day.
+    """
+    root = root or settings.archive_dir
+    now = now or datetime.utcnow()
+    last_closed = (now - timedelta(days=settings.archive_lag_days)).date() - timedelta(days=1)
+
+    totals: Dict[str, int] = {}
+    for name in names or list(DATASETS):
+        dataset = DATASETS[name]
+        wm = get_watermark(db, dataset.watermark)
+        if wm and wm.last_updated_at:
+            day = wm.last_updated_at.date() + timedelta(days=1)
+        else:
+            stmt = select(func.min(dataset.day_column))
+            if dataset.join is not None:
+                stmt = dataset.join(stmt.select_from(dataset.columns[0].table))
+            first = db.execute(stmt).scalar()
+            if first is None:
+                totals[name] = 0
+                continue
+            day = first.date()
+
+        totals[name] = 0
+        while day <= last_closed:
+            count = export_day(db, dataset, day, root)
+            set_watermark(db, dataset.watermark, datetime(day.year, day.month, day.day), None)
+            db.commit()
+            logger.info("Archived %s rows of %s for %s", count, name, day)
+            totals[name] += count
+            day += timedelta(days=1)
+    return totals
+
+
+def archived_through(db: Session, name: str) -> Optional[date]:
+    """Last day of `name` safely on disk, or None if nothing is archived yet."""
+    wm = get_watermark(db, DATASETS[name].watermark)
+    return wm.last_updated_at.date() if wm and wm.last_updated_at else None
+
+
+def prune_archived_arbs(db: Session, before: date) -> int:
+    """
+    Delete opportunities (and their legs) detected before `before`, limited
+    to days both tables have already archived. Returns opportunities deleted.
+
+    Quote history is pruned by partition retention (db.partitions) instead.
+    """
+    archived = [archived_through(db, "arbitrage_opportunities"), archived_through(db, "arbitrage_legs")]
+    if None in archived:
+        return 0
+    limit = min(before, min(archived) + timedelta(days=1))
+    cutoff = datetime(limit.year, limit.month, limit.day)
+
+    old_ids = select(_Opp.id).where(_Opp.detected_at < cutoff)
+    db.execute(delete(_Leg).where(_Leg.arbitrage_opportunity_id.in_(old_ids)))
+    deleted = db.execute(delete(_Opp).where(_Opp.detected_at < cutoff)).rowcount
+    db.commit()
+    return deleted
+
+
+def read_archive(
+    name: str,
+    columns: Optional[List[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    filter: Optional[ds.Expression] = None,
+    root: Optional[str] = None,
+) -> pa.Table:
+    """
+    Read archived rows column-wise. `start`/`end` (inclusive/exclusive)
+    prune whole day partitions before any file is opened; `filter` is an
+    optional pyarrow expression on the data columns, e.g.
+    `ds.field("market_outcome_id") == 42`.
+    """
+    path = os.path.join(root or settings.archive_dir, name)
+    partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+    schema = _schema(DATASETS[name]).append(pa.field("date", pa.string()))
+    dataset = ds.dataset(path, format="parquet", partitioning=partitioning, schema=schema)
+
+    expr = filter
+    for clause in (
+        ds.field("date") >= f"{start:%Y-%m-%d}" if start else None,
+        ds.field("date") < f"{end:%Y-%m-%d}" if end else None,
+    ):
+        if clause is not None:
+            expr = clause if expr is None else expr & clause
+    return dataset.to_table(columns=columns, filter=expr)
+
+
+def main(argv: List[str] | None = None) -> None:
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Archive closed days of quotes and arbitrage history to Parquet.")
+    parser.add_argument("--root", default=None, help=f"Archive directory (default: {settings.archive_dir})")
+    parser.add_argument("--dataset", action="append", choices=sorted(DATASETS), help="Limit to these datasets")
+    parser.add_argument("--prune-arbs-before", default=None, help="ISO date; delete archived arbs detected before it")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        for name, count in export_closed_days(db, root=args.root, names=args.dataset).items():
+            print(f"{name}: {count} rows")
+        if args.prune_arbs_before:
+            deleted = prune_archived_arbs(db, date.fromisoformat(args.prune_arbs_before))
+            print(f"pruned {deleted} opportunities")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+
+
+def _async_url(url: str) -> str:
+    # Same database as the sync read engine, reached through asyncpg
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+def listen_dsn() -> str:
+    """asyncpg DSN for LISTEN connections: the primary, since replicas do not forward notifications."""
+    return make_url(settings.database_url.unicode_string()).set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+
+
+_server_settings = {}
+if settings.db_read_statement_timeout_ms:
+    _server_settings["statement_timeout"] = str(settings.db_read_statement_timeout_ms)
+
+# Async counterpart of db.session.read_engine for the async GET routes. It
+# shares the read pool settings but holds its own connections; ingestion and
+# other writers stay on the sync engine.
+async_read_engine = create_async_engine(
+    _async_url((settings.database_read_url or settings.database_url).unicode_string()),
+    pool_size=settings.db_read_pool_size,
+    max_overflow=settings.db_read_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    connect_args={"server_settings": _server_settings},
+    execution_options={"postgresql_readonly": True},
+)
+
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
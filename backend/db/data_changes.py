@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Callable, FrozenSet, List, Set
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import ORMExecuteState, Session
+
+
+# Postgres NOTIFY channel announcing committed changes by topic, so every
+# process (API workers, CLI jobs, the scheduler) hears about writes made by
+# any other (see app.api.cache). Imported by db.session so every process that
+# writes through a Session reports its changes.
+CHANNEL = "data_changes"
+
+# Data topics read routes depend on
+EVENTS = "events"
+MARKETS = "markets"
+ARBS = "arbs"
+
+# Table -> topics a write to it changes
+TABLE_TOPICS = {
+    "sports_events": (EVENTS,),
+    "markets": (MARKETS,),
+    "market_outcomes": (MARKETS,),
+    "event_market_links": (MARKETS, EVENTS),
+    "arbitrage_opportunities": (ARBS,),
+    "arbitrage_legs": (ARBS,),
+}
+
+_PENDING_KEY = "data_change_topics"
+
+_listeners: List[Callable[[FrozenSet[str]], None]] = []
+
+
+def on_change(listener: Callable[[FrozenSet[str]], None]) -> None:
+    """Call `listener` with the changed topics after each commit in this process."""
+    _listeners.append(listener)
+
+
+def parse_payload(payload: str) -> FrozenSet[str]:
+    return frozenset(t for t in payload.split(",") if t)
+
+
+def _track(session: Session, table_name: str) -> None:
+    topics = TABLE_TOPICS.get(table_name)
+    if topics:
+        session.info.setdefault(_PENDING_KEY, set()).update(topics)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            _track(session, table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(state: ORMExecuteState) -> None:
+    # insert()/update()/delete() statements bypass the unit of work
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None:
+            _track(state.session, table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_changes(session: Session) -> None:
+    # Flush first so the unit of work's writes are tracked too
+    session.flush()
+    topics: Set[str] = session.info.get(_PENDING_KEY) or set()
+    if topics:
+        # Delivered on commit only, like the write itself
+        session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": ",".join(sorted(topics))})
+
+
+@event.listens_for(Session, "after_commit")
+def _announce_changes(session: Session) -> None:
+    topics = session.info.pop(_PENDING_KEY, None)
+    if topics:
+        for listener in _listeners:
+            listener(frozenset(topics))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_changes(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
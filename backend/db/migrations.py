@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import zlib
+from typing import Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VERSIONS_DIR = os.path.join(BACKEND_DIR, "alembic", "versions")
+
+# Session-level advisory lock key shared by every process that may migrate
+MIGRATION_LOCK_KEY = zlib.crc32(b"sentiment_arb.alembic_upgrade")
+
+
+_REVISION_RE = re.compile(r"^revision\s*=\s*['\"]([^'\"]+)['\"]", re.M)
+_DOWN_REVISION_RE = re.compile(r"^down_revision\s*=\s*(.+)$", re.M)
+_QUOTED_RE = re.compile(r"['\"]([^'\"]+)['\"]")
+
+
+def head_revisions() -> Set[str]:
+    """
+    Head revision(s) of the migration scripts, read straight from the
+    version files. Avoids importing alembic's script machinery, which costs
+    more than the database check itself.
+    """
+    revisions: Set[str] = set()
+    parents: Set[str] = set()
+    for name in os.listdir(VERSIONS_DIR):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(VERSIONS_DIR, name), encoding="utf-8") as f:
+            source = f.read()
+        rev = _REVISION_RE.search(source)
+        if rev:
+            revisions.add(rev.group(1))
+        down = _DOWN_REVISION_RE.search(source)
+        if down:
+            parents.update(_QUOTED_RE.findall(down.group(1)))
+    return revisions - parents
+
+
+def current_revisions(engine: Engine) -> Set[str]:
+    """Revisions recorded in alembic_version; empty for a fresh database."""
+    with engine.connect() as conn:
+        exists = conn.execute(text("SELECT to_regclass('alembic_version') IS NOT NULL")).scalar()
+        if not exists:
+            return set()
+        return {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))}
+
+
+def _run_upgrade() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    cfg = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    cfg.set_main_option("sqlalchemy.url", settings.database_url.unicode_string())
+    command.upgrade(cfg, "head")
+
+
+def upgrade_if_needed(engine: Engine, heads: Optional[Set[str]] = None) -> bool:
+    """
+    Upgrade to head only when the database is behind, and return whether an
+    upgrade ran.
+
+    The common case (already at head) costs one query and never imports
+    alembic's migration runtime. When an upgrade is needed, workers serialize
+    on a Postgres advisory lock and re-check after acquiring it, so only the
+    first worker migrates and the rest start as soon as it finishes.
+    """
+    heads = heads if heads is not None else head_revisions()
+    if current_revisions(engine) == heads:
+        return False
+
+    with engine.connect() as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            if current_revisions(engine) == heads:
+                return False
+            logger.info("Database behind %s; running migrations", ", ".join(sorted(heads)))
+            _run_upgrade()
+            return True
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            lock_conn.commit()
@@ -6,12 +6,14 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     Boolean,
     JSON,
+    text,
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
@@ -39,6 +41,10 @@ class Venue(Base):
 
 class SportsEvent(Base):
     __tablename__ = "sports_events"
+    __table_args__ = (
+        Index("uq_sports_events_source_external_event_ref", "source", "external_event_ref", unique=True),
+        Index("ix_sports_events_event_start_time_utc_id", "event_start_time_utc", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sport: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -64,6 +70,10 @@ class SportsEvent(Base):
 
 class Market(Base):
     __tablename__ = "markets"
+    __table_args__ = (
+        Index("uq_markets_venue_id_venue_market_key", "venue_id", "venue_market_key", unique=True),
+        Index("ix_markets_sports_event_id", "sports_event_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     venue_id: Mapped[str] = mapped_column(String(50), ForeignKey("venues.id"), nullable=False)
@@ -105,6 +115,9 @@ class Market(Base):
 
 class MarketOutcome(Base):
     __tablename__ = "market_outcomes"
+    __table_args__ = (
+        Index("ix_market_outcomes_market_id", "market_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     market_id: Mapped[int] = mapped_column(Integer, ForeignKey("markets.id"), nullable=False)
@@ -133,11 +146,19 @@ class MarketOutcome(Base):
 
 class Quote(Base):
     __tablename__ = "quotes"
+    __table_args__ = (
+        Index("ix_quotes_market_outcome_id_timestamp", "market_outcome_id", "timestamp"),
+        Index("ix_quotes_timestamp_brin", "timestamp", postgresql_using="brin"),
+        Index("ix_quotes_timestamp_id", "timestamp", "id"),
+        # Range-partitioned by timestamp (migration 0007); see db.partitions
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     market_outcome_id: Mapped[int] = mapped_column(Integer, ForeignKey("market_outcomes.id"), nullable=False)
 
-    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    # Part of the primary key because Postgres requires the partition key in it
+    timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow)
     raw_price: Mapped[float] = mapped_column(Numeric(18, 8), nullable=False)
     price_format: Mapped[str] = mapped_column(String(20), nullable=False)
 
@@ -154,11 +175,98 @@ class Quote(Base):
 
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
 
+    # Latency tracing (migration 0010): when ingestion received the venue
+    # response, and when the row reached the database
+    fetched_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    written_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True, server_default=text("(clock_timestamp() AT TIME ZONE 'utc')")
+    )
+
     market_outcome: Mapped["MarketOutcome"] = relationship("MarketOutcome", back_populates="quotes")
 
 
+class QuoteLatest(Base):
+    """
+    Latest quote per outcome, maintained by the quotes_latest_after_insert
+    trigger (migration 0006). Read-only from the application's side.
+    """
+
+    __tablename__ = "quotes_latest"
+    __table_args__ = (
+        Index("ix_quotes_latest_timestamp_market_outcome_id", "timestamp", "market_outcome_id"),
+    )
+
+    market_outcome_id: Mapped[int] = mapped_column(Integer, ForeignKey("market_outcomes.id"), primary_key=True)
+    quote_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    raw_price: Mapped[float] = mapped_column(Numeric(18, 8), nullable=False)
+    price_format: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    bid_price: Mapped[Optional[float]] = mapped_column(Numeric(18, 8), nullable=True)
+    ask_price: Mapped[Optional[float]] = mapped_column(Numeric(18, 8), nullable=True)
+    source: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+
+    share_price: Mapped[Optional[float]] = mapped_column(Numeric(18, 8), nullable=True)
+    net_pnl_if_win_per_share: Mapped[Optional[float]] = mapped_column(Numeric(18, 8), nullable=True)
+    net_pnl_if_lose_per_share: Mapped[Optional[float]] = mapped_column(Numeric(18, 8), nullable=True)
+
+    decimal_odds: Mapped[Optional[float]] = mapped_column(Numeric(18, 8), nullable=True)
+    implied_prob_raw: Mapped[Optional[float]] = mapped_column(Numeric(18, 8), nullable=True)
+
+    fetched_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    written_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    market_outcome: Mapped["MarketOutcome"] = relationship("MarketOutcome")
+
+
+class QuoteRollupQueue(Base):
+    """
+    Quotes waiting to be folded into quote_bars, filled by the
+    quote_rollup_after_insert trigger (migration 0011) and drained by
+    core.rollups.
+    """
+
+    __tablename__ = "quote_rollup_queue"
+
+    quote_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class QuoteBar(Base):
+    """
+    OHLC bar of share_price per outcome at one resolution, plus the bid/ask of
+    the bar's closing tick. Maintained incrementally by core.rollups.
+    """
+
+    __tablename__ = "quote_bars"
+
+    market_outcome_id: Mapped[int] = mapped_column(Integer, ForeignKey("market_outcomes.id"), primary_key=True)
+    resolution: Mapped[str] = mapped_column(String(8), primary_key=True)  # 1m, 5m, 1h
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+
+    open: Mapped[float] = mapped_column(Numeric(18, 8), nullable=False)
+    high: Mapped[float] = mapped_column(Numeric(18, 8), nullable=False)
+    low: Mapped[float] = mapped_column(Numeric(18, 8), nullable=False)
+    close: Mapped[float] = mapped_column(Numeric(18, 8), nullable=False)
+    last_bid: Mapped[Optional[float]] = mapped_column(Numeric(18, 8), nullable=True)
+    last_ask: Mapped[Optional[float]] = mapped_column(Numeric(18, 8), nullable=True)
+
+    # Timestamps of the opening/closing ticks, so late quotes merge correctly
+    open_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    close_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    tick_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 class EventMarketLink(Base):
     __tablename__ = "event_market_links"
+    __table_args__ = (
+        Index("uq_event_market_links_market_id_sports_event_id", "market_id", "sports_event_id", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sports_event_id: Mapped[int] = mapped_column(Integer, ForeignKey("sports_events.id"), nullable=False)
@@ -179,6 +287,10 @@ class EventMarketLink(Base):
 
 class MappingCandidate(Base):
     __tablename__ = "mapping_candidates"
+    __table_args__ = (
+        Index("ix_mapping_candidates_market_id_status", "market_id", "status"),
+        Index("ix_mapping_candidates_status_confidence_score_id", "status", "confidence_score", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     market_id: Mapped[int] = mapped_column(Integer, ForeignKey("markets.id"), nullable=False)
@@ -193,3 +305,14 @@ class MappingCandidate(Base):
 
     market: Mapped["Market"] = relationship("Market", back_populates="mapping_candidates")
     candidate_sports_event: Mapped[Optional["SportsEvent"]] = relationship("SportsEvent")
+
+
+class PipelineWatermark(Base):
+    __tablename__ = "pipeline_watermarks"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    last_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
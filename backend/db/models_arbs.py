@@ -2,13 +2,22 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, DateTime, Numeric, Boolean, ForeignKey
+from sqlalchemy import BigInteger, Integer, String, DateTime, Numeric, Boolean, ForeignKey, Index, Sequence
 
 from .base import Base
 
 
+# Numbers opened/closed stream events in commit order (scans are serialized)
+ARB_EVENT_SEQ = Sequence("arb_event_seq")
+
+
 class ArbitrageOpportunity(Base):
     __tablename__ = "arbitrage_opportunities"
+    __table_args__ = (
+        Index("ix_arbitrage_opportunities_detected_at_id", "detected_at", "id"),
+        Index("ix_arbitrage_opportunities_opened_seq", "opened_seq"),
+        Index("ix_arbitrage_opportunities_closed_seq", "closed_seq"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sports_event_id: Mapped[int] = mapped_column(Integer, ForeignKey("sports_events.id"), nullable=False)
@@ -24,6 +33,15 @@ class ArbitrageOpportunity(Base):
     detection_version: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     notes: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
+    # Venue timestamp of the stalest leg quote, and its age at detection
+    oldest_quote_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    quote_age_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    # Stream event ids of the "opened" and "closed" events (migration 0012)
+    opened_seq: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    closed_seq: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    closed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
     legs: Mapped[list["ArbitrageLeg"]] = relationship(
         "ArbitrageLeg", back_populates="opportunity", cascade="all, delete-orphan"
     )
@@ -31,6 +49,9 @@ class ArbitrageOpportunity(Base):
 
 class ArbitrageLeg(Base):
     __tablename__ = "arbitrage_legs"
+    __table_args__ = (
+        Index("ix_arbitrage_legs_arbitrage_opportunity_id", "arbitrage_opportunity_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     arbitrage_opportunity_id: Mapped[int] = mapped_column(
@@ -46,6 +67,12 @@ class ArbitrageLeg(Base):
     win_pnl_per_share: Mapped[Numeric] = mapped_column(Numeric(18, 8), nullable=False)
     lose_pnl_per_share: Mapped[Numeric] = mapped_column(Numeric(18, 8), nullable=False)
 
-    source_quote_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("quotes.id"), nullable=True)
+    # No FK: quotes is partitioned and its primary key is (id, timestamp)
+    source_quote_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    # Source quote's venue timestamp, fetch time and database write time
+    quote_timestamp: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    quote_fetched_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    quote_written_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     opportunity: Mapped["ArbitrageOpportunity"] = relationship("ArbitrageOpportunity", back_populates="legs")
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "quotes"
+# Catches quotes outside every range partition (migration 0007)
+DEFAULT_PARTITION = "quotes_default"
+INTERVALS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass
+class Partition:
+    name: str
+    lower: datetime
+    upper: datetime
+
+
+def period_start(ts: datetime, interval: str = "week") -> datetime:
+    """
+    Start of the partition period containing `ts`: midnight for daily
+    partitions, Monday midnight for weekly ones (matching migration 0007).
+    """
+    day = datetime(ts.year, ts.month, ts.day)
+    if interval == "week":
+        day -= timedelta(days=day.weekday())
+    return day
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+def existing_partitions(db: Session) -> List[Partition]:
+    """
+    Range partitions currently attached to quotes, oldest first. The default
+    partition is not included.
+    """
+    rows = db.execute(
+        text(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = :parent
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    ).all()
+
+    parts: List[Partition] = []
+    for name, bound in rows:
+        m = _BOUND_RE.search(bound or "")
+        if not m:
+            continue
+        parts.append(Partition(name, datetime.fromisoformat(m.group(1)), datetime.fromisoformat(m.group(2))))
+    return sorted(parts, key=lambda p: p.lower)
+
+
+def ensure_quote_partitions(
+    db: Session,
+    ahead: Optional[int] = None,
+    interval: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """
+    Create partitions from the current period through `ahead` periods in the
+    future, skipping any range an existing partition already covers. Returns
+    the names of the partitions created.
+
+    A range fails to attach if the default partition already holds rows in it;
+    that range is logged and skipped so one bad period does not block the rest.
+    """
+    ahead = settings.quotes_partitions_ahead if ahead is None else ahead
+    interval = interval or settings.quotes_partition_interval
+    step = INTERVALS[interval]
+    now = now or datetime.utcnow()
+
+    existing = existing_partitions(db)
+    created: List[str] = []
+    start = period_start(now, interval)
+    for _ in range(ahead + 1):
+        end = start + step
+        if not any(p.lower < end and start < p.upper for p in existing):
+            name = partition_name(start)
+            try:
+                with db.begin_nested():
+                    db.execute(
+                        text(
+                            f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+                            f"FOR VALUES FROM ('{start:%Y-%m-%d %H:%M:%S}') TO ('{end:%Y-%m-%d %H:%M:%S}')"
+                        )
+                    )
+                created.append(name)
+            except Exception:
+                logger.exception("Could not create quote partition %s", name)
+        start = end
+    db.commit()
+    return created
+
+
+def apply_quote_retention(
+    db: Session,
+    retention_days: Optional[int] = None,
+    mode: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """
+    Remove partitions whose whole range is older than the retention window.
+
+    mode="detach" leaves each partition as a standalone table (for archiving
+    or manual inspection); mode="drop" deletes it. Returns the affected
+    partition names.
+
+    Dropping is limited to what the Parquet archive (db.archive) already
+    holds: a partition reaching past the last archived day is skipped and
+    logged, and dropped by a later run once the archive has caught up.
+
+    Quotes in the default partition (venue timestamps outside every range
+    partition) cannot be detached. mode="drop" deletes the ones past the
+    same bound; mode="detach" leaves them and logs how many are expired.
+    """
+    retention_days = settings.quotes_retention_days if retention_days is None else retention_days
+    mode = mode or settings.quotes_retention_mode
+    if mode not in ("detach", "drop"):
+        raise ValueError(f"Unknown retention mode {mode!r}")
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+
+    archived = None
+    if mode == "drop":
+        from db.archive import archived_through
+
+        archived = archived_through(db, PARENT_TABLE)
+        # Exclusive bound: the end of the last archived day
+        safe = datetime(archived.year, archived.month, archived.day) + timedelta(days=1) if archived else None
+        bound = min(cutoff, safe) if safe else None
+    else:
+        bound = cutoff
+
+    expired = []
+    for p in existing_partitions(db):
+        if p.upper > cutoff:
+            continue
+        if bound is None or p.upper > bound:
+            logger.warning(
+                "Not dropping %s: quotes are archived through %s, partition ends %s",
+                p.name,
+                archived or "nothing",
+                p.upper,
+            )
+            continue
+        expired.append(p)
+    for p in expired:
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {p.name}"))
+        if mode == "drop":
+            db.execute(text(f"DROP TABLE {p.name}"))
+
+    if bound is not None and mode == "drop":
+        deleted = db.execute(
+            text(f'DELETE FROM {DEFAULT_PARTITION} WHERE "timestamp" < :bound'), {"bound": bound}
+        ).rowcount
+        if deleted:
+            logger.info("Deleted %s expired quotes from %s", deleted, DEFAULT_PARTITION)
+    elif bound is not None:
+        kept = db.execute(
+            text(f'SELECT count(*) FROM {DEFAULT_PARTITION} WHERE "timestamp" < :bound'), {"bound": bound}
+        ).scalar()
+        if kept:
+            logger.warning("%s holds %s expired quotes that detach mode keeps", DEFAULT_PARTITION, kept)
+    db.commit()
+    return [p.name for p in expired]
+
+
+def main(argv: List[str] | None = None) -> None:
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Create upcoming quote partitions and apply retention.")
+    parser.add_argument("--ahead", type=int, default=None, help="Periods to create beyond the current one")
+    parser.add_argument("--retention-days", type=int, default=None)
+    parser.add_argument("--mode", choices=("detach", "drop"), default=None)
+    parser.add_argument("--skip-retention", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        for name in ensure_quote_partitions(db, ahead=args.ahead):
+            print(f"created {name}")
+        if not args.skip_retention:
+            mode = args.mode or settings.quotes_retention_mode
+            for name in apply_quote_retention(db, retention_days=args.retention_days, mode=mode):
+                print(f"{mode} {name}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
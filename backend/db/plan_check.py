@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterator, List, Tuple
+
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from db import models, models_arbs
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    stmt: Any
+    # Any of these satisfies the check
+    expected_indexes: Tuple[str, ...]
+
+
+def _hot_path_checks() -> List[PlanCheck]:
+    """
+    Representative statements for each hot path, built with the same ORM
+    constructs the application uses.
+    """
+    latest_subq = (
+        select(models.Quote.market_outcome_id, func.max(models.Quote.timestamp).label("max_ts"))
+        .where(models.Quote.market_outcome_id.in_([1, 2, 3]))
+        .group_by(models.Quote.market_outcome_id)
+        .subquery()
+    )
+    since = datetime.utcnow() - timedelta(days=1)
+    return [
+        PlanCheck("latest quotes per outcome", select(latest_subq), ("ix_quotes_market_outcome_id_timestamp",)),
+        PlanCheck(
+            "quotes time range",
+            select(models.Quote).where(models.Quote.timestamp >= since),
+            # The planner picks BRIN once the table is large and time-ordered; on
+            # small tables a btree over timestamp looks cheaper
+            ("ix_quotes_timestamp_brin", "ix_quotes_timestamp_id", "ix_quotes_market_outcome_id_timestamp"),
+        ),
+        PlanCheck(
+            "market upsert lookup",
+            select(models.Market).where(
+                models.Market.venue_id == "kalshi", models.Market.venue_market_key == "KXNBAGAME-25DEC10PHXOKC"
+            ),
+            ("uq_markets_venue_id_venue_market_key",),
+        ),
+        PlanCheck(
+            "markets by event",
+            select(models.Market).where(models.Market.sports_event_id == 1),
+            ("ix_markets_sports_event_id",),
+        ),
+        PlanCheck(
+            "outcomes by market",
+            select(models.MarketOutcome).where(models.MarketOutcome.market_id == 1),
+            ("ix_market_outcomes_market_id",),
+        ),
+        PlanCheck(
+            "event upsert lookup",
+            select(models.SportsEvent).where(
+                models.SportsEvent.source == "kalshi", models.SportsEvent.external_event_ref == "KXNBAGAME-25DEC10PHXOKC"
+            ),
+            ("uq_sports_events_source_external_event_ref",),
+        ),
+        PlanCheck(
+            "event-market link lookup",
+            select(models.EventMarketLink).where(
+                models.EventMarketLink.market_id == 1, models.EventMarketLink.sports_event_id == 1
+            ),
+            ("uq_event_market_links_market_id_sports_event_id",),
+        ),
+        PlanCheck(
+            "pending candidates by market",
+            select(models.MappingCandidate).where(
+                models.MappingCandidate.market_id == 1, models.MappingCandidate.status == "pending"
+            ),
+            ("ix_mapping_candidates_market_id_status",),
+        ),
+        PlanCheck(
+            "recent arbs",
+            select(models_arbs.ArbitrageOpportunity)
+            .order_by(models_arbs.ArbitrageOpportunity.detected_at.desc(), models_arbs.ArbitrageOpportunity.id.desc())
+            .limit(50),
+            ("ix_arbitrage_opportunities_detected_at_id",),
+        ),
+        PlanCheck(
+            "quotes page",
+            select(models.Quote)
+            .where(tuple_(models.Quote.timestamp, models.Quote.id) < tuple_(since, 1000))
+            .order_by(models.Quote.timestamp.desc(), models.Quote.id.desc())
+            .limit(100),
+            ("ix_quotes_timestamp_id",),
+        ),
+        PlanCheck(
+            "sports events page",
+            select(models.SportsEvent)
+            .order_by(models.SportsEvent.event_start_time_utc.asc().nullslast(), models.SportsEvent.id.asc())
+            .limit(100),
+            ("ix_sports_events_event_start_time_utc_id",),
+        ),
+        PlanCheck(
+            "pending candidates page",
+            select(models.MappingCandidate)
+            .where(models.MappingCandidate.status == "pending")
+            .order_by(models.MappingCandidate.confidence_score.desc(), models.MappingCandidate.id.desc())
+            .limit(50),
+            ("ix_mapping_candidates_status_confidence_score_id",),
+        ),
+        PlanCheck(
+            "legs by opportunity",
+            select(models_arbs.ArbitrageLeg).where(models_arbs.ArbitrageLeg.arbitrage_opportunity_id == 1),
+            ("ix_arbitrage_legs_arbitrage_opportunity_id",),
+        ),
+    ]
+
+
+def _walk(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def explain(db: Session, stmt: Any) -> dict:
+    sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    row = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+    plan = row if isinstance(row, list) else json.loads(row)
+    return plan[0]["Plan"]
+
+
+def _root_index(db: Session, name: str) -> str:
+    # Scans of a partitioned table report the per-partition index; map it back
+    # to the index declared on the parent.
+    root = db.execute(text("SELECT pg_partition_root(CAST(:name AS regclass))::text"), {"name": name}).scalar()
+    return root or name
+
+
+def check_plans(db: Session, allow_seqscan: bool = False) -> List[str]:
+    """
+    EXPLAIN each hot-path statement and return a list of failures (empty when
+    every statement uses one of its expected indexes).
+
+    Small development tables make sequential scans the cheapest plan, so by
+    default seqscans are disabled for the check: it verifies the index is
+    usable, not that the planner prefers it at the current table size.
+    """
+    failures: List[str] = []
+    if not allow_seqscan:
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+    for check in _hot_path_checks():
+        plan = explain(db, check.stmt)
+        nodes = list(_walk(plan))
+        indexes = {_root_index(db, n["Index Name"]) for n in nodes if n.get("Index Name")}
+        seq_scans = {n.get("Relation Name") for n in nodes if n.get("Node Type") == "Seq Scan"}
+        if not indexes.intersection(check.expected_indexes):
+            failures.append(
+                f"{check.name}: expected one of {list(check.expected_indexes)}, got indexes={sorted(indexes)} seq_scans={sorted(seq_scans)}"
+            )
+    db.rollback()
+    return failures
+
+
+def main(argv: List[str] | None = None) -> None:
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Check hot-path query plans against the expected indexes.")
+    parser.add_argument("--allow-seqscan", action="store_true", help="Check with the planner's default costs")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        failures = check_plans(db, allow_seqscan=args.allow_seqscan)
+    finally:
+        db.close()
+
+    for f in failures:
+        print(f"FAIL {f}")
+    if failures:
+        sys.exit(1)
+    print("All hot-path queries use their indexes")
+
+
+if __name__ == "__main__":
+    main()
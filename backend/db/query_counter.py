@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def _app_engines() -> List[Engine]:
+    from db.async_session import async_read_engine
+    from db.session import engine, read_engine
+
+    return [engine, read_engine, async_read_engine.sync_engine]
+
+
+class QueryCounter:
+    """
+    Records every statement executed on the given engines (default: all of
+    the application's engines, sync and async) while active.
+    """
+
+    def __init__(self, *engines: Engine):
+        self.engines = list(engines) or _app_engines()
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        for eng in self.engines:
+            event.listen(eng, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for eng in self.engines:
+            event.remove(eng, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def assert_max_queries(limit: int, *engines: Engine) -> Iterator[QueryCounter]:
+    """
+    Fail with the offending statements listed if the block runs more than
+    `limit` queries:
+
+        with assert_max_queries(1):
+            client.get("/quotes?limit=500")
+    """
+    with QueryCounter(*engines) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"  {i + 1}. {s.splitlines()[0][:160]}" for i, s in enumerate(counter.statements))
+        raise AssertionError(f"Expected at most {limit} queries, ran {counter.count}:\n{listing}")
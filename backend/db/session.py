@@ -1,13 +1,51 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
 from .base import Base
+from . import data_changes  # noqa: F401  (registers the commit hooks)
 
 
-engine = create_engine(settings.database_url.unicode_string(), future=True)
+def _make_engine(url: str, pool_size: int, max_overflow: int, statement_timeout_ms: int, **kwargs) -> Engine:
+    connect_args = {}
+    if statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    return create_engine(
+        url,
+        future=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+        **kwargs,
+    )
+
+
+engine = _make_engine(
+    settings.database_url.unicode_string(),
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    statement_timeout_ms=settings.db_statement_timeout_ms,
+)
+
+# Read routes get their own pool (on the replica when configured) so dashboard
+# traffic cannot exhaust the connections ingestion and scans need. Sessions
+# are read-only at the transaction level, which also guards against a read
+# route accidentally writing to the primary.
+_read_url = (settings.database_read_url or settings.database_url).unicode_string()
+read_engine = _make_engine(
+    _read_url,
+    pool_size=settings.db_read_pool_size,
+    max_overflow=settings.db_read_max_overflow,
+    statement_timeout_ms=settings.db_read_statement_timeout_ms,
+    execution_options={"postgresql_readonly": True},
+)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False, future=True)
 
 
 def get_db():
@@ -17,3 +55,10 @@ def get_db():
     finally:
         db.close()
 
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from db import models
+
+
+def get_watermark(db: Session, name: str, for_update: bool = False) -> Optional[models.PipelineWatermark]:
+    query = db.query(models.PipelineWatermark).filter(models.PipelineWatermark.name == name)
+    if for_update:
+        # Serializes concurrent runs of the same pipeline until commit
+        query = query.with_for_update()
+    return query.first()
+
+
+def lock_watermark(db: Session, name: str) -> models.PipelineWatermark:
+    """
+    Lock the named watermark until commit, creating it first if needed. A
+    missing row cannot be locked, so the first runs of a pipeline would
+    otherwise not serialize.
+    """
+    db.execute(
+        insert(models.PipelineWatermark)
+        .values(name=name, updated_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    return get_watermark(db, name, for_update=True)
+
+
+def set_watermark(
+    db: Session,
+    name: str,
+    last_updated_at: Optional[datetime],
+    last_id: Optional[int],
+) -> models.PipelineWatermark:
+    """
+    Advance (or create) the named watermark. The caller owns the commit, so
+    the watermark moves together with the work it covers.
+    """
+    wm = get_watermark(db, name)
+    if wm is None:
+        wm = models.PipelineWatermark(name=name)
+        db.add(wm)
+        # Sessions run with autoflush off; flush so later lookups see the row
+        db.flush()
+    wm.last_updated_at = last_updated_at
+    wm.last_id = last_id
+    wm.updated_at = datetime.utcnow()
+    return wm
+
+
+def reset_watermark(db: Session, name: str) -> None:
+    db.query(models.PipelineWatermark).filter(models.PipelineWatermark.name == name).delete()
@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 import re
 
+from core.metrics import ingestion_job
 from db import models
 from db.session import SessionLocal
 from ingestion.types import NormalizedMarket
@@ -177,6 +178,7 @@ def upsert_market(db, nm: NormalizedMarket, events_by_ref: Optional[dict] = None
     return market
 
 
+@ingestion_job("kalshi_markets")
 def ingest_kalshi_sports_markets() -> int:
     """
     Fetch Kalshi markets, normalize, and upsert sports-related markets.
@@ -5,6 +5,7 @@ from typing import Any, List, Optional, Tuple
 
 import re
 
+from core.metrics import ingestion_job
 from db import models
 from db.session import SessionLocal
 from kalshi.client import build_kalshi_client
@@ -89,6 +90,7 @@ def normalize_event(raw: dict) -> Optional[models.SportsEvent]:
     return ev
 
 
+@ingestion_job("kalshi_events")
 def ingest_kalshi_events() -> int:
     """
     Fetch sports events from Kalshi and upsert into sports_events.
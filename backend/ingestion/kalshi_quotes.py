@@ -3,6 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Optional
 
+from core.metrics import ingestion_job
 from db import models
 from db.session import SessionLocal
 from ingestion.utils import create_quotes_for_market
@@ -52,12 +53,14 @@ def _extract_yes_price(raw: dict) -> Optional[float]:
     return None
 
 
+@ingestion_job("kalshi_quotes")
 def ingest_kalshi_quotes() -> int:
     """
     Attempt to ingest quotes for Kalshi sports markets.
     Returns number of Quote rows created.
     """
     raw_markets = fetch_markets()
+    fetched_at = datetime.utcnow()
     db = SessionLocal()
     created = 0
     try:
@@ -90,6 +93,7 @@ def ingest_kalshi_quotes() -> int:
                 price_format="share_0_1",
                 source="kalshi_api",
                 timestamp=ts,
+                fetched_at=fetched_at,
             )
 
         db.commit()
@@ -6,6 +6,7 @@ from typing import Any, List
 import httpx
 
 from app.config import settings
+from core.metrics import VENUE_REQUEST_ERRORS, VENUE_REQUEST_SECONDS, ingestion_job
 from db import models
 from db.session import SessionLocal
 from ingestion.types import NormalizedMarket
@@ -37,10 +38,15 @@ def fetch_raw_markets() -> list[dict]:
     if settings.polymarket_api_key:
         headers["Authorization"] = f"Bearer {settings.polymarket_api_key}"
 
-    with httpx.Client(timeout=10.0) as client:
-        resp = client.get(url, headers=headers)
-        resp.raise_for_status()
-        data = resp.json()
+    try:
+        with httpx.Client(timeout=10.0) as client:
+            with VENUE_REQUEST_SECONDS.time(venue="polymarket"):
+                resp = client.get(url, headers=headers)
+            resp.raise_for_status()
+            data = resp.json()
+    except httpx.HTTPError:
+        VENUE_REQUEST_ERRORS.inc(venue="polymarket")
+        raise
 
     # clob.polymarket.com shape: {"data": [...], "next_cursor": ..., ...}
     if isinstance(data, dict):
@@ -118,6 +124,7 @@ def upsert_market(db, nm: NormalizedMarket) -> models.Market:
     return market
 
 
+@ingestion_job("polymarket_markets")
 def ingest_polymarket_sports_markets() -> int:
     """
     Fetch Polymarket markets, normalize, and upsert sports-related markets.
@@ -10,6 +10,7 @@ from db import models
 from db.session import SessionLocal
 from ingestion.utils import create_quotes_for_market
 from ingestion.polymarket import fetch_raw_markets as fetch_markets
+from core.metrics import ingestion_job
 from core.normalize import normalize_quote_fields
 
 
@@ -41,12 +42,14 @@ def _extract_yes_price(raw: dict) -> Optional[float]:
     return None
 
 
+@ingestion_job("polymarket_quotes")
 def ingest_polymarket_quotes() -> int:
     """
     Attempt to ingest quotes for Polymarket sports markets.
     Returns number of Quote rows created.
     """
     raw_markets = fetch_markets()
+    fetched_at = datetime.utcnow()
     db = SessionLocal()
     created = 0
     try:
@@ -79,6 +82,7 @@ def ingest_polymarket_quotes() -> int:
                 price_format="share_0_1",
                 source="polymarket_api",
                 timestamp=ts,
+                fetched_at=fetched_at,
             )
 
         db.commit()
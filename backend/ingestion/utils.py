@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from typing import Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from db import models
+from core.metrics import QUOTE_CREATE_SECONDS, QUOTES_WRITTEN, VENUE_LAST_QUOTE_TIMESTAMP
 from core.normalize import normalize_quote_fields
 
 
@@ -65,15 +67,18 @@ def create_quotes_for_market(
     price_format: str,
     source: str,
     timestamp: Optional[datetime] = None,
+    fetched_at: Optional[datetime] = None,
 ) -> int:
     """
     Given a market and a price for the 'yes' side, create Quote rows for
     both outcomes (second outcome uses 1 - yes_price) assuming a binary partition.
+    `fetched_at` is when the venue response carrying the price was received.
     Returns number of quotes created.
     """
     if yes_price is None:
         return 0
 
+    started = time.perf_counter()
     ensure_outcomes_for_market(market)
     db.flush()  # ensure outcomes have ids
     if not market.market_outcomes:
@@ -97,9 +102,14 @@ def create_quotes_for_market(
             raw_price=p,
             price_format=price_format,
             source=source,
+            fetched_at=fetched_at,
         )
         normalize_quote_fields(quote, venue)
         db.add(quote)
         created += 1
 
+    QUOTE_CREATE_SECONDS.observe(time.perf_counter() - started, venue=market.venue_id)
+    QUOTES_WRITTEN.inc(created, venue=market.venue_id)
+    venue_ts = ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+    VENUE_LAST_QUOTE_TIMESTAMP.set_max(venue_ts.timestamp(), venue=market.venue_id)
     return created
@@ -11,6 +11,7 @@ from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from cryptography.hazmat.primitives.asymmetric.padding import PSS
 
 from app.config import settings
+from core.metrics import VENUE_RATE_LIMIT_SLEEP_SECONDS, VENUE_REQUEST_ERRORS, VENUE_REQUEST_SECONDS
 
 
 class KalshiClient:
@@ -63,6 +64,7 @@ class KalshiClient:
         now = datetime.now()
         if now - self.last_api_call < timedelta(milliseconds=threshold_ms):
             time.sleep(threshold_ms / 1000)
+            VENUE_RATE_LIMIT_SLEEP_SECONDS.inc(threshold_ms / 1000, venue="kalshi")
         self.last_api_call = datetime.now()
 
     def _sign(self, method: str, path: str) -> Dict[str, str]:
@@ -93,8 +95,13 @@ class KalshiClient:
         self.rate_limit()
         url = f"{self.base_url}{path}"
         headers = self._sign("GET", path)
-        resp = httpx.get(url, headers=headers, params=params or {}, timeout=10.0)
-        resp.raise_for_status()
+        try:
+            with VENUE_REQUEST_SECONDS.time(venue="kalshi"):
+                resp = httpx.get(url, headers=headers, params=params or {}, timeout=10.0)
+            resp.raise_for_status()
+        except httpx.HTTPError:
+            VENUE_REQUEST_ERRORS.inc(venue="kalshi")
+            raise
         return resp
 
 
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from db import models
+from mapping.fuzzy import NgramIndex
+from mapping.teams import resolve_team
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({"the", "at", "vs", "v", "fc"})
+# Words shared by many teams' city or club names ("New York", "Los Angeles",
+# "Manchester United"): as blocking tokens they pull in unrelated teams
+_CITY_PREFIXES = frozenset(
+    {"new", "los", "las", "san", "santa", "st", "saint", "city", "united", "north", "south", "east", "west", "fort"}
+)
+
+
+def team_tokens(name: Optional[str]) -> Set[str]:
+    """
+    Normalized blocking tokens for a team mention: lowercase alphanumeric words,
+    minus filler words and city prefixes. "Phoenix Suns" -> {"phoenix", "suns"},
+    "New York Knicks" -> {"york", "knicks"}.
+    """
+    if not name:
+        return set()
+    return {t for t in _TOKEN_RE.findall(name.lower()) if t not in _STOPWORDS and t not in _CITY_PREFIXES}
+
+
+class EventBlockingIndex:
+    """
+    Candidate generator for market -> event mapping.
+
+    Built once per bulk run, it maps canonical team ids, team tokens, fuzzy
+    team-name n-grams and start-date buckets to events so each market is only
+    scored against events that share a team and start within
+    `date_window_days` of the market's time hint (events without a start
+    time pass the date check). When no team matches anything, the block
+    falls back to every event in the date window.
+    """
+
+    def __init__(self, date_window_days: int = 2, fuzzy_threshold: Optional[float] = None):
+        self.date_window_days = date_window_days
+        self._names: NgramIndex[int] = NgramIndex(
+            threshold=settings.mapping_fuzzy_threshold if fuzzy_threshold is None else fuzzy_threshold
+        )
+        self._events: Dict[int, models.SportsEvent] = {}
+        self._by_team_id: Dict[int, Set[int]] = {}
+        self._by_token: Dict[str, Set[int]] = {}
+        self._by_day: Dict[date, Set[int]] = {}
+
+    @classmethod
+    def build(cls, db: Session, sport: Optional[str] = None, date_window_days: int = 2) -> "EventBlockingIndex":
+        index = cls(date_window_days=date_window_days)
+        query = db.query(models.SportsEvent)
+        if sport:
+            query = query.filter(models.SportsEvent.sport == sport)
+        index.add_all(query.all())
+        return index
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def add_all(self, events: Iterable[models.SportsEvent]) -> None:
+        for ev in events:
+            self.add(ev)
+
+    def add(self, ev: models.SportsEvent) -> None:
+        self._events[ev.id] = ev
+        for name in (ev.home_team, ev.away_team):
+            team_id = resolve_team(name, ev.sport)
+            if team_id is not None:
+                self._by_team_id.setdefault(team_id, set()).add(ev.id)
+        for token in team_tokens(ev.home_team) | team_tokens(ev.away_team):
+            self._by_token.setdefault(token, set()).add(ev.id)
+        self._names.add(ev.id, ev.home_team)
+        self._names.add(ev.id, ev.away_team)
+        if ev.event_start_time_utc:
+            self._by_day.setdefault(ev.event_start_time_utc.date(), set()).add(ev.id)
+
+    def candidates(
+        self,
+        sport: Optional[str],
+        home_team: Optional[str],
+        away_team: Optional[str],
+        time_hint: Optional[datetime],
+    ) -> List[models.SportsEvent]:
+        ids: Set[int] = set()
+        for name in (home_team, away_team):
+            team_id = resolve_team(name, sport)
+            if team_id is not None:
+                ids |= self._by_team_id.get(team_id, set())
+        for token in team_tokens(home_team) | team_tokens(away_team):
+            ids |= self._by_token.get(token, set())
+        for name in (home_team, away_team):
+            ids.update(ev_id for ev_id, _ in self._names.lookup(name))
+
+        if time_hint:
+            day = time_hint.date()
+            in_window: Set[int] = set()
+            for offset in range(-self.date_window_days, self.date_window_days + 1):
+                in_window |= self._by_day.get(day + timedelta(days=offset), set())
+            if ids:
+                ids = {i for i in ids if i in in_window or self._events[i].event_start_time_utc is None}
+            else:
+                ids = in_window
+
+        events = [self._events[i] for i in sorted(ids)]
+        if sport:
+            events = [ev for ev in events if ev.sport == sport]
+        return events
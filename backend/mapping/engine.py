@@ -1,14 +1,21 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import and_, delete, insert, or_, select
 
+from app.config import settings
+from core.metrics import MAPPING_SECONDS
 from db import models
-from mapping.sports_parser import parse_and_update_market_from_normalized, parse_market_text
+from db.watermarks import get_watermark, reset_watermark, set_watermark
+from mapping.blocking import EventBlockingIndex
+from mapping.scoring import EventMatrix, MarketFeatures, ScoringWeights, score_block
+from mapping.sports_parser import apply_parsed_metadata, parse_and_update_market_from_normalized, parse_market_texts
+from mapping.fuzzy import similarity
+from mapping.teams import resolve_team
 from ingestion.types import NormalizedMarket
 
 
@@ -22,13 +29,33 @@ class MappingCandidateSuggestion:
 def _team_match_score(parsed_home: str, parsed_away: str, ev: models.SportsEvent) -> float:
     if not parsed_home or not parsed_away:
         return 0.0
+    # Compare canonical team ids so codes ("PHX") match full names ("Phoenix Suns")
+    home_id = resolve_team(parsed_home, ev.sport)
+    away_id = resolve_team(parsed_away, ev.sport)
+    ev_home_id = resolve_team(ev.home_team, ev.sport)
+    ev_away_id = resolve_team(ev.away_team, ev.sport)
+    if None not in (home_id, away_id, ev_home_id, ev_away_id):
+        if ev_home_id == home_id and ev_away_id == away_id:
+            return 1.0
+        if ev_home_id == away_id and ev_away_id == home_id:
+            return 0.8
+        return 0.0
     # Exact match with correct home/away
     if ev.home_team.lower() == parsed_home.lower() and ev.away_team.lower() == parsed_away.lower():
         return 1.0
     # Match ignoring home/away ordering
     if ev.home_team.lower() == parsed_away.lower() and ev.away_team.lower() == parsed_home.lower():
         return 0.8
-    return 0.0
+    # Fuzzy fallback for typos, sponsor suffixes and spelling variants
+    threshold = settings.mapping_fuzzy_threshold
+    straight = min(similarity(parsed_home, ev.home_team), similarity(parsed_away, ev.away_team))
+    swapped = min(similarity(parsed_home, ev.away_team), similarity(parsed_away, ev.home_team))
+    score = 0.0
+    if straight >= threshold:
+        score = straight
+    if swapped >= threshold:
+        score = max(score, 0.8 * swapped)
+    return round(score, 4)
 
 
 def _time_score(time_hint: Optional[datetime], ev_time: Optional[datetime]) -> float:
@@ -44,7 +71,13 @@ def _time_score(time_hint: Optional[datetime], ev_time: Optional[datetime]) -> f
     return 0.0
 
 
-def suggest_for_market(db: Session, market: models.Market) -> List[models.MappingCandidate]:
+def _candidate_rows(db: Session, market: models.Market, index: EventBlockingIndex, top_k: int = 5) -> List[dict]:
+    """
+    Parse a market and score it against the blocked candidate events,
+    returning mapping_candidates rows (not yet persisted) for the `top_k`
+    best, highest first, as `remap_all_markets` keeps. May create a new
+    auto-sourced sports event when nothing matches.
+    """
     # Ensure parsed fields exist
     nm = NormalizedMarket(
         venue_id=market.venue_id,
@@ -58,33 +91,17 @@ def suggest_for_market(db: Session, market: models.Market) -> List[models.Mappin
         parsed_sport_hint=market.parsed_sport,
         parsed_league_hint=market.parsed_league,
     )
-    parse_and_update_market_from_normalized(market, nm)
-
-    parsed = parse_market_text(
-        market.question_text,
-        sport_hint=market.parsed_sport,
-        league_hint=market.parsed_league,
-        time_hint=market.parsed_start_time_hint or market.expiration_time_utc or market.listing_time_utc,
-    )
+    parsed = parse_and_update_market_from_normalized(market, nm)
 
     parsed_sport = parsed.sport
     parsed_home = parsed.home_team or market.parsed_home_team
     parsed_away = parsed.away_team or market.parsed_away_team
     time_hint = parsed.event_start_time_hint or market.parsed_start_time_hint
 
-    # Clear existing pending candidates for this market
-    db.query(models.MappingCandidate).filter(
-        models.MappingCandidate.market_id == market.id,
-        models.MappingCandidate.status == "pending",
-    ).delete()
-
-    candidates: List[models.MappingCandidate] = []
-
-    event_query = db.query(models.SportsEvent)
-    if parsed_sport:
-        event_query = event_query.filter(models.SportsEvent.sport == parsed_sport)
+    rows: List[dict] = []
+    weights = ScoringWeights.from_settings()
 
-    events = event_query.all()
+    events = index.candidates(parsed_sport, parsed_home, parsed_away, time_hint)
 
     # Score existing events
     for ev in events:
@@ -92,26 +109,31 @@ def suggest_for_market(db: Session, market: models.Market) -> List[models.Mappin
         time_score_val = _time_score(time_hint, ev.event_start_time_utc)
         league_score = 1.0 if parsed_sport and ev.sport == parsed_sport else 0.5
 
-        base_score = 0.6 * team_score + 0.3 * time_score_val + 0.1 * league_score
+        base_score = (
+            weights.team * team_score + weights.time * time_score_val + weights.league * league_score
+        )
         if base_score <= 0:
             continue
 
-        candidate = models.MappingCandidate(
-            market_id=market.id,
-            candidate_sports_event_id=ev.id,
-            confidence_score=round(float(base_score), 4),
-            features_json={
-                "team_score": team_score,
-                "time_score": time_score_val,
-                "league_score": league_score,
-            },
-            status="pending",
+        rows.append(
+            {
+                "market_id": market.id,
+                "candidate_sports_event_id": ev.id,
+                "confidence_score": round(float(base_score), 4),
+                "features_json": {
+                    "team_score": team_score,
+                    "time_score": time_score_val,
+                    "league_score": league_score,
+                },
+                "status": "pending",
+            }
         )
-        db.add(candidate)
-        candidates.append(candidate)
+
+    rows.sort(key=lambda r: (-r["confidence_score"], r["candidate_sports_event_id"]))
+    del rows[top_k:]
 
     # If no candidates at all, create a new sports event based on parsed data
-    if not candidates:
+    if not rows:
         if parsed_sport and parsed_home and parsed_away:
             new_event = models.SportsEvent(
                 sport=parsed_sport,
@@ -127,44 +149,214 @@ def suggest_for_market(db: Session, market: models.Market) -> List[models.Mappin
             )
             db.add(new_event)
             db.flush()
+            # Later markets for the same game in this run should match it
+            index.add(new_event)
 
-            candidate = models.MappingCandidate(
-                market_id=market.id,
-                candidate_sports_event_id=new_event.id,
-                confidence_score=0.7,
-                features_json={"created_new_event": True},
-                status="pending",
+            rows.append(
+                {
+                    "market_id": market.id,
+                    "candidate_sports_event_id": new_event.id,
+                    "confidence_score": 0.7,
+                    "features_json": {"created_new_event": True},
+                    "status": "pending",
+                }
             )
-            db.add(candidate)
-            candidates.append(candidate)
 
+    return rows
+
+
+def suggest_for_market(
+    db: Session,
+    market: models.Market,
+    index: Optional[EventBlockingIndex] = None,
+    top_k: int = 5,
+) -> List[models.MappingCandidate]:
+    if index is None:
+        index = EventBlockingIndex.build(db, sport=market.parsed_sport)
+    rows = _candidate_rows(db, market, index, top_k=top_k)
+
+    # Clear existing pending candidates for this market
+    db.query(models.MappingCandidate).filter(
+        models.MappingCandidate.market_id == market.id,
+        models.MappingCandidate.status == "pending",
+    ).delete()
+
+    candidates = [models.MappingCandidate(**row) for row in rows]
+    db.add_all(candidates)
     return candidates
 
 
-def bulk_suggest_for_unmapped_markets(db: Session, limit: int = 100) -> int:
+MAPPING_WATERMARK = "mapping.suggest"
+
+
+@MAPPING_SECONDS.timed(job="suggest")
+def bulk_suggest_for_unmapped_markets(
+    db: Session,
+    limit: int = 100,
+    batch_size: int = 500,
+    full: bool = False,
+    top_k: int = 5,
+) -> int:
     """
     Generate mapping candidates for markets that do not yet have an
     associated sports_event and have no confirmed event_market_links.
+
+    Markets are walked in (updated_at, id) order from a stored watermark, so
+    each run only processes markets that are new or changed since the last
+    one; `full=True` rescans from the start (e.g. after new events arrive).
+    Pending candidates are replaced with one DELETE and one INSERT per batch,
+    keeping the `top_k` best per market. A market whose parsed fields change
+    during a run is seen once more on the next run, after which it is stable.
+
+    updated_at is stamped at flush, not commit, so a write can become visible
+    only after a run has moved the watermark past it. Each run therefore
+    starts `mapping_watermark_overlap_seconds` before the watermark. Markets
+    in that overlap are rescored again (replacing their pending candidates
+    is idempotent), do not count towards `limit` and never move the
+    watermark back.
     """
-    subq = (
-        db.query(models.EventMarketLink.market_id)
-        .filter(models.EventMarketLink.confirmed_by_user.is_(True))
-        .subquery()
-    )
+    if full:
+        reset_watermark(db, MAPPING_WATERMARK)
+        wm = None
+    else:
+        wm = get_watermark(db, MAPPING_WATERMARK)
+    seen = (wm.last_updated_at, wm.last_id or 0) if wm and wm.last_updated_at is not None else None
+    if seen is not None:
+        # Keyset position of the walk: just before the overlap window
+        last_ts, last_id = seen[0] - timedelta(seconds=settings.mapping_watermark_overlap_seconds), 0
+    else:
+        last_ts, last_id = None, None
+
+    confirmed = select(models.EventMarketLink.market_id).where(models.EventMarketLink.confirmed_by_user.is_(True))
+
+    index: Optional[EventBlockingIndex] = None
+    total = 0
+    remaining = limit
+    while remaining > 0:
+        query = db.query(models.Market).filter(~models.Market.id.in_(confirmed))
+        if last_ts is not None:
+            query = query.filter(
+                or_(
+                    models.Market.updated_at > last_ts,
+                    and_(models.Market.updated_at == last_ts, models.Market.id > last_id),
+                )
+            )
+        markets = (
+            query.order_by(models.Market.updated_at.asc(), models.Market.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not markets:
+            break
+        # Overlap markets sort first; only the ones past the watermark count
+        overlap = 0 if seen is None else sum(1 for m in markets if (m.updated_at, m.id) <= seen)
+        markets = markets[: overlap + remaining]
 
-    markets = (
-        db.query(models.Market)
-        .filter(
-            ~models.Market.id.in_(subq),
+        # Capture the keyset position before parsing can bump updated_at
+        last_ts, last_id = markets[-1].updated_at, markets[-1].id
+
+        if index is None:
+            index = EventBlockingIndex.build(db)
+
+        rows: List[dict] = []
+        for market in markets:
+            rows.extend(_candidate_rows(db, market, index, top_k=top_k))
+
+        db.execute(
+            delete(models.MappingCandidate).where(
+                models.MappingCandidate.market_id.in_([m.id for m in markets]),
+                models.MappingCandidate.status == "pending",
+            )
         )
-        .limit(limit)
-        .all()
+        if rows:
+            db.execute(insert(models.MappingCandidate), rows)
+
+        if seen is None or (last_ts, last_id) > seen:
+            seen = (last_ts, last_id)
+            set_watermark(db, MAPPING_WATERMARK, last_ts, last_id)
+        total += len(rows)
+        remaining -= len(markets) - overlap
+
+    return total
+
+
+@MAPPING_SECONDS.timed(job="remap")
+def remap_all_markets(
+    db: Session,
+    block_size: int = 256,
+    top_k: int = 5,
+    weights: Optional[ScoringWeights] = None,
+) -> int:
+    """
+    Re-parse every market without a confirmed link and rescore it against all
+    events of its sport in one pass, using the vectorized block scorer. Pending
+    candidates are replaced with the top-k per market. Unlike
+    `bulk_suggest_for_unmapped_markets`, no new events are created.
+
+    Every market it read counts as mapped for the incremental run: the
+    mapping watermark moves to the last of them in (updated_at, id) order,
+    so the next `bulk_suggest_for_unmapped_markets` only picks up markets
+    changed since (including any whose parsed fields this remap updated).
+    """
+    confirmed = select(models.EventMarketLink.market_id).where(models.EventMarketLink.confirmed_by_user.is_(True))
+    markets = db.query(models.Market).filter(~models.Market.id.in_(confirmed)).order_by(models.Market.id.asc()).all()
+    if not markets:
+        return 0
+    # Captured before parsing can bump updated_at
+    last_ts, last_id = max((m.updated_at, m.id) for m in markets)
+
+    parsed_all = parse_market_texts(
+        [m.question_text for m in markets],
+        sport_hints=[m.parsed_sport for m in markets],
+        league_hints=[m.parsed_league for m in markets],
+        time_hints=[m.expiration_time_utc or m.listing_time_utc for m in markets],
     )
+    features: List[MarketFeatures] = []
+    for market, parsed in zip(markets, parsed_all):
+        apply_parsed_metadata(market, parsed)
+        features.append(
+            MarketFeatures(
+                market_id=market.id,
+                sport=parsed.sport,
+                home_team=parsed.home_team or market.parsed_home_team,
+                away_team=parsed.away_team or market.parsed_away_team,
+                time_hint=parsed.event_start_time_hint or market.parsed_start_time_hint,
+            )
+        )
+
+    sport_codes: Dict[str, int] = {}
+    em = EventMatrix(db.query(models.SportsEvent).order_by(models.SportsEvent.id.asc()).all(), sport_codes)
 
     total = 0
-    for market in markets:
-        created = suggest_for_market(db, market)
-        if created:
-            total += len(created)
+    for start in range(0, len(features), block_size):
+        block = features[start : start + block_size]
+        scored = score_block(
+            block, em, sport_codes, weights=weights, top_k=top_k, fuzzy_threshold=settings.mapping_fuzzy_threshold
+        )
+        rows = [
+            {
+                "market_id": c.market_id,
+                "candidate_sports_event_id": c.sports_event_id,
+                "confidence_score": c.score,
+                "features_json": {
+                    "team_score": c.team_score,
+                    "time_score": c.time_score,
+                    "league_score": c.league_score,
+                },
+                "status": "pending",
+            }
+            for per_market in scored
+            for c in per_market
+        ]
+        db.execute(
+            delete(models.MappingCandidate).where(
+                models.MappingCandidate.market_id.in_([m.market_id for m in block]),
+                models.MappingCandidate.status == "pending",
+            )
+        )
+        if rows:
+            db.execute(insert(models.MappingCandidate), rows)
+        total += len(rows)
 
+    set_watermark(db, MAPPING_WATERMARK, last_ts, last_id)
     return total
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+
+NGRAM_SIZE = 3
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+@lru_cache(maxsize=16384)
+def ngrams(text: Optional[str], n: int = NGRAM_SIZE) -> FrozenSet[str]:
+    """
+    Character n-grams of a normalized name, padded so word boundaries count:
+    "LA Clippers" -> {" la", "la ", "a c", " cl", ...}.
+    """
+    if not text:
+        return frozenset()
+    norm = " " + _NON_ALNUM_RE.sub(" ", text.lower()).strip() + " "
+    if len(norm) <= n:
+        return frozenset({norm})
+    return frozenset(norm[i : i + n] for i in range(len(norm) - n + 1))
+
+
+def similarity(a: Optional[str], b: Optional[str]) -> float:
+    """
+    Dice coefficient over character n-grams, in [0, 1].
+    """
+    ga = ngrams(a)
+    gb = ngrams(b)
+    if not ga or not gb:
+        return 0.0
+    return 2.0 * len(ga & gb) / (len(ga) + len(gb))
+
+
+class NgramIndex(Generic[K]):
+    """
+    Inverted index from character n-grams to keyed names. A lookup only
+    touches the postings of the query's n-grams, so it stays well under a
+    millisecond for a season's worth of team names.
+    """
+
+    def __init__(self, threshold: float = 0.6):
+        self.threshold = threshold
+        self._entries: List[Tuple[K, int]] = []
+        self._postings: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: K, name: Optional[str]) -> None:
+        grams = ngrams(name)
+        if not grams:
+            return
+        idx = len(self._entries)
+        self._entries.append((key, len(grams)))
+        for g in grams:
+            self._postings.setdefault(g, []).append(idx)
+
+    def lookup(self, name: Optional[str], threshold: Optional[float] = None) -> List[Tuple[K, float]]:
+        """
+        Return (key, score) pairs at or above the threshold, best first. A key
+        indexed under several names keeps its best score.
+        """
+        grams = ngrams(name)
+        if not grams:
+            return []
+        cutoff = self.threshold if threshold is None else threshold
+
+        shared: Dict[int, int] = {}
+        for g in grams:
+            for idx in self._postings.get(g, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+
+        best: Dict[K, float] = {}
+        q = len(grams)
+        for idx, count in shared.items():
+            key, size = self._entries[idx]
+            score = 2.0 * count / (q + size)
+            if score >= cutoff and score > best.get(key, 0.0):
+                best[key] = score
+        return sorted(best.items(), key=lambda kv: kv[1], reverse=True)
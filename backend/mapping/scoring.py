@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+from db import models
+from mapping.fuzzy import ngrams
+from mapping.teams import resolve_team
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    team: float = 0.6
+    time: float = 0.3
+    league: float = 0.1
+
+    @classmethod
+    def from_settings(cls) -> "ScoringWeights":
+        return cls(
+            team=settings.mapping_team_weight,
+            time=settings.mapping_time_weight,
+            league=settings.mapping_league_weight,
+        )
+
+
+@dataclass
+class MarketFeatures:
+    market_id: int
+    sport: Optional[str]
+    home_team: Optional[str]
+    away_team: Optional[str]
+    time_hint: Optional[datetime]
+
+
+@dataclass
+class ScoredCandidate:
+    market_id: int
+    sports_event_id: int
+    score: float
+    team_score: float
+    time_score: float
+    league_score: float
+
+
+_UNKNOWN = -1
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch_hours(ts: Optional[datetime]) -> float:
+    if ts is None:
+        return np.nan
+    # Naive datetimes are UTC throughout the schema
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ts - _EPOCH).total_seconds() / 3600.0
+
+
+class NameColumn:
+    """
+    One team-name column of the event matrix, indexed by character n-gram so
+    many names can be compared against every event at once (the vectorized
+    form of mapping.fuzzy.similarity).
+    """
+
+    def __init__(self, names: Sequence[Optional[str]]):
+        self.lower = np.array([(n or "").lower() for n in names], dtype=object)
+        self.sizes = np.array([len(ngrams(n)) for n in names], dtype=np.float64)
+        postings: Dict[str, List[int]] = {}
+        for j, name in enumerate(names):
+            for gram in ngrams(name):
+                postings.setdefault(gram, []).append(j)
+        self._postings = {gram: np.array(idx, dtype=np.int64) for gram, idx in postings.items()}
+
+    def similarity(self, names: Sequence[str]) -> np.ndarray:
+        """Dice coefficient of each of `names` against every name in the column."""
+        unique = sorted(set(names))
+        inter = np.zeros((len(unique), len(self.sizes)), dtype=np.float64)
+        for i, name in enumerate(unique):
+            for gram in ngrams(name):
+                idx = self._postings.get(gram)
+                if idx is not None:
+                    inter[i, idx] += 1.0
+        q_sizes = np.array([len(ngrams(n)) for n in unique], dtype=np.float64)[:, None]
+        denom = q_sizes + self.sizes[None, :]
+        sim = np.where((q_sizes > 0) & (self.sizes[None, :] > 0), 2.0 * inter / np.maximum(denom, 1.0), 0.0)
+        # Each distinct name was scored once; expand back to one row per input
+        row = {name: i for i, name in enumerate(unique)}
+        return sim[[row[n] for n in names]]
+
+
+class EventMatrix:
+    """
+    Column-oriented event features, built once per remap and shared by every
+    market block.
+    """
+
+    def __init__(self, events: Sequence[models.SportsEvent], sport_codes: Dict[str, int]):
+        self.events = list(events)
+        self.ids = np.array([ev.id for ev in self.events], dtype=np.int64)
+        self.sport = np.array([sport_codes.setdefault(ev.sport, len(sport_codes)) for ev in self.events], dtype=np.int32)
+        self.home = np.array(
+            [resolve_team(ev.home_team, ev.sport) or _UNKNOWN for ev in self.events], dtype=np.int32
+        )
+        self.away = np.array(
+            [resolve_team(ev.away_team, ev.sport) or _UNKNOWN for ev in self.events], dtype=np.int32
+        )
+        self.start_hours = np.array([_epoch_hours(ev.event_start_time_utc) for ev in self.events], dtype=np.float64)
+        self.home_names = NameColumn([ev.home_team for ev in self.events])
+        self.away_names = NameColumn([ev.away_team for ev in self.events])
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+
+def _name_team_scores(markets: Sequence[MarketFeatures], em: EventMatrix, threshold: float) -> np.ndarray:
+    """
+    Team scores from the raw names, for every (market, event) pair at once:
+    exact (case-insensitive) names score 1.0, or 0.8 swapped; otherwise the
+    n-gram similarity of the weaker side, counted only at `threshold` or
+    above and at 0.8 when swapped.
+    """
+    home = [m.home_team or "" for m in markets]
+    away = [m.away_team or "" for m in markets]
+    home_lower = np.array([h.lower() for h in home], dtype=object)[:, None]
+    away_lower = np.array([a.lower() for a in away], dtype=object)[:, None]
+
+    exact = (home_lower == em.home_names.lower[None, :]) & (away_lower == em.away_names.lower[None, :])
+    exact_swapped = (home_lower == em.away_names.lower[None, :]) & (away_lower == em.home_names.lower[None, :])
+
+    straight = np.minimum(em.home_names.similarity(home), em.away_names.similarity(away))
+    swapped = np.minimum(em.away_names.similarity(home), em.home_names.similarity(away))
+    fuzzy = np.where(straight >= threshold, straight, 0.0)
+    fuzzy = np.where(swapped >= threshold, np.maximum(fuzzy, 0.8 * swapped), fuzzy)
+
+    scores = np.where(exact, 1.0, np.where(exact_swapped, 0.8, np.round(fuzzy, 4)))
+    has_names = np.array([bool(h) and bool(a) for h, a in zip(home, away)])[:, None]
+    return np.where(has_names, scores, 0.0)
+
+
+def score_block(
+    markets: Sequence[MarketFeatures],
+    em: EventMatrix,
+    sport_codes: Dict[str, int],
+    weights: Optional[ScoringWeights] = None,
+    top_k: int = 5,
+    fuzzy_threshold: Optional[float] = None,
+) -> List[List[ScoredCandidate]]:
+    """
+    Score a block of markets against every event at once and return the
+    top-k positive candidates per market, best first.
+
+    Mirrors the per-pair scoring in mapping.engine: team-id equality (0.8 when
+    home/away are swapped), time deltas bucketed like `_time_score`, and a
+    league bonus; events of a different sport are excluded when the market's
+    sport is known. With `fuzzy_threshold`, pairs the team registry cannot
+    resolve fall back to name matching like `_team_match_score`.
+    """
+    weights = weights or ScoringWeights.from_settings()
+    if not markets or not len(em):
+        return [[] for _ in markets]
+
+    m_sport = np.array(
+        [sport_codes.get(m.sport, _UNKNOWN - 1) if m.sport else _UNKNOWN for m in markets], dtype=np.int32
+    )
+    m_home = np.array([resolve_team(m.home_team, m.sport) or _UNKNOWN for m in markets], dtype=np.int32)
+    m_away = np.array([resolve_team(m.away_team, m.sport) or _UNKNOWN for m in markets], dtype=np.int32)
+    m_hours = np.array([_epoch_hours(m.time_hint) for m in markets], dtype=np.float64)
+
+    # Sport: unknown market sport matches everything at half weight
+    sport_known = (m_sport != _UNKNOWN)[:, None]
+    sport_eq = m_sport[:, None] == em.sport[None, :]
+    valid = ~sport_known | sport_eq
+    league = np.where(sport_known & sport_eq, 1.0, 0.5)
+
+    # Team: canonical id equality
+    mh, ma = m_home[:, None], m_away[:, None]
+    eh, ea = em.home[None, :], em.away[None, :]
+    known = (mh != _UNKNOWN) & (ma != _UNKNOWN) & (eh != _UNKNOWN) & (ea != _UNKNOWN)
+    team = np.where(known & (mh == eh) & (ma == ea), 1.0, np.where(known & (mh == ea) & (ma == eh), 0.8, 0.0))
+
+    if fuzzy_threshold is not None:
+        need = ~known & valid
+        rows = np.flatnonzero(need.any(axis=1))
+        if len(rows):
+            fallback = _name_team_scores([markets[i] for i in rows], em, fuzzy_threshold)
+            team[rows] = np.where(need[rows], fallback, team[rows])
+
+    # Time: same buckets as _time_score, 0.5 when either side has no time
+    delta = np.abs(em.start_hours[None, :] - m_hours[:, None])
+    with np.errstate(invalid="ignore"):
+        time = np.select([delta < 2, delta < 12, delta < 48], [1.0, 0.8, 0.5], 0.0)
+    time = np.where(np.isnan(delta), 0.5, time)
+
+    score = weights.team * team + weights.time * time + weights.league * league
+    score = np.where(valid, score, -np.inf)
+
+    k = min(top_k, len(em))
+    top = np.argpartition(-score, k - 1, axis=1)[:, :k]
+
+    results: List[List[ScoredCandidate]] = []
+    for i, m in enumerate(markets):
+        row = sorted(top[i], key=lambda j: score[i, j], reverse=True)
+        results.append(
+            [
+                ScoredCandidate(
+                    market_id=m.market_id,
+                    sports_event_id=int(em.ids[j]),
+                    score=round(float(score[i, j]), 4),
+                    team_score=float(team[i, j]),
+                    time_score=float(time[i, j]),
+                    league_score=float(league[i, j]),
+                )
+                for j in row
+                if score[i, j] > 0
+            ]
+        )
+    return results
@@ -3,7 +3,8 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
 
 from db import models
 from ingestion.types import NormalizedMarket
@@ -26,24 +27,37 @@ SPORT_MAP = {
 }
 
 
+_SPORT_RE = re.compile("|".join(SPORT_MAP), flags=re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+_MATCHUP_PATTERNS = [
+    re.compile(r"(?P<away>.+?)\s+@\s+(?P<home>.+)", flags=re.IGNORECASE),
+    re.compile(r"(?P<away>.+?)\s+at\s+(?P<home>.+)", flags=re.IGNORECASE),
+    re.compile(r"(?P<home>.+?)\s+vs\.?\s+(?P<away>.+)", flags=re.IGNORECASE),
+]
+
+# Venues repeat near-identical question templates, and mapping re-parses the
+# same markets on every run, so parse results are memoized by text + hints.
+PARSE_CACHE_SIZE = 65536
+
+
 def _clean_team_name(name: str) -> str:
-    return re.sub(r"\s+", " ", name.strip())
+    return _WHITESPACE_RE.sub(" ", name.strip())
 
 
-def parse_market_text(
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(
     question_text: str,
-    sport_hint: Optional[str] = None,
-    league_hint: Optional[str] = None,
-    time_hint: Optional[datetime] = None,
-) -> ParsedMarketMetadata:
+    sport_hint: Optional[str],
+    league_hint: Optional[str],
+) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
     sport = None
     if sport_hint:
         upper = sport_hint.upper()
         sport = SPORT_MAP.get(upper, upper)
     else:
-        upper_text = question_text.upper()
+        found = {m.upper() for m in _SPORT_RE.findall(question_text)}
         for k, v in SPORT_MAP.items():
-            if k in upper_text:
+            if k in found:
                 sport = v
                 break
 
@@ -64,20 +78,23 @@ def parse_market_text(
     home_team = None
     away_team = None
 
-    patterns = [
-        r"(?P<away>.+?)\s+@\s+(?P<home>.+)",
-        r"(?P<away>.+?)\s+at\s+(?P<home>.+)",
-        r"(?P<home>.+?)\s+vs\.?\s+(?P<away>.+)",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, main_text, flags=re.IGNORECASE)
+    for pattern in _MATCHUP_PATTERNS:
+        match = pattern.search(main_text)
         if match:
-            away_raw = match.group("away")
-            home_raw = match.group("home")
-            away_team = _clean_team_name(away_raw)
-            home_team = _clean_team_name(home_raw)
+            away_team = _clean_team_name(match.group("away"))
+            home_team = _clean_team_name(match.group("home"))
             break
 
+    return sport, league, home_team, away_team
+
+
+def parse_market_text(
+    question_text: str,
+    sport_hint: Optional[str] = None,
+    league_hint: Optional[str] = None,
+    time_hint: Optional[datetime] = None,
+) -> ParsedMarketMetadata:
+    sport, league, home_team, away_team = _parse_cached(question_text, sport_hint or None, league_hint or None)
     return ParsedMarketMetadata(
         sport=sport,
         league=league,
@@ -87,14 +104,40 @@ def parse_market_text(
     )
 
 
-def parse_and_update_market_from_normalized(market: models.Market, nm: NormalizedMarket) -> None:
+def parse_market_texts(
+    question_texts: Sequence[str],
+    sport_hints: Optional[Sequence[Optional[str]]] = None,
+    league_hints: Optional[Sequence[Optional[str]]] = None,
+    time_hints: Optional[Sequence[Optional[datetime]]] = None,
+) -> List[ParsedMarketMetadata]:
+    """
+    Batch form of `parse_market_text`. Hint sequences, when given, must be
+    parallel to `question_texts`.
+    """
+    n = len(question_texts)
+    sport_hints = sport_hints if sport_hints is not None else [None] * n
+    league_hints = league_hints if league_hints is not None else [None] * n
+    time_hints = time_hints if time_hints is not None else [None] * n
+    if not (len(sport_hints) == len(league_hints) == len(time_hints) == n):
+        raise ValueError("Hint sequences must be the same length as question_texts")
+    return [
+        parse_market_text(text, sport_hint=sh, league_hint=lh, time_hint=th)
+        for text, sh, lh, th in zip(question_texts, sport_hints, league_hints, time_hints)
+    ]
+
+
+def parse_and_update_market_from_normalized(market: models.Market, nm: NormalizedMarket) -> ParsedMarketMetadata:
     parsed = parse_market_text(
         nm.question_text,
         sport_hint=nm.parsed_sport_hint or market.parsed_sport,
         league_hint=nm.parsed_league_hint or market.parsed_league,
         time_hint=nm.expiration_time_utc or nm.listing_time_utc,
     )
+    apply_parsed_metadata(market, parsed)
+    return parsed
+
 
+def apply_parsed_metadata(market: models.Market, parsed: ParsedMarketMetadata) -> None:
     if parsed.sport:
         market.parsed_sport = parsed.sport
     if parsed.league:
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Team:
+    id: int
+    sport: str
+    code: str
+    city: str
+    nickname: str
+    # Extra venue codes (matched case-sensitively) and free-text aliases
+    alt_codes: Tuple[str, ...] = ()
+    aliases: Tuple[str, ...] = ()
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.city} {self.nickname}"
+
+
+# Ids are stable: sport block (MLB 1xxx, NFL 2xxx, NBA 3xxx, NHL 4xxx) + ordinal.
+# Never renumber an existing team; append new ones at the end of their block.
+_MLB = [
+    ("ARI", "Arizona", "Diamondbacks", ("AZ",), ("D-backs", "Dbacks")),
+    ("ATL", "Atlanta", "Braves", (), ()),
+    ("BAL", "Baltimore", "Orioles", (), ("O's",)),
+    ("BOS", "Boston", "Red Sox", (), ()),
+    ("CHC", "Chicago", "Cubs", (), ()),
+    ("CWS", "Chicago", "White Sox", ("CHW",), ()),
+    ("CIN", "Cincinnati", "Reds", (), ()),
+    ("CLE", "Cleveland", "Guardians", (), ()),
+    ("COL", "Colorado", "Rockies", (), ()),
+    ("DET", "Detroit", "Tigers", (), ()),
+    ("HOU", "Houston", "Astros", (), ()),
+    ("KC", "Kansas City", "Royals", ("KCR",), ()),
+    ("LAA", "Los Angeles", "Angels", ("ANA",), ("Anaheim Angels", "LA Angels")),
+    ("LAD", "Los Angeles", "Dodgers", (), ("LA Dodgers",)),
+    ("MIA", "Miami", "Marlins", (), ()),
+    ("MIL", "Milwaukee", "Brewers", (), ()),
+    ("MIN", "Minnesota", "Twins", (), ()),
+    ("NYM", "New York", "Mets", (), ("NY Mets",)),
+    ("NYY", "New York", "Yankees", (), ("NY Yankees",)),
+    ("ATH", "Oakland", "Athletics", ("OAK",), ("A's", "Sacramento Athletics", "Las Vegas Athletics")),
+    ("PHI", "Philadelphia", "Phillies", (), ()),
+    ("PIT", "Pittsburgh", "Pirates", (), ()),
+    ("SD", "San Diego", "Padres", ("SDP",), ()),
+    ("SF", "San Francisco", "Giants", ("SFG",), ("SF Giants",)),
+    ("SEA", "Seattle", "Mariners", (), ()),
+    ("STL", "St. Louis", "Cardinals", (), ("St Louis Cardinals", "Saint Louis Cardinals")),
+    ("TB", "Tampa Bay", "Rays", ("TBR",), ()),
+    ("TEX", "Texas", "Rangers", (), ()),
+    ("TOR", "Toronto", "Blue Jays", (), ()),
+    ("WSH", "Washington", "Nationals", ("WAS", "WSN"), ("Nats",)),
+]
+
+_NFL = [
+    ("ARI", "Arizona", "Cardinals", (), ()),
+    ("ATL", "Atlanta", "Falcons", (), ()),
+    ("BAL", "Baltimore", "Ravens", (), ()),
+    ("BUF", "Buffalo", "Bills", (), ()),
+    ("CAR", "Carolina", "Panthers", (), ()),
+    ("CHI", "Chicago", "Bears", (), ()),
+    ("CIN", "Cincinnati", "Bengals", (), ()),
+    ("CLE", "Cleveland", "Browns", (), ()),
+    ("DAL", "Dallas", "Cowboys", (), ()),
+    ("DEN", "Denver", "Broncos", (), ()),
+    ("DET", "Detroit", "Lions", (), ()),
+    ("GB", "Green Bay", "Packers", ("GNB",), ()),
+    ("HOU", "Houston", "Texans", (), ()),
+    ("IND", "Indianapolis", "Colts", (), ()),
+    ("JAX", "Jacksonville", "Jaguars", ("JAC",), ()),
+    ("KC", "Kansas City", "Chiefs", ("KAN",), ()),
+    ("LV", "Las Vegas", "Raiders", ("LVR",), ()),
+    ("LAC", "Los Angeles", "Chargers", (), ("LA Chargers",)),
+    ("LAR", "Los Angeles", "Rams", ("LA",), ("LA Rams",)),
+    ("MIA", "Miami", "Dolphins", (), ()),
+    ("MIN", "Minnesota", "Vikings", (), ()),
+    ("NE", "New England", "Patriots", ("NWE",), ("Pats",)),
+    ("NO", "New Orleans", "Saints", ("NOR",), ()),
+    ("NYG", "New York", "Giants", (), ("NY Giants",)),
+    ("NYJ", "New York", "Jets", (), ("NY Jets",)),
+    ("PHI", "Philadelphia", "Eagles", (), ()),
+    ("PIT", "Pittsburgh", "Steelers", (), ()),
+    ("SF", "San Francisco", "49ers", ("SFO",), ("Niners",)),
+    ("SEA", "Seattle", "Seahawks", (), ()),
+    ("TB", "Tampa Bay", "Buccaneers", ("TAM",), ("Bucs",)),
+    ("TEN", "Tennessee", "Titans", (), ()),
+    ("WAS", "Washington", "Commanders", ("WSH",), ()),
+]
+
+_NBA = [
+    ("ATL", "Atlanta", "Hawks", (), ()),
+    ("BOS", "Boston", "Celtics", (), ()),
+    ("BKN", "Brooklyn", "Nets", ("BRK",), ()),
+    ("CHA", "Charlotte", "Hornets", ("CHO",), ()),
+    ("CHI", "Chicago", "Bulls", (), ()),
+    ("CLE", "Cleveland", "Cavaliers", (), ("Cavs",)),
+    ("DAL", "Dallas", "Mavericks", (), ("Mavs",)),
+    ("DEN", "Denver", "Nuggets", (), ()),
+    ("DET", "Detroit", "Pistons", (), ()),
+    ("GSW", "Golden State", "Warriors", ("GS",), ()),
+    ("HOU", "Houston", "Rockets", (), ()),
+    ("IND", "Indiana", "Pacers", (), ()),
+    ("LAC", "Los Angeles", "Clippers", (), ("LA Clippers",)),
+    ("LAL", "Los Angeles", "Lakers", (), ("LA Lakers",)),
+    ("MEM", "Memphis", "Grizzlies", (), ()),
+    ("MIA", "Miami", "Heat", (), ()),
+    ("MIL", "Milwaukee", "Bucks", (), ()),
+    ("MIN", "Minnesota", "Timberwolves", (), ("Wolves",)),
+    ("NOP", "New Orleans", "Pelicans", ("NO",), ()),
+    ("NYK", "New York", "Knicks", ("NY",), ()),
+    ("OKC", "Oklahoma City", "Thunder", (), ()),
+    ("ORL", "Orlando", "Magic", (), ()),
+    ("PHI", "Philadelphia", "76ers", (), ("Sixers",)),
+    ("PHX", "Phoenix", "Suns", ("PHO",), ()),
+    ("POR", "Portland", "Trail Blazers", (), ("Blazers",)),
+    ("SAC", "Sacramento", "Kings", (), ()),
+    ("SAS", "San Antonio", "Spurs", ("SA",), ()),
+    ("TOR", "Toronto", "Raptors", (), ()),
+    ("UTA", "Utah", "Jazz", ("UTAH",), ()),
+    ("WAS", "Washington", "Wizards", ("WSH",), ()),
+]
+
+_NHL = [
+    ("ANA", "Anaheim", "Ducks", (), ()),
+    ("BOS", "Boston", "Bruins", (), ()),
+    ("BUF", "Buffalo", "Sabres", (), ()),
+    ("CGY", "Calgary", "Flames", (), ()),
+    ("CAR", "Carolina", "Hurricanes", (), ("Canes",)),
+    ("CHI", "Chicago", "Blackhawks", (), ()),
+    ("COL", "Colorado", "Avalanche", (), ("Avs",)),
+    ("CBJ", "Columbus", "Blue Jackets", (), ()),
+    ("DAL", "Dallas", "Stars", (), ()),
+    ("DET", "Detroit", "Red Wings", (), ()),
+    ("EDM", "Edmonton", "Oilers", (), ()),
+    ("FLA", "Florida", "Panthers", (), ()),
+    ("LAK", "Los Angeles", "Kings", ("LA",), ("LA Kings",)),
+    ("MIN", "Minnesota", "Wild", (), ()),
+    ("MTL", "Montreal", "Canadiens", ("MON",), ("Montréal Canadiens", "Habs")),
+    ("NSH", "Nashville", "Predators", (), ("Preds",)),
+    ("NJD", "New Jersey", "Devils", ("NJ",), ()),
+    ("NYI", "New York", "Islanders", (), ("NY Islanders",)),
+    ("NYR", "New York", "Rangers", (), ("NY Rangers",)),
+    ("OTT", "Ottawa", "Senators", (), ("Sens",)),
+    ("PHI", "Philadelphia", "Flyers", (), ()),
+    ("PIT", "Pittsburgh", "Penguins", (), ()),
+    ("SJS", "San Jose", "Sharks", ("SJ",), ()),
+    ("SEA", "Seattle", "Kraken", (), ()),
+    ("STL", "St. Louis", "Blues", (), ("St Louis Blues",)),
+    ("TBL", "Tampa Bay", "Lightning", ("TB",), ()),
+    ("TOR", "Toronto", "Maple Leafs", (), ("Leafs",)),
+    ("UTA", "Utah", "Mammoth", (), ("Utah Hockey Club",)),
+    ("VAN", "Vancouver", "Canucks", (), ()),
+    ("VGK", "Vegas", "Golden Knights", ("VEG",), ()),
+    ("WSH", "Washington", "Capitals", ("WAS",), ("Caps",)),
+    ("WPG", "Winnipeg", "Jets", (), ()),
+]
+
+
+def _build_registry() -> Tuple[Team, ...]:
+    teams: List[Team] = []
+    for sport, base, rows in (("MLB", 1000, _MLB), ("NFL", 2000, _NFL), ("NBA", 3000, _NBA), ("NHL", 4000, _NHL)):
+        for i, (code, city, nickname, alt_codes, aliases) in enumerate(rows, start=1):
+            teams.append(Team(base + i, sport, code, city, nickname, alt_codes, aliases))
+    return tuple(teams)
+
+
+TEAMS: Tuple[Team, ...] = _build_registry()
+TEAMS_BY_ID: Dict[int, Team] = {t.id: t for t in TEAMS}
+
+
+# Word-level trie over lowercase alias tokens. Each terminal holds the set of
+# (team_id, code_only) pairs the alias can refer to; code_only aliases only
+# match when the source token is written in uppercase, so "no" or "sea" in
+# ordinary prose is never read as a team code.
+_TERMINAL = "$"
+_WORD_RE = re.compile(r"[A-Za-z0-9]+(?:'[A-Za-z]+)?")
+
+
+def _alias_tokens(alias: str) -> Tuple[str, ...]:
+    return tuple(w.lower() for w in _WORD_RE.findall(alias.replace(".", "")))
+
+
+def _build_trie() -> dict:
+    root: dict = {}
+
+    def insert(alias: str, team_id: int, code_only: bool) -> None:
+        tokens = _alias_tokens(alias)
+        if not tokens:
+            return
+        node = root
+        for tok in tokens:
+            node = node.setdefault(tok, {})
+        node.setdefault(_TERMINAL, set()).add((team_id, code_only))
+
+    for t in TEAMS:
+        for code in (t.code,) + t.alt_codes:
+            insert(code, t.id, True)
+        insert(t.full_name, t.id, False)
+        insert(t.nickname, t.id, False)
+        insert(t.city, t.id, False)
+        for alias in t.aliases:
+            insert(alias, t.id, False)
+
+    def freeze(node: dict) -> dict:
+        frozen = {k: freeze(v) for k, v in node.items() if k != _TERMINAL}
+        if _TERMINAL in node:
+            frozen[_TERMINAL] = frozenset(node[_TERMINAL])
+        return frozen
+
+    return freeze(root)
+
+
+_TRIE = _build_trie()
+
+
+@dataclass(frozen=True)
+class TeamMention:
+    team_id: int
+    start: int
+    end: int
+
+
+def _matching_ids(entries: FrozenSet[Tuple[int, bool]], sport: Optional[str], is_upper: bool) -> FrozenSet[int]:
+    ids = set()
+    for team_id, code_only in entries:
+        if code_only and not is_upper:
+            continue
+        if sport and TEAMS_BY_ID[team_id].sport != sport:
+            continue
+        ids.add(team_id)
+    return frozenset(ids)
+
+
+def find_team_mentions(text: str, sport: Optional[str] = None) -> List[TeamMention]:
+    """
+    Scan `text` once and return every unambiguous team mention, preferring the
+    longest alias at each position ("Los Angeles Lakers" over "Los Angeles").
+    Mentions that could refer to several teams (a shared city, or a nickname
+    used in two sports when `sport` is unknown) are dropped. The longest
+    alias is chosen before the sport filter: when it belongs to another
+    sport, its words are consumed without a mention rather than falling back
+    to a shorter alias inside it ("NY Yankees" is not the Knicks' "NY").
+    """
+    if not text:
+        return []
+    words = _words(text)
+    mentions: List[TeamMention] = []
+    i = 0
+    while i < len(words):
+        node = _TRIE
+        best: Optional[Tuple[int, FrozenSet[Tuple[int, bool]], bool]] = None
+        all_upper = True
+        j = i
+        while j < len(words):
+            word = words[j][0]
+            node = node.get(word.lower())
+            if node is None:
+                break
+            all_upper = all_upper and word.isupper()
+            if _TERMINAL in node and _matching_ids(node[_TERMINAL], None, all_upper):
+                best = (j, node[_TERMINAL], all_upper)
+            j += 1
+        if best is None:
+            i += 1
+            continue
+        end_idx, entries, is_upper = best
+        ids = _matching_ids(entries, sport, is_upper)
+        if len(ids) == 1:
+            mentions.append(TeamMention(next(iter(ids)), words[i][1], words[end_idx][2]))
+        i = end_idx + 1
+    return mentions
+
+
+def _words(text: str) -> List[Tuple[str, int, int]]:
+    return [(m.group(0), m.start(), m.end()) for m in _WORD_RE.finditer(text.replace(".", " "))]
+
+
+@lru_cache(maxsize=8192)
+def resolve_team(name: Optional[str], sport: Optional[str] = None) -> Optional[int]:
+    """
+    Resolve a team name, nickname or venue code to a canonical team id.
+    Returns None when the name is unknown or ambiguous for the sport, or
+    when any word of it is not part of a mention of that team ("Yankees
+    Stadium Tours" is not the Yankees).
+    """
+    if not name:
+        return None
+    sport = sport.upper() if sport else None
+    name = name.strip()
+    mentions = find_team_mentions(name, sport)
+    ids = {m.team_id for m in mentions}
+    if len(ids) != 1:
+        return None
+    covered = all(any(m.start <= start and end <= m.end for m in mentions) for _, start, end in _words(name))
+    return ids.pop() if covered else None
+
+
+def team_name(team_id: int) -> Optional[str]:
+    team = TEAMS_BY_ID.get(team_id)
+    return team.full_name if team else None
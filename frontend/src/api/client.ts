@@ -1,6 +1,10 @@
 const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:8000";
 
-async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
+// List endpoints return one page per call and the cursor for the next page
+// in this header; it is absent on the last page.
+const NEXT_CURSOR_HEADER = "X-Next-Cursor";
+
+async function send(path: string, options: RequestInit = {}): Promise<Response> {
   const resp = await fetch(`${API_BASE}${path}`, {
     headers: {
       "Content-Type": "application/json",
@@ -11,12 +15,32 @@ async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
     const text = await resp.text();
     throw new Error(`API ${resp.status}: ${text}`);
   }
+  return resp;
+}
+
+async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
+  const resp = await send(path, options);
   if (resp.status === 204) return undefined as T;
   return (await resp.json()) as T;
 }
 
+// Every row of a list endpoint, following the next-page cursor to the end.
+async function requestAll<T>(path: string): Promise<T[]> {
+  const rows: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const sep = path.includes("?") ? "&" : "?";
+    const page = cursor ? `${path}${sep}cursor=${encodeURIComponent(cursor)}` : path;
+    const resp = await send(page);
+    rows.push(...((await resp.json()) as T[]));
+    cursor = resp.headers.get(NEXT_CURSOR_HEADER);
+  } while (cursor);
+  return rows;
+}
+
 export const api = {
   get: <T>(path: string) => request<T>(path),
+  getAll: <T>(path: string) => requestAll<T>(path),
   post: <T>(path: string, body?: any) =>
     request<T>(path, {
       method: "POST",
@@ -30,8 +30,8 @@ export default function Dashboard() {
     setLoading(true);
     try {
       const [events, markets, mappings, arbs] = await Promise.all([
-        api.get<SportsEvent[]>("/sports-events"),
-        api.get<Market[]>("/markets"),
+        api.getAll<SportsEvent>("/sports-events"),
+        api.getAll<Market>("/markets?limit=1000"),
         api.get<MappingCandidate[]>("/mapping-candidates?status=pending&limit=500"),
         api.get<ArbOpportunity[]>("/arbs?limit=200"),
       ]);
@@ -16,8 +16,8 @@ export default function EventDetail() {
       try {
         const ev = await api.get<SportsEvent>(`/sports-events/${id}`);
         setEvent(ev);
-        const mkts = await api.get<Market[]>(`/markets?sport=${ev.sport}`);
-        const q = await api.get<QuoteSummary[]>(`/quotes?sports_event_id=${id}`);
+        const mkts = await api.getAll<Market>(`/markets?sport=${ev.sport}&limit=1000`);
+        const q = await api.get<QuoteSummary[]>(`/quotes/latest?sports_event_id=${id}`);
         setMarkets(mkts.filter((m) => m.sports_event_id === ev.id));
         setQuotes(q);
       } catch (e: any) {
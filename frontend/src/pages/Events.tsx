@@ -12,7 +12,7 @@ export default function Events() {
   const load = async () => {
     try {
       const query = sport ? `?sport=${sport}` : "";
-      const data = await api.get<SportsEvent[]>(`/sports-events${query}`);
+      const data = await api.getAll<SportsEvent>(`/sports-events${query}`);
       setEvents(data);
       setError(null);
     } catch (e: any) {